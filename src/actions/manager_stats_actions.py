@@ -0,0 +1,111 @@
+"""
+Connection manager stats actions for QuickBooks Desktop Test Tool.
+
+Periodically refreshes the Connection Manager Stats panel on the Settings tab.
+"""
+
+import os
+import threading
+from qb import get_manager_stats
+
+
+# How often to poll the connection manager while the Settings tab is visible
+MANAGER_STATS_REFRESH_MS = 2000
+
+
+def start_manager_stats_refresh(app):
+    """
+    Start the periodic stats refresh.
+
+    Args:
+        app: Reference to the main QBDTestToolApp instance
+    """
+    app.manager_stats_in_flight = False
+    _schedule_refresh(app)
+
+
+def _schedule_refresh(app):
+    """Refresh now (if the Settings tab is showing) and schedule the next refresh."""
+    try:
+        if app.notebook.select() == str(app.settings_tab):
+            refresh_manager_stats(app)
+    finally:
+        app.root.after(MANAGER_STATS_REFRESH_MS, lambda: _schedule_refresh(app))
+
+
+def refresh_manager_stats(app):
+    """
+    Fetch stats from the connection manager in the background and render them.
+
+    Args:
+        app: Reference to the main QBDTestToolApp instance
+    """
+    # Skip if the previous request is still waiting (e.g. manager busy with a long request)
+    if app.manager_stats_in_flight:
+        return
+    app.manager_stats_in_flight = True
+
+    def fetch():
+        try:
+            stats = get_manager_stats()
+        except Exception as e:
+            stats = None
+            error = str(e)
+        else:
+            error = None
+        finally:
+            app.manager_stats_in_flight = False
+
+        app.root.after(0, lambda: _render_manager_stats(app, stats, error))
+
+    threading.Thread(target=fetch, daemon=True).start()
+
+
+def _render_manager_stats(app, stats, error):
+    """Update the stats panel widgets (main thread)."""
+    if stats is None:
+        app.manager_stats_summary_label.config(text=f"Stats unavailable: {error}", foreground='red')
+        return
+
+    queued = ', '.join(f"{name} {count}" for name, count in stats.get('queue_depths', {}).items())
+    sessions = stats.get('sessions', {})
+    connection = ', '.join(os.path.basename(name) or 'open file' for name in sessions) or 'closed'
+    breaker = stats.get('circuit_breaker', 'closed')
+    app.manager_stats_summary_label.config(
+        text=(f"Queued: {queued or 'none'} | Coalesced: {stats.get('coalesced_requests', 0)} | "
+              f"Shared segments: {stats.get('shared_segments', 0)} | QuickBooks sessions: {connection} | "
+              f"Retries: {stats.get('retries', 0)} | Expired: {stats.get('expired_requests', 0)} | "
+              f"Reconnects: {stats.get('reconnects', 0)} | "
+              f"Circuit: {breaker} | Uptime: {stats.get('uptime', 0):.0f}s"),
+        foreground='black' if breaker == 'closed' else 'red'
+    )
+
+    client = stats.get('client', {})
+    ipc = client.get('ipc_ms', {})
+    parse = client.get('parse_ms', {})
+    connect = stats.get('connect_ms', {})
+    app.manager_stats_client_label.config(
+        text=(f"IPC overhead p50/p95: {_format_pair(ipc)} ms | "
+              f"Parse p50/p95: {_format_pair(parse)} ms | "
+              f"Connect p50/p95: {_format_pair(connect)} ms ({stats.get('connect_errors', 0)} failed)")
+    )
+
+    tree = app.manager_stats_tree
+    tree.delete(*tree.get_children())
+    for name, type_stats in stats.get('request_types', {}).items():
+        size = type_stats['response_bytes']
+        tree.insert('', 'end', values=(
+            name,
+            type_stats['requests'],
+            type_stats['errors'],
+            _format_pair(type_stats['queue_wait_ms']),
+            _format_pair(type_stats['qb_time_ms']),
+            f"{size['mean'] / 1024:.1f}" if size['count'] else '-'
+        ))
+
+
+def _format_pair(snapshot):
+    """Format a histogram snapshot as 'p50 / p95'."""
+    if not snapshot or not snapshot.get('count'):
+        return '-'
+    return f"{snapshot['p50']:.1f} / {snapshot['p95']:.1f}"
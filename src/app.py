@@ -30,6 +30,7 @@ from ui.ui_utils import create_scrollable_frame
 from ui.ui_constants import SPACING_SM
 from actions.customer_actions import create_customer, update_customer_combo
 from actions.monitor_actions import update_accounts_combo
+from actions.manager_stats_actions import start_manager_stats_refresh
 from workers import (
     load_items_worker, load_terms_worker, load_classes_worker, load_accounts_worker,
     load_customers_worker, load_all_worker, create_customer_worker, create_invoice_worker,
@@ -67,7 +68,7 @@ class QBDTestToolApp:
         self.monitoring_stop_flag = False
 
         # Start connection manager process
-        start_manager()
+        start_manager(AppConfig.get_qb_backend_settings())
 
         # Initialize tray icon
         self.tray_icon = TrayIconManager(
@@ -79,6 +80,9 @@ class QBDTestToolApp:
         # Setup UI
         self._setup_ui()
 
+        # Poll connection manager stats for the Settings tab panel
+        start_manager_stats_refresh(self)
+
         # Setup graceful shutdown handler
         self.root.protocol("WM_DELETE_WINDOW", lambda: on_closing(self))
 
@@ -33,6 +33,14 @@ DEFAULT_CONFIG = {
         "activity_log_collapsed": False,  # Activity log collapsed state (applies to both Create and Monitor tabs)
         "create_log_sash_pos": None,  # Sash position for Create tab log (None = use default 70/30)
         "monitor_log_sash_pos": None  # Sash position for Monitor tab log (None = use default 70/30)
+    },
+    "qb_backend": {
+        "type": "com",  # com = QuickBooks Desktop via QBXMLRP2, simulator = in-memory company file, replay = cassette
+        "latency_ms": 0,  # Simulator only: latency added to every ProcessRequest
+        "jitter_ms": 0,  # Simulator only: random +/- deviation from latency_ms
+        "cassette": "",  # Replay only: cassette file to serve responses from
+        "latency_scale": 1.0,  # Replay only: multiplier for recorded latency (0 = no delay)
+        "record_cassette": ""  # Any backend: append every request/response to this cassette file (empty = off)
     }
 }
 
@@ -213,3 +221,15 @@ class AppConfig:
             'monitor_log_sash_pos': monitor_log_sash_pos if monitor_log_sash_pos is not None else existing_ui_state.get('monitor_log_sash_pos')
         }
         return AppConfig.save_config(config)
+
+    @staticmethod
+    def get_qb_backend_settings() -> Dict[str, Any]:
+        """
+        Get QuickBooks backend settings.
+
+        Returns:
+            Dict with backend type ('com', 'simulator' or 'replay'), latency_ms,
+            jitter_ms, cassette, latency_scale and record_cassette
+        """
+        config = AppConfig.load_config()
+        return {**DEFAULT_CONFIG['qb_backend'], **config.get('qb_backend', {})}
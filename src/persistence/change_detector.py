@@ -6,7 +6,7 @@ Compares session data with current QuickBooks state to detect changes.
 
 from typing import Dict, List, Any
 from datetime import datetime
-from qb import QBIPCClient, QBXMLBuilder, QBXMLParser
+from qb import QBIPCClient, QBXMLBuilder, QBXMLParser, PRIORITY_MONITOR
 from qb.connection import QBConnectionError
 
 
@@ -30,8 +30,12 @@ class ChangeDetector:
         for invoice in invoices:
             try:
                 # Query invoice by TxnID
-                request = QBXMLBuilder.build_invoice_query(txn_id=invoice.txn_id)
-                response_xml = qb.execute_request(request)
+                request = QBXMLBuilder.build_invoice_query(
+                    txn_id=invoice.txn_id,
+                    include_linked_txns=True,
+                    include_ret_elements=QBXMLBuilder.INVOICE_STATUS_ELEMENTS
+                )
+                response_xml = qb.execute_request(request, priority=PRIORITY_MONITOR)
                 parser_result = QBXMLParser.parse_response(response_xml)
 
                 if not parser_result['success']:
@@ -94,7 +98,7 @@ class ChangeDetector:
                     detected_changes.append(f"Memo changed from '{invoice.initial_memo}' to '{current_memo}'")
 
                 # Check deposit account
-                deposit_account_ref = current_invoice.get('deposit_to_account_ref')
+                deposit_account_ref = current_invoice.get('deposit_account')
                 if deposit_account_ref:
                     current_deposit_account = deposit_account_ref.get('full_name', '')
                     if invoice.deposit_account and current_deposit_account != invoice.deposit_account:
@@ -149,8 +153,11 @@ class ChangeDetector:
         for receipt in sales_receipts:
             try:
                 # Query sales receipt by TxnID
-                request = QBXMLBuilder.build_sales_receipt_query(txn_id=receipt.txn_id)
-                response_xml = qb.execute_request(request)
+                request = QBXMLBuilder.build_sales_receipt_query(
+                    txn_id=receipt.txn_id,
+                    include_ret_elements=QBXMLBuilder.SALES_RECEIPT_STATUS_ELEMENTS
+                )
+                response_xml = qb.execute_request(request, priority=PRIORITY_MONITOR)
                 parser_result = QBXMLParser.parse_response(response_xml)
 
                 if not parser_result['success']:
@@ -198,7 +205,7 @@ class ChangeDetector:
                     detected_changes.append(f"Memo changed from '{receipt.initial_memo}' to '{current_memo}'")
 
                 # Check deposit account
-                deposit_account_ref = current_receipt.get('deposit_to_account_ref')
+                deposit_account_ref = current_receipt.get('deposit_account')
                 if deposit_account_ref:
                     current_deposit_account = deposit_account_ref.get('full_name', '')
                     if receipt.deposit_account and current_deposit_account != receipt.deposit_account:
@@ -251,8 +258,12 @@ class ChangeDetector:
         for charge in statement_charges:
             try:
                 # Query statement charge by TxnID
-                request = QBXMLBuilder.build_charge_query(txn_id=charge.txn_id)
-                response_xml = qb.execute_request(request)
+                request = QBXMLBuilder.build_charge_query(
+                    txn_id=charge.txn_id,
+                    include_linked_txns=True,
+                    include_ret_elements=QBXMLBuilder.CHARGE_STATUS_ELEMENTS
+                )
+                response_xml = qb.execute_request(request, priority=PRIORITY_MONITOR)
                 parser_result = QBXMLParser.parse_response(response_xml)
 
                 if not parser_result['success']:
@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Optional, Dict, Any
 from datetime import datetime
 from config import AppConfig
+from qb.records import Record
 
 
 class SessionManager:
@@ -56,7 +57,7 @@ class SessionManager:
 
             # Write to file
             with open(SessionManager.SESSION_FILE, 'w') as f:
-                json.dump(session_data, f, indent=2)
+                json.dump(session_data, f, indent=2, default=SessionManager._json_default)
 
             return True
 
@@ -219,3 +220,10 @@ class SessionManager:
             'time_modified': getattr(sc, 'time_modified', None),
             'archived': getattr(sc, 'archived', False)
         }
+
+    @staticmethod
+    def _json_default(value: Any) -> Any:
+        """Serialize parsed QB records (e.g. linked transactions in payment_info) as dicts."""
+        if isinstance(value, Record):
+            return value.to_dict()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -5,10 +5,14 @@ Provides connection management, QBXML builders/parsers, and data loaders.
 """
 
 from .connection import QBConnection
-from .ipc_client import QBIPCClient, start_manager, stop_manager, disconnect_qb
+from .ipc_client import (
+    QBIPCClient, start_manager, stop_manager, disconnect_qb, get_queue_depths, get_manager_stats, PIPELINE_WINDOW
+)
+from .request_priority import PRIORITY_INTERACTIVE, PRIORITY_MONITOR, PRIORITY_BULK
 from .data_loader import DataLoader
 from .xml_builder import QBXMLBuilder
 from .xml_parser import QBXMLParser
+from .bulk_status import fetch_status_bulk
 
 __all__ = [
     'QBConnection',
@@ -16,7 +20,14 @@ __all__ = [
     'start_manager',
     'stop_manager',
     'disconnect_qb',
+    'get_queue_depths',
+    'get_manager_stats',
+    'PIPELINE_WINDOW',
+    'PRIORITY_INTERACTIVE',
+    'PRIORITY_MONITOR',
+    'PRIORITY_BULK',
     'DataLoader',
     'QBXMLBuilder',
     'QBXMLParser',
+    'fetch_status_bulk',
 ]
@@ -0,0 +1,317 @@
+"""
+Micro-benchmarks for the QBXML builder and parser.
+
+Run from the src directory:
+
+    python -m qb.benchmark builder
+    python -m qb.benchmark parser [--type customers] [--envelope]
+    python -m qb.benchmark dispatch [--requests 200] [--gaps 10 100]
+
+Each benchmark prints a table; nothing talks to QuickBooks (dispatch runs
+the connection manager against the zero-latency simulator).
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Any, List
+
+from .ipc_client import QBIPCClient, start_manager, stop_manager
+from .xml_builder import QBXMLBuilder
+from .xml_parser import QBXMLParser
+
+
+def _rate(func: Callable[[], Any], min_time: float = 0.5) -> float:
+    """
+    Measure how many times per second func runs.
+
+    Args:
+        func: Function to call repeatedly
+        min_time: Seconds to keep calling it for
+
+    Returns:
+        Calls per second
+    """
+    func()  # Warm up
+    calls = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        for _ in range(50):
+            func()
+        calls += 50
+        elapsed = time.perf_counter() - started
+    return calls / elapsed
+
+
+def _invoice_data(line_count: int) -> Dict[str, Any]:
+    """Build an InvoiceAdd payload shaped like the invoice generator's output."""
+    return {
+        'customer_ref': '80000001-1700000000',
+        'class_ref': '80000002-1700000000',
+        'txn_date': '2025-11-07',
+        'ref_number': 'INV-10042',
+        'po_number': 'PO-7781',
+        'terms_ref': '80000003-1700000000',
+        'memo': 'Test invoice for Smith & Sons <QBDTestTool>',
+        'line_items': [
+            {
+                'item_ref': f'8000{index:04d}-1700000000',
+                'desc': f'Consulting services, phase {index}',
+                'quantity': index % 5 + 1,
+                'rate': 125.5 + index,
+            }
+            for index in range(line_count)
+        ],
+    }
+
+
+def bench_builder(line_counts: List[int]):
+    """Compare InvoiceAdd requests per second: lxml tree vs. precompiled template."""
+    print(f"{'lines':>5}  {'lxml req/s':>11}  {'template req/s':>14}  {'speedup':>7}")
+
+    use_templates = QBXMLBuilder.use_templates
+    try:
+        for line_count in line_counts:
+            data = _invoice_data(line_count)
+
+            QBXMLBuilder.use_templates = False
+            reference = QBXMLBuilder.build_invoice_add(data)
+            lxml_rate = _rate(lambda: QBXMLBuilder.build_invoice_add(data))
+
+            QBXMLBuilder.use_templates = True
+            if QBXMLBuilder.build_invoice_add(data) != reference:
+                raise AssertionError(f"Template output differs from lxml output for {line_count} lines")
+            template_rate = _rate(lambda: QBXMLBuilder.build_invoice_add(data))
+
+            print(f"{line_count:>5}  {lxml_rate:>11,.0f}  {template_rate:>14,.0f}  {template_rate / lxml_rate:>6.1f}x")
+    finally:
+        QBXMLBuilder.use_templates = use_templates
+
+
+def _invoice_ret(index: int) -> str:
+    """A synthetic InvoiceRet with two lines."""
+    line = (
+        f'<InvoiceLineRet><TxnLineID>{index:X}-{{line}}</TxnLineID><ItemRef><ListID>80000002-1700000000</ListID></ItemRef>'
+        f'<Desc>Consulting services</Desc><Quantity>1</Quantity><Rate>125.50</Rate><Amount>125.50</Amount></InvoiceLineRet>'
+    )
+    return (
+        f'<InvoiceRet><TxnID>{index:X}-1700000000</TxnID>'
+        f'<TimeCreated>2025-11-07T10:00:00-08:00</TimeCreated>'
+        f'<TimeModified>2025-11-07T10:00:00-08:00</TimeModified>'
+        f'<EditSequence>1700000000</EditSequence><TxnNumber>{index}</TxnNumber>'
+        f'<CustomerRef><ListID>80000001-1700000000</ListID><FullName>Smith &amp; Sons</FullName></CustomerRef>'
+        f'<TxnDate>2025-11-07</TxnDate><RefNumber>INV-{index}</RefNumber>'
+        f'<IsPending>false</IsPending><Subtotal>251.00</Subtotal>'
+        f'<BalanceRemaining>251.00</BalanceRemaining><IsPaid>false</IsPaid>'
+        f'{line.format(line=1)}{line.format(line=2)}</InvoiceRet>'
+    )
+
+
+def _customer_ret(index: int) -> str:
+    """A synthetic CustomerRet."""
+    return (
+        f'<CustomerRet><ListID>{index:X}-1700000000</ListID>'
+        f'<TimeCreated>2025-11-07T10:00:00-08:00</TimeCreated>'
+        f'<TimeModified>2025-11-07T10:00:00-08:00</TimeModified>'
+        f'<EditSequence>1700000000</EditSequence><Name>Customer {index}</Name>'
+        f'<FullName>Customer {index}</FullName><IsActive>true</IsActive>'
+        f'<CompanyName>Smith &amp; Sons</CompanyName><FirstName>Pat</FirstName><LastName>Smith</LastName>'
+        f'<BillAddress><Addr1>1 Main St</Addr1><City>Springfield</City><State>IL</State>'
+        f'<PostalCode>62701</PostalCode></BillAddress>'
+        f'<Phone>555-0100</Phone><Email>customer{index}@example.com</Email>'
+        f'<Balance>0.00</Balance><TotalBalance>0.00</TotalBalance></CustomerRet>'
+    )
+
+
+def _item_ret(index: int) -> str:
+    """A synthetic ItemServiceRet."""
+    return (
+        f'<ItemServiceRet><ListID>{index:X}-1700000000</ListID>'
+        f'<TimeCreated>2025-11-07T10:00:00-08:00</TimeCreated>'
+        f'<TimeModified>2025-11-07T10:00:00-08:00</TimeModified>'
+        f'<EditSequence>1700000000</EditSequence><Name>Service {index}</Name>'
+        f'<FullName>Service {index}</FullName><IsActive>true</IsActive>'
+        f'<SalesOrPurchase><Desc>Consulting services</Desc><Price>125.50</Price></SalesOrPurchase>'
+        f'</ItemServiceRet>'
+    )
+
+
+# Response type -> (*Rs tag, *Ret generator)
+_SYNTHETIC_RESPONSES = {
+    'invoices': ('InvoiceQueryRs', _invoice_ret),
+    'customers': ('CustomerQueryRs', _customer_ret),
+    'items': ('ItemQueryRs', _item_ret),
+}
+
+
+def _write_query_response(path: str, response_type: str, record_count: int, envelope: bool):
+    """
+    Write a synthetic query response to path.
+
+    Args:
+        path: File to write
+        response_type: Key of _SYNTHETIC_RESPONSES
+        record_count: Number of records
+        envelope: One *Rs per record, each with its own requestID (the shape of
+                  a batched status poll), instead of one *Rs holding them all
+    """
+    rs_tag, ret = _SYNTHETIC_RESPONSES[response_type]
+    status = 'statusCode="0" statusSeverity="Info" statusMessage="Status OK"'
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" ?>\n<QBXML>\n<QBXMLMsgsRs>\n')
+        if not envelope:
+            f.write(f'<{rs_tag} requestID="1" {status}>\n')
+        for index in range(record_count):
+            if envelope:
+                f.write(f'<{rs_tag} requestID="{index}" {status}>{ret(index)}</{rs_tag}>\n')
+            else:
+                f.write(ret(index) + '\n')
+        if not envelope:
+            f.write(f'</{rs_tag}>\n')
+        f.write('</QBXMLMsgsRs>\n</QBXML>\n')
+
+
+def _peak_rss() -> int:
+    """Peak resident memory of this process, in bytes."""
+    import psutil
+
+    info = psutil.Process().memory_info()
+    if hasattr(info, 'peak_wset'):
+        return info.peak_wset  # Windows
+
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _count_records(result: Dict[str, Any]) -> int:
+    """Count the records in one parse_response-shaped result."""
+    return sum(len(value) for value in result['data'].values() if isinstance(value, list))
+
+
+def _measure_parse(mode: str, path: str, envelope: bool, results):
+    """Parse the response at path one way and report (records, seconds, peak growth in bytes)."""
+    if mode == 'stream-file':
+        baseline = _peak_rss()
+        started = time.perf_counter()
+        with open(path, 'rb') as f:
+            count = sum(1 for _ in QBXMLParser.iter_records(f))
+    else:
+        with open(path, 'rb') as f:
+            data = f.read()
+        baseline = _peak_rss()
+        started = time.perf_counter()
+        if mode == 'tree' and envelope:
+            count = sum(_count_records(result) for result in QBXMLParser.parse_batch_response(data).values())
+        elif mode == 'tree':
+            count = _count_records(QBXMLParser.parse_response(data))
+        else:
+            count = sum(1 for _ in QBXMLParser.iter_records(data))
+
+    results.put((count, time.perf_counter() - started, _peak_rss() - baseline))
+
+
+def bench_parser(response_type: str, record_counts: List[int], envelope: bool = False):
+    """
+    Compare query response parsing: parse_response / parse_batch_response vs. iter_records.
+
+    Every measurement runs in a fresh process so peak memory readings don't
+    carry over. 'stream-file' streams straight from the response file.
+    """
+    context = multiprocessing.get_context('spawn')
+    shape = 'one *Rs per record' if envelope else 'one *Rs'
+    print(f"{response_type}, {shape}")
+    print(f"{'records':>8}  {'mode':<11}  {'seconds':>8}  {'records/s':>10}  {'peak MB':>8}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for record_count in record_counts:
+            path = os.path.join(directory, f'{response_type}-{record_count}.xml')
+            _write_query_response(path, response_type, record_count, envelope)
+
+            for mode in ('tree', 'stream', 'stream-file'):
+                results = context.Queue()
+                process = context.Process(target=_measure_parse, args=(mode, path, envelope, results))
+                process.start()
+                count, elapsed, peak = results.get()
+                process.join()
+
+                if count != record_count:
+                    raise AssertionError(f"{mode} parsed {count} of {record_count} records")
+                print(f"{record_count:>8}  {mode:<11}  {elapsed:>8.3f}  {count / elapsed:>10,.0f}  "
+                      f"{peak / (1024 * 1024):>8.1f}")
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def bench_dispatch(request_count: int, idle_gaps_ms: List[float]):
+    """
+    Measure request dispatch latency through QBIPCClient.execute_request.
+
+    Starts the connection manager with the zero-latency simulator, so the time
+    measured is queueing, manager wake-up and the IPC round trip. Each request
+    follows an idle gap, the case where a polling loop would add its sleep.
+    """
+    start_manager({'type': 'simulator', 'latency_ms': 0, 'jitter_ms': 0})
+    try:
+        request = QBXMLBuilder.build_host_query()
+        QBIPCClient.execute_request(request)  # Warm up: opens the session
+
+        print(f"{'gap ms':>6}  {'requests':>8}  {'p50 ms':>7}  {'p95 ms':>7}  {'max ms':>7}")
+        for gap_ms in idle_gaps_ms:
+            latencies = []
+            for _ in range(request_count):
+                time.sleep(gap_ms / 1000)
+                started = time.perf_counter()
+                QBIPCClient.execute_request(request)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+            latencies.sort()
+            print(f"{gap_ms:>6g}  {request_count:>8}  {_percentile(latencies, 0.50):>7.2f}  "
+                  f"{_percentile(latencies, 0.95):>7.2f}  {latencies[-1]:>7.2f}")
+    finally:
+        stop_manager()
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="QBXML builder/parser micro-benchmarks")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    builder = subparsers.add_parser('builder', help='InvoiceAdd build rate, lxml vs. template')
+    builder.add_argument('--lines', type=int, nargs='+', default=[1, 2, 5, 10, 20],
+                         help='Line item counts to benchmark')
+
+    parser_bench = subparsers.add_parser('parser', help='Query response parse rate and memory, tree vs. streaming')
+    parser_bench.add_argument('--type', dest='response_type', choices=sorted(_SYNTHETIC_RESPONSES),
+                              default='invoices', help='Synthetic response type')
+    parser_bench.add_argument('--records', type=int, nargs='+', default=[1, 10, 100, 1000, 10000, 100000],
+                              help='Record counts to benchmark')
+    parser_bench.add_argument('--envelope', action='store_true',
+                              help='One *Rs per record (batched poll) instead of one *Rs holding them all')
+
+    dispatch = subparsers.add_parser('dispatch', help='execute_request latency after idle gaps (simulator backend)')
+    dispatch.add_argument('--requests', type=int, default=100, help='Requests per idle gap')
+    dispatch.add_argument('--gaps', type=float, nargs='+', default=[10, 100],
+                          help='Idle time before each request, in milliseconds')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'builder':
+        bench_builder(args.lines)
+    elif args.benchmark == 'parser':
+        bench_parser(args.response_type, args.records, args.envelope)
+    elif args.benchmark == 'dispatch':
+        bench_dispatch(args.requests, args.gaps)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+Bulk status fetches for tracked transactions.
+
+QBXML transaction queries accept repeated TxnID elements, so the status of
+many transactions can be read with one query instead of one query each.
+IDs are sent in chunks of STATUS_CHUNK_SIZE to keep each request and
+response a manageable size.
+
+Pollers that already hold each transaction's EditSequence pass them in as
+known_edit_sequences. A chunk whose EditSequences all still match is then
+dismissed after a text scan of the response, without being parsed, and only
+changed transactions are returned.
+"""
+
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional
+
+from .ipc_client import QBIPCClient
+from .request_priority import PRIORITY_MONITOR
+from .xml_builder import QBXMLBuilder
+from .xml_parser import QBXMLParser
+
+
+# TxnIDs per query; 1,000 tracked transactions cost 10 round trips
+STATUS_CHUNK_SIZE = 100
+
+# txn_type -> (query builder, parser data key, default projection, extra builder arguments)
+_TXN_QUERIES = {
+    'invoice': (QBXMLBuilder.build_invoice_query, 'invoices',
+                QBXMLBuilder.INVOICE_STATUS_ELEMENTS, {'include_linked_txns': True}),
+    'sales_receipt': (QBXMLBuilder.build_sales_receipt_query, 'sales_receipts',
+                      QBXMLBuilder.SALES_RECEIPT_STATUS_ELEMENTS, {}),
+    'charge': (QBXMLBuilder.build_charge_query, 'charges',
+               QBXMLBuilder.CHARGE_STATUS_ELEMENTS, {'include_linked_txns': True}),
+}
+
+# statusCode of a query that matched nothing
+_STATUS_NO_MATCH = '1'
+
+
+def iter_chunks(values: List[str], chunk_size: int = STATUS_CHUNK_SIZE) -> Iterator[List[str]]:
+    """
+    Split a list of IDs into chunks, dropping empty and duplicate values.
+
+    Args:
+        values: TxnIDs (or RefNumbers)
+        chunk_size: Maximum values per chunk
+
+    Yields:
+        Lists of at most chunk_size values, in first-seen order
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    unique = list(dict.fromkeys(value for value in values if value))
+    for start in range(0, len(unique), chunk_size):
+        yield unique[start:start + chunk_size]
+
+
+def fetch_status_bulk(txn_type: str, txn_ids: List[str],
+                      include_ret_elements: Optional[List[str]] = None,
+                      chunk_size: int = STATUS_CHUNK_SIZE,
+                      priority: str = PRIORITY_MONITOR,
+                      company_file: Optional[str] = None,
+                      timeout: float = 30.0,
+                      known_edit_sequences: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch the current state of many transactions of one type.
+
+    Each chunk of IDs is sent as a single query with repeated TxnID elements.
+    If QuickBooks rejects a chunk (typically because one of its transactions
+    was deleted), that chunk is asked again as one envelope of single-TxnID
+    queries with onError="continueOnError", so only the missing ones drop out.
+
+    Args:
+        txn_type: 'invoice', 'sales_receipt' or 'charge'
+        txn_ids: TxnIDs to fetch
+        include_ret_elements: Elements to return (default: the type's *_STATUS_ELEMENTS
+                              projection; [] returns everything)
+        chunk_size: Maximum TxnIDs per query
+        priority: Scheduling class for the requests
+        company_file: Optional path to company file
+        timeout: Seconds to wait for each response
+        known_edit_sequences: Optional TxnID -> EditSequence the caller already has;
+                              transactions still at that EditSequence are left out
+
+    Returns:
+        Dict of TxnID -> parsed transaction (as in the parser's query results).
+        Transactions QuickBooks does not have are left out.
+
+    Raises:
+        ValueError: If txn_type is not supported
+        Exception: If a round trip fails (see QBIPCClient.execute_request)
+    """
+    if txn_type not in _TXN_QUERIES:
+        raise ValueError(f"Unsupported txn_type: {txn_type}")
+
+    build_query, data_key, default_elements, query_options = _TXN_QUERIES[txn_type]
+    if include_ret_elements is None:
+        include_ret_elements = default_elements
+    if known_edit_sequences is not None and include_ret_elements and 'EditSequence' not in include_ret_elements:
+        include_ret_elements = [*include_ret_elements, 'EditSequence']
+    query_options = dict(query_options, include_ret_elements=include_ret_elements or None)
+
+    parse = None
+    if known_edit_sequences is not None:
+        parse = partial(_parse_changed, data_key=data_key, known_edit_sequences=known_edit_sequences)
+
+    statuses = {}
+    for chunk in iter_chunks(txn_ids, chunk_size):
+        result = QBIPCClient.execute_and_parse(
+            build_query(txn_id=chunk, **query_options), parse,
+            company_file=company_file, timeout=timeout, priority=priority
+        )
+
+        if result['success']:
+            records = result['data'][data_key]
+        elif result.get('status_code') == _STATUS_NO_MATCH:
+            records = []
+        else:
+            records = _fetch_one_by_one(chunk, build_query, data_key, query_options,
+                                        company_file, timeout, priority)
+
+        for record in records:
+            if known_edit_sequences is not None and _is_unchanged(record, known_edit_sequences):
+                continue
+            statuses[record['txn_id']] = record
+
+    return statuses
+
+
+def _parse_changed(response: Any, data_key: str, known_edit_sequences: Dict[str, str]) -> Dict[str, Any]:
+    """Parse a chunk's response, unless a scan shows every transaction in it is unchanged."""
+    edit_sequences = QBXMLParser.scan_edit_sequences(response)
+    if edit_sequences and all(
+        known_edit_sequences.get(txn_id) == edit_sequence
+        for txn_id, edit_sequence in edit_sequences.items()
+    ):
+        return {'success': True, 'data': {data_key: []}}
+    return QBXMLParser.parse_response(response)
+
+
+def _is_unchanged(record: Dict[str, Any], known_edit_sequences: Dict[str, str]) -> bool:
+    """Whether a parsed transaction is still at the EditSequence the caller has."""
+    edit_sequence = record['edit_sequence']
+    return edit_sequence is not None and known_edit_sequences.get(record['txn_id']) == edit_sequence
+
+
+def _fetch_one_by_one(txn_ids: List[str], build_query, data_key: str, query_options: Dict[str, Any],
+                      company_file: Optional[str], timeout: float, priority: str) -> List[Dict[str, Any]]:
+    """Query each TxnID on its own, all in one continueOnError envelope."""
+    request = QBXMLBuilder.build_batch_request(
+        [build_query(txn_id=txn_id, **query_options) for txn_id in txn_ids]
+    )
+    results = QBIPCClient.execute_and_parse(
+        request, QBXMLParser.parse_batch_response,
+        company_file=company_file, timeout=timeout, priority=priority
+    )
+
+    records = []
+    for result in results.values():
+        if result['success']:
+            records.extend(result['data'][data_key])
+    return records
@@ -0,0 +1,328 @@
+"""
+Record-and-replay cassettes for QBXML traffic.
+
+A cassette is an append-only JSON Lines file with one entry per
+ProcessRequest call: when it was made, how long it took, and the
+zlib-compressed request and response (or the error it raised).
+
+QBRecordingConnection wraps any backend and writes a cassette as traffic
+passes through. QBReplayConnection serves the recorded responses back,
+matched by normalized request content, so the parser, monitor loop and batch
+workers can be profiled offline against traffic recorded from real company files.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterator, List, Optional
+
+from .connection import QBConnection, QBConnectionError, ERROR_FATAL, ERROR_SESSION
+from .telemetry import request_names
+
+
+# Element values that change from run to run without changing what is asked for
+_VOLATILE_ELEMENTS = ('FromModifiedDate', 'ToModifiedDate', 'FromTxnDate', 'ToTxnDate')
+_VOLATILE_ELEMENT_PATTERN = re.compile(
+    r'<(' + '|'.join(_VOLATILE_ELEMENTS) + r')>[^<]*</\1>'
+)
+_ITERATOR_ID_PATTERN = re.compile(r'iteratorID="[^"]*"')
+_PROCESSING_INSTRUCTION_PATTERN = re.compile(r'<\?.*?\?>', re.DOTALL)
+_INTER_TAG_WHITESPACE_PATTERN = re.compile(r'>\s+<')
+
+
+def normalize_request(qbxml: str) -> str:
+    """
+    Reduce a QBXML request to the content that decides its response.
+
+    Drops the XML declaration and qbxml version, whitespace between tags,
+    date-range filter values and iterator IDs.
+
+    Args:
+        qbxml: QBXML request string
+
+    Returns:
+        Normalized request string
+    """
+    normalized = _PROCESSING_INSTRUCTION_PATTERN.sub('', qbxml)
+    normalized = _INTER_TAG_WHITESPACE_PATTERN.sub('><', normalized)
+    normalized = _VOLATILE_ELEMENT_PATTERN.sub(r'<\1>*</\1>', normalized)
+    normalized = _ITERATOR_ID_PATTERN.sub('iteratorID="*"', normalized)
+    return normalized.strip()
+
+
+def request_key(qbxml: str) -> str:
+    """Get the cassette match key of a QBXML request."""
+    return hashlib.sha1(normalize_request(qbxml).encode('utf-8')).hexdigest()
+
+
+def _pack(text: Optional[str]) -> Optional[str]:
+    """Compress a QBXML document for the cassette."""
+    if text is None:
+        return None
+    return base64.b64encode(zlib.compress(text.encode('utf-8'))).decode('ascii')
+
+
+def _unpack(data: Optional[str]) -> Optional[str]:
+    """Decompress a QBXML document from the cassette."""
+    if data is None:
+        return None
+    return zlib.decompress(base64.b64decode(data)).decode('utf-8')
+
+
+class CassetteWriter:
+    """Appends entries to a cassette file. Safe to share between connections."""
+
+    def __init__(self, path: str):
+        """
+        Initialize writer.
+
+        Args:
+            path: Cassette file path (created if missing, appended to otherwise)
+        """
+        self.path = path
+        self.lock = threading.Lock()
+
+    def append(self, qbxml_request: str, response: Optional[str], elapsed: float,
+               error: Optional[QBConnectionError] = None, company_file: Optional[str] = None):
+        """
+        Append one request/response pair.
+
+        Args:
+            qbxml_request: Request sent to QuickBooks
+            response: Response received, or None if the request raised
+            elapsed: Seconds spent in ProcessRequest
+            error: The error raised instead of a response
+            company_file: Company file the session was opened on
+        """
+        entry = {
+            'ts': time.time(),
+            'ms': round(elapsed * 1000, 3),
+            'key': request_key(qbxml_request),
+            'types': request_names(qbxml_request),
+            'company_file': company_file,
+            'rq': _pack(qbxml_request),
+            'rs': _pack(response),
+        }
+        if error is not None:
+            entry['error'] = str(error)
+            entry['error_class'] = getattr(error, 'error_class', ERROR_FATAL)
+
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+
+# One writer per cassette path, shared by every recording connection in this process
+_writers: Dict[str, CassetteWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_cassette_writer(path: str) -> CassetteWriter:
+    """Get (or create) the shared writer for a cassette path."""
+    key = os.path.abspath(path)
+    with _writers_lock:
+        if key not in _writers:
+            _writers[key] = CassetteWriter(key)
+        return _writers[key]
+
+
+def iter_cassette(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read a cassette.
+
+    A truncated last line (the recorder was killed mid-write) is skipped.
+
+    Args:
+        path: Cassette file path
+
+    Yields:
+        Entry dicts with 'ts', 'ms', 'key', 'types', 'company_file', 'request',
+        'response' (None for errors) and, for failed requests, 'error' and 'error_class'
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entry['request'] = _unpack(entry.pop('rq'))
+            entry['response'] = _unpack(entry.pop('rs'))
+            yield entry
+
+
+class QBRecordingConnection(QBConnection):
+    """
+    Wraps a backend connection and records its traffic to a cassette.
+
+    Has the same interface as QBConnection; everything except send_request is
+    passed straight through.
+    """
+
+    def __init__(self, inner: QBConnection, cassette_path: str):
+        """
+        Initialize recording connection.
+
+        Args:
+            inner: Connection that actually talks to QuickBooks (or the simulator)
+            cassette_path: Cassette file to append to
+        """
+        super().__init__(inner.app_name, inner.app_id)
+        self.inner = inner
+        self.writer = get_cassette_writer(cassette_path)
+        self.company_file = None
+
+    def connect(self, company_file: Optional[str] = None) -> bool:
+        """Open the wrapped connection."""
+        self.company_file = company_file
+        return self.inner.connect(company_file)
+
+    def disconnect(self) -> bool:
+        """Close the wrapped connection."""
+        return self.inner.disconnect()
+
+    def send_request(self, qbxml_request: str) -> str:
+        """
+        Send a request through the wrapped connection and record it.
+
+        Args:
+            qbxml_request: QBXML formatted request string
+
+        Returns:
+            QBXML response string
+
+        Raises:
+            QBConnectionError: Whatever the wrapped connection raised (also recorded)
+        """
+        started = time.perf_counter()
+        try:
+            response = self.inner.send_request(qbxml_request)
+        except QBConnectionError as e:
+            self.writer.append(qbxml_request, None, time.perf_counter() - started, e, self.company_file)
+            raise
+        self.writer.append(qbxml_request, response, time.perf_counter() - started,
+                           company_file=self.company_file)
+        return response
+
+
+class QBReplayConnection(QBConnection):
+    """
+    Drop-in replacement for QBConnection that serves responses from a cassette.
+
+    A request is answered by the next unused recording of the same normalized
+    request. Once those run out the last one is repeated, so a poll recorded
+    ten times still answers an eleventh. Requests that were never recorded
+    verbatim (e.g. Add requests with freshly generated data) fall back to the
+    next recording with the same request types, unless strict is set.
+    """
+
+    def __init__(self, cassette_path: str, app_name: str = "QBDTestTool", app_id: str = "",
+                 latency_scale: float = 1.0, strict: bool = False):
+        """
+        Initialize replay connection.
+
+        Args:
+            cassette_path: Cassette file recorded by QBRecordingConnection
+            app_name: Application name (kept for interface compatibility)
+            app_id: Application ID (kept for interface compatibility)
+            latency_scale: Multiplier for the recorded ProcessRequest time (0 = no delay)
+            strict: Only answer requests that match a recording exactly
+        """
+        super().__init__(app_name, app_id)
+        self.cassette_path = cassette_path
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self.lock = threading.Lock()
+        self.by_key: Dict[str, deque] = defaultdict(deque)
+        self.by_types: Dict[tuple, deque] = defaultdict(deque)
+        self.last_by_key: Dict[str, Dict[str, Any]] = {}
+        self.last_by_types: Dict[tuple, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self):
+        """Index the cassette by request key and by request types."""
+        if not os.path.exists(self.cassette_path):
+            raise QBConnectionError(f"Cassette not found: {self.cassette_path}")
+
+        entries: List[Dict[str, Any]] = list(iter_cassette(self.cassette_path))
+        for entry in entries:
+            self.by_key[entry['key']].append(entry)
+            self.by_types[tuple(entry['types'])].append(entry)
+
+    def connect(self, company_file: Optional[str] = None) -> bool:
+        """
+        Open a replay session.
+
+        Args:
+            company_file: Ignored (the cassette decides what is served)
+
+        Returns:
+            True
+        """
+        self.session_manager = self
+        self.ticket = f"replay-{id(self):x}-{int(time.time())}"
+        return True
+
+    def disconnect(self) -> bool:
+        """
+        End the replay session.
+
+        Returns:
+            True
+        """
+        self.ticket = None
+        self.session_manager = None
+        return True
+
+    def _take(self, queue: deque, last: Dict, key) -> Optional[Dict[str, Any]]:
+        """Take the next recording from a queue, or repeat the last one taken."""
+        if queue:
+            entry = queue.popleft()
+            last[key] = entry
+            return entry
+        return last.get(key)
+
+    def send_request(self, qbxml_request: str) -> str:
+        """
+        Answer a request from the cassette.
+
+        Args:
+            qbxml_request: QBXML formatted request string
+
+        Returns:
+            Recorded QBXML response string
+
+        Raises:
+            QBConnectionError: If not connected, no recording matches, or the
+                               recorded request failed (same message and error class)
+        """
+        if not self.ticket:
+            raise QBConnectionError("Not connected to QuickBooks. Call connect() first.", ERROR_SESSION)
+
+        key = request_key(qbxml_request)
+        types = tuple(request_names(qbxml_request))
+
+        with self.lock:
+            entry = self._take(self.by_key[key], self.last_by_key, key)
+            if entry is None and not self.strict:
+                entry = self._take(self.by_types[types], self.last_by_types, types)
+
+        if entry is None:
+            raise QBConnectionError(
+                f"No recording in {os.path.basename(self.cassette_path)} matches this request "
+                f"({', '.join(types) or 'unknown'})"
+            )
+
+        delay = entry['ms'] / 1000.0 * self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+
+        if entry.get('error') is not None:
+            raise QBConnectionError(entry['error'], entry.get('error_class', ERROR_FATAL))
+        return entry['response']
@@ -2,17 +2,71 @@
 QuickBooks Desktop connection manager using COM (pywin32).
 """
 
-import win32com.client
 from typing import Optional, Dict, Any
 import logging
 
+try:
+    import win32com.client
+except ImportError:
+    # pywin32 is Windows-only; the simulator backend works without it
+    win32com = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Error classes (see classify_qb_error)
+ERROR_TRANSIENT = 'transient'  # QuickBooks is busy - retry the request on the same session
+ERROR_SESSION = 'session'      # Session or COM server lost - reconnect before retrying
+ERROR_FATAL = 'fatal'          # Retrying will not help (bad request, QuickBooks not running, no permission)
+
+# COM/QBXMLRP2 error codes (signed decimal, hex) by error class
+_TRANSIENT_ERROR_CODES = (
+    ('-2147418111', '0x80010001'),  # RPC_E_CALL_REJECTED: QuickBooks is busy
+    ('-2147417846', '0x8001010a'),  # RPC_E_SERVERCALL_RETRYLATER
+    ('-2147220460', '0x80040414'),  # A modal dialog box is showing in QuickBooks
+)
+_SESSION_ERROR_CODES = (
+    ('-2147023174', '0x800706ba'),  # RPC_S_SERVER_UNAVAILABLE
+    ('-2147023170', '0x800706be'),  # RPC_S_CALL_FAILED
+    ('-2147417848', '0x80010108'),  # RPC_E_DISCONNECTED
+)
+
+
 class QBConnectionError(Exception):
     """Exception raised for QB connection errors."""
-    pass
+
+    def __init__(self, message: str = '', error_class: str = ERROR_FATAL):
+        """
+        Initialize error.
+
+        Args:
+            message: User-friendly error message
+            error_class: ERROR_TRANSIENT, ERROR_SESSION or ERROR_FATAL
+        """
+        super().__init__(message)
+        self.error_class = error_class
+
+
+def classify_qb_error(error) -> str:
+    """
+    Classify a QuickBooks COM error by how it can be recovered from.
+
+    Args:
+        error: The exception object from COM (or a QBConnectionError)
+
+    Returns:
+        ERROR_TRANSIENT, ERROR_SESSION or ERROR_FATAL
+    """
+    if isinstance(error, QBConnectionError):
+        return error.error_class
+
+    error_str = str(error).lower()
+    if any(code in error_str for codes in _TRANSIENT_ERROR_CODES for code in codes):
+        return ERROR_TRANSIENT
+    if any(code in error_str for codes in _SESSION_ERROR_CODES for code in codes):
+        return ERROR_SESSION
+    return ERROR_FATAL
 
 
 def _parse_qb_error(error) -> str:
@@ -102,6 +156,12 @@ class QBConnection:
         Raises:
             QBConnectionError: If connection fails
         """
+        if win32com is None:
+            raise QBConnectionError(
+                "pywin32 is not installed, so QuickBooks Desktop cannot be reached over COM.\n\n"
+                "Install pywin32 on Windows, or select the simulator backend in the config file."
+            )
+
         try:
             # Create the QB session manager object
             self.session_manager = win32com.client.Dispatch("QBXMLRP2.RequestProcessor")
@@ -122,7 +182,7 @@ class QBConnection:
         except Exception as e:
             logger.error(f"Failed to connect to QuickBooks: {str(e)}")
             friendly_message = _parse_qb_error(e)
-            raise QBConnectionError(friendly_message)
+            raise QBConnectionError(friendly_message, classify_qb_error(e))
 
     def disconnect(self) -> bool:
         """
@@ -162,7 +222,7 @@ class QBConnection:
             QBConnectionError: If request fails or no connection
         """
         if not self.session_manager or not self.ticket:
-            raise QBConnectionError("Not connected to QuickBooks. Call connect() first.")
+            raise QBConnectionError("Not connected to QuickBooks. Call connect() first.", ERROR_SESSION)
 
         try:
             logger.debug(f"Sending request:\n{qbxml_request}")
@@ -173,7 +233,7 @@ class QBConnection:
         except Exception as e:
             logger.error(f"Request failed: {str(e)}")
             friendly_message = _parse_qb_error(e)
-            raise QBConnectionError(friendly_message)
+            raise QBConnectionError(friendly_message, classify_qb_error(e))
 
     def execute_request(self, qbxml_request: str, company_file: Optional[str] = None) -> str:
         """
@@ -210,6 +270,46 @@ class QBConnection:
         return False
 
 
+def create_connection(backend_config: Optional[Dict[str, Any]] = None) -> QBConnection:
+    """
+    Create a connection for the configured QuickBooks backend.
+
+    Args:
+        backend_config: Dict with 'type' ('com', 'simulator' or 'replay'); for the
+                        simulator, 'latency_ms' and 'jitter_ms'; for replay,
+                        'cassette' and 'latency_scale'; and for any backend,
+                        'record_cassette' to record its traffic (see AppConfig)
+
+    Returns:
+        QBConnection (or a subclass with the same interface)
+    """
+    backend_config = backend_config or {}
+    backend_type = backend_config.get('type', 'com')
+
+    if backend_type == 'simulator':
+        from .simulator import QBSimulatorConnection
+        connection = QBSimulatorConnection(
+            latency_ms=backend_config.get('latency_ms', 0),
+            jitter_ms=backend_config.get('jitter_ms', 0)
+        )
+    elif backend_type == 'replay':
+        from .cassette import QBReplayConnection
+        connection = QBReplayConnection(
+            backend_config.get('cassette', ''),
+            latency_scale=backend_config.get('latency_scale', 1.0)
+        )
+    elif backend_type == 'com':
+        connection = QBConnection()
+    else:
+        raise QBConnectionError(f"Unknown QuickBooks backend type: {backend_type}")
+
+    if backend_config.get('record_cassette'):
+        from .cassette import QBRecordingConnection
+        connection = QBRecordingConnection(connection, backend_config['record_cassette'])
+
+    return connection
+
+
 # Convenience function for single requests
 def execute_qbxml_request(qbxml_request: str, company_file: Optional[str] = None) -> str:
     """
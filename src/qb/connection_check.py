@@ -3,50 +3,147 @@ QuickBooks connection status checking.
 
 Provides lightweight methods to check if QuickBooks is available before
 attempting data operations.
+
+The check sends a HostQuery (a few hundred bytes, independent of company file
+size) and caches the result. Callers get the cached answer immediately; a
+successful result that has gone stale is served while a background probe
+refreshes it.
 """
 
-from typing import Tuple
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 from .connection import QBConnectionError
 
 
-def is_quickbooks_available() -> Tuple[bool, str]:
+# Seconds a probe result is served without refreshing it
+PROBE_TTL_SECONDS = 10.0
+
+# Seconds a stale "available" result may still be served while a background probe runs.
+# Older results, and stale "unavailable" results, are re-probed before answering.
+PROBE_MAX_STALE_SECONDS = 60.0
+
+# Seconds to wait for the probe response
+PROBE_TIMEOUT_SECONDS = 10.0
+
+# Latest probe result: available, message, host info, checked_at (time.monotonic())
+_status: Optional[Dict[str, Any]] = None
+_status_lock = threading.Lock()
+_refresh_thread: Optional[threading.Thread] = None
+
+
+def _probe() -> Dict[str, Any]:
     """
-    Check if QuickBooks Desktop is available and connected.
+    Send a HostQuery through the connection manager and record the result.
 
-    This performs a lightweight connection check without making data requests.
-    Returns immediately with status - does not throw exceptions.
+    Never raises; failures are recorded as unavailable.
 
     Returns:
-        Tuple of (is_available: bool, message: str)
-            - is_available: True if QB is running and connected
-            - message: Success message or error description
+        The new status dict
     """
+    global _status
+
+    host = {}
     try:
         from .ipc_client import QBIPCClient
         from .xml_builder import QBXMLBuilder
-        from .xml_parser import QBXMLParser
-
-        # Build a minimal customer query request (lightweight connection check)
-        # Just checks if we can communicate with QB, doesn't return data
-        request_xml = QBXMLBuilder.build_customer_query()
-
-        # Try to execute the request (IPC client handles connection automatically)
-        response_xml = QBIPCClient.execute_request(request_xml)
 
-        # Parse response to verify success
-        parse_result = QBXMLParser.parse_response(response_xml)
+        # Tiny request - the response does not grow with the company file
+        parse_result = QBIPCClient.execute_and_parse(
+            QBXMLBuilder.build_host_query(), timeout=PROBE_TIMEOUT_SECONDS
+        )
 
         # If we got here and parsing succeeded, connection is working
         if parse_result and parse_result.get('success'):
-            return (True, "QuickBooks Desktop is connected and ready")
+            host = parse_result['data']
+            available, message = True, "QuickBooks Desktop is connected and ready"
         else:
             error_msg = parse_result.get('error', 'Unknown error')
-            return (False, f"QuickBooks responded with error: {error_msg}")
+            available, message = False, f"QuickBooks responded with error: {error_msg}"
 
     except QBConnectionError as e:
         # Known QB connection error
-        return (False, str(e))
+        available, message = False, str(e)
 
     except Exception as e:
         # Any other error (connection manager not started, etc.)
-        return (False, f"Cannot connect to QuickBooks: {str(e)}")
+        available, message = False, f"Cannot connect to QuickBooks: {str(e)}"
+
+    with _status_lock:
+        if not host and _status:
+            # Keep the host details of the last successful probe
+            host = _status['host']
+        _status = {
+            'available': available,
+            'message': message,
+            'host': host,
+            'checked_at': time.monotonic()
+        }
+        return _status
+
+
+def _refresh_in_background():
+    """Start a background probe unless one is already running."""
+    global _refresh_thread
+
+    with _status_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return
+        _refresh_thread = threading.Thread(target=_probe, daemon=True)
+        _refresh_thread.start()
+
+
+def is_quickbooks_available(max_age: float = PROBE_TTL_SECONDS) -> Tuple[bool, str]:
+    """
+    Check if QuickBooks Desktop is available and connected.
+
+    This performs a lightweight connection check without making data requests.
+    Returns immediately with status - does not throw exceptions.
+
+    Args:
+        max_age: Seconds a cached result may be served without refreshing it
+                 (0 = always probe now)
+
+    Returns:
+        Tuple of (is_available: bool, message: str)
+            - is_available: True if QB is running and connected
+            - message: Success message or error description
+    """
+    with _status_lock:
+        status = _status
+
+    if status is not None:
+        age = time.monotonic() - status['checked_at']
+        if age < max_age:
+            return (status['available'], status['message'])
+        if status['available'] and max_age > 0 and age < PROBE_MAX_STALE_SECONDS:
+            _refresh_in_background()
+            return (status['available'], status['message'])
+
+    status = _probe()
+    return (status['available'], status['message'])
+
+
+def get_host_info() -> Dict[str, Any]:
+    """
+    Get the QuickBooks host details from the last successful probe.
+
+    Returns:
+        Dict with product_name, major_version, minor_version, country,
+        supported_qbxml_versions and qb_file_mode (empty if never reached)
+    """
+    with _status_lock:
+        return dict(_status['host']) if _status else {}
+
+
+def get_supported_qbxml_versions() -> List[str]:
+    """Get the QBXML versions QuickBooks reported in the last successful probe."""
+    return get_host_info().get('supported_qbxml_versions', [])
+
+
+def invalidate_availability():
+    """Forget the cached result so the next check probes QuickBooks."""
+    global _status
+
+    with _status_lock:
+        _status = None
@@ -3,78 +3,142 @@ QuickBooks Connection Manager Process
 
 Runs as a separate process to manage QuickBooks connections.
 Provides isolation so that main app crashes don't orphan QB connections.
-Monitors main app health via heartbeat and exits gracefully if main app dies.
+Monitors main app health via a shared heartbeat timestamp and exits gracefully
+if main app dies.
 """
 
+import os
 import time
-import pythoncom
+from collections import OrderedDict, deque
 from multiprocessing import Queue
+from queue import Empty
 from typing import Optional, Dict, Any
 from datetime import datetime
-from .connection import QBConnection
+from .connection import QBConnection, create_connection, classify_qb_error, ERROR_TRANSIENT, ERROR_SESSION
+from .shm_transport import SHM_THRESHOLD_BYTES, export_payload, release_segment
+from .request_priority import PRIORITY_INTERACTIVE, PRIORITY_CLASSES
+from .telemetry import ManagerTelemetry, request_names
+
+try:
+    import pythoncom
+except ImportError:
+    # Only needed for the COM backend (Windows)
+    pythoncom = None
+
+
+def _is_read_only(qbxml: str) -> bool:
+    """
+    Check whether a QBXML request only contains queries (no Add/Mod/Del).
+
+    Iterator queries are excluded: each one advances server-side state.
+    """
+    if not qbxml or 'iterator=' in qbxml:
+        return False
+    request_types = request_names(qbxml)
+    return bool(request_types) and all(tag.endswith('Query') for tag in request_types)
+
+
+def _session_key(company_file: Optional[str]) -> str:
+    """Normalize a company file path for the session pool ('' = the currently open file)."""
+    if not company_file:
+        return ''
+    return os.path.normcase(os.path.normpath(company_file))
 
 
 class QBConnectionManager:
     """Connection manager that runs in separate process."""
 
-    def __init__(self, request_queue: Queue, response_queue: Queue):
+    def __init__(self, request_queue: Queue, response_queue: Queue,
+                 backend_config: Optional[Dict[str, Any]] = None, heartbeat=None):
         """
         Initialize connection manager.
 
         Args:
             request_queue: Queue to receive requests from main app
             response_queue: Queue to send responses to main app
+            backend_config: QuickBooks backend settings (see create_connection)
+            heartbeat: Shared multiprocessing.Value('d') the main app stamps with
+                       time.time(); read directly, so neither a request backlog
+                       nor a long ProcessRequest delays it
         """
         self.request_queue = request_queue
         self.response_queue = response_queue
+        self.backend_config = backend_config or {}
+        self.heartbeat = heartbeat
         self.running = True
-        self.last_heartbeat = time.time()
+        self.last_heartbeat = time.time()  # Last 'heartbeat' message (main apps without the shared value)
         self.heartbeat_timeout = 15.0  # Exit if no heartbeat for 15 seconds
-        self.qb_connection = None
-        self.connection_active = False  # Track if QB connection is currently active
-        self.last_request_time = None  # Track last request for idle timeout
-        self.idle_timeout = 30.0  # Disconnect after 30 seconds of inactivity
+        self.sessions = OrderedDict()  # Session key -> open QBConnection, least recently used first
+        self.session_last_used = {}  # Session key -> time of its last request, for idle timeout
+        self.max_sessions = 3  # Open sessions kept at once; the least recently used is closed first
+        self.idle_timeout = 30.0  # Disconnect a session after 30 seconds of inactivity
+        self.shm_threshold = SHM_THRESHOLD_BYTES  # Responses this large go through shared memory
+        self.shared_segments = {}  # Segment name -> SharedMemory awaiting release by main app
+        self.shared_segment_readers = {}  # Segment name -> releases still expected
+        self.pending_requests = {cls: deque() for cls in PRIORITY_CLASSES}  # (queued_at, message) per class
+        self.aging_interval = 2.0  # Seconds of waiting that lift a request one priority class
+        self.coalescing = {}  # (company_file, qbxml) -> queued or executing read-only request duplicates can join
+        self.coalesced_requests = 0  # Requests answered by another request's execution
+        self.deferred_messages = deque()  # Control messages read while a request executed, handled after it
+        self.telemetry = ManagerTelemetry()
+        self.started_at = time.time()
+        self.max_retries = 3  # Retries per request for transient (QuickBooks busy) errors
+        self.retry_base_delay = 0.25  # First retry backoff in seconds, doubled for each further retry
+        self.retry_max_delay = 4.0  # Backoff cap in seconds
+        self.retries = 0  # Transient-error retries performed
+        self.retry_requests = []  # Requests backing off after a transient error, due at message['retry_at']
+        self.expired_requests = 0  # Requests dropped because their caller had stopped waiting
+        self.reconnects = 0  # Sessions reopened after a session-level error
+        self.breaker_threshold = 5  # Consecutive failed requests that open the circuit breaker
+        self.breaker_cooldown = 5.0  # Seconds the queue pauses when the breaker opens (doubles per re-open)
+        self.breaker_max_cooldown = 60.0  # Cooldown cap in seconds
+        self.consecutive_failures = 0  # Requests failed with transient/session errors since the last success
+        self.breaker_open_until = None  # Time the open breaker lets a probe request through
+        self.breaker_reopens = 0  # Times the breaker opened since it last closed
+        self.breaker_trips = 0  # Times the breaker opened in total
 
     def run(self):
         """Main event loop for connection manager."""
         # Initialize COM for this process
-        pythoncom.CoInitialize()
+        if pythoncom:
+            pythoncom.CoInitialize()
 
         try:
             print("[QB Manager] Connection manager started")
             self.last_heartbeat = time.time()
 
             while self.running:
-                # Check for requests with timeout
                 try:
-                    # Wait for request with 1 second timeout to check heartbeat
-                    if not self.request_queue.empty():
-                        message = self.request_queue.get(timeout=1.0)
-                        self._handle_message(message)
+                    # Block until a message arrives or the nearest timer is due,
+                    # but only poll while requests are waiting to be served
+                    if self._has_pending_requests() and not self._breaker_is_open():
+                        timeout = 0.0
                     else:
-                        # No message, just check heartbeat and idle timeout
-                        time.sleep(0.1)
+                        timeout = max(0.0, self._next_deadline() - time.time())
+                    try:
+                        message = self.request_queue.get(timeout=timeout)
+                    except Empty:
+                        message = None
+
+                    if message is not None:
+                        self._handle_message(message)
+                        self._drain_messages()
+
+                    # Serve one request, highest (aged) priority first
+                    request = self._next_request()
+                    if request is not None:
+                        self._handle_request(request)
+                        self._handle_deferred_messages()
 
                     # Check if main app is still alive
-                    if time.time() - self.last_heartbeat > self.heartbeat_timeout:
+                    if time.time() - self._last_heartbeat_time() > self.heartbeat_timeout:
                         print("[QB Manager] No heartbeat detected, main app appears dead")
                         print("[QB Manager] Initiating graceful shutdown...")
                         self.running = False
                         break
 
-                    # Check for idle timeout - disconnect if no requests for idle_timeout seconds
-                    if self.qb_connection and self.last_request_time:
-                        idle_time = time.time() - self.last_request_time
-                        if idle_time > self.idle_timeout:
-                            print(f"[QB Manager] Idle timeout ({idle_time:.1f}s) - disconnecting from QuickBooks")
-                            try:
-                                self.qb_connection.disconnect()
-                                self.connection_active = False
-                                self.qb_connection = None
-                                self.last_request_time = None
-                                print("[QB Manager] Disconnected due to inactivity")
-                            except Exception as e:
-                                print(f"[QB Manager] Error during idle disconnect: {e}")
+                    # Check for idle timeout - disconnect sessions with no requests for idle_timeout seconds
+                    self._evict_idle_sessions()
 
                 except Exception as e:
                     print(f"[QB Manager] Error in main loop: {e}")
@@ -84,9 +148,35 @@ class QBConnectionManager:
             print("[QB Manager] Received interrupt signal")
         finally:
             self._cleanup()
-            pythoncom.CoUninitialize()
+            if pythoncom:
+                pythoncom.CoUninitialize()
             print("[QB Manager] Connection manager stopped")
 
+    def _next_deadline(self) -> float:
+        """
+        Get the time at which the main loop must wake up even without messages.
+
+        Returns:
+            Earliest of the heartbeat deadline, the idle-timeout deadline of each
+            open session, the retry time of each request backing off and (if
+            open) the end of the circuit breaker cooldown
+        """
+        deadline = self._last_heartbeat_time() + self.heartbeat_timeout
+        for last_used in self.session_last_used.values():
+            deadline = min(deadline, last_used + self.idle_timeout)
+        for message in self.retry_requests:
+            deadline = min(deadline, message['retry_at'])
+        # Only while open: once the cooldown is over, a past deadline would spin the loop
+        if self._breaker_is_open():
+            deadline = min(deadline, self.breaker_open_until)
+        return deadline
+
+    def _last_heartbeat_time(self) -> float:
+        """Get the time of the main app's latest heartbeat, from the shared value or the queue."""
+        if self.heartbeat is None:
+            return self.last_heartbeat
+        return max(self.last_heartbeat, self.heartbeat.value)
+
     def _handle_message(self, message: Dict[str, Any]):
         """
         Handle incoming message from main app.
@@ -106,25 +196,289 @@ class QBConnectionManager:
             self.running = False
 
         elif msg_type == 'disconnect':
-            # Explicit disconnect request
-            if self.qb_connection:
+            # Explicit disconnect request - closes every pooled session
+            if self.sessions:
                 print("[QB Manager] Explicit disconnect requested")
-                try:
-                    self.qb_connection.disconnect()
-                    self.connection_active = False
-                    self.qb_connection = None
-                    self.last_request_time = None
-                    print("[QB Manager] Disconnected successfully")
-                except Exception as e:
-                    print(f"[QB Manager] Error during disconnect: {e}")
+                for key in list(self.sessions):
+                    self._close_session(key)
 
         elif msg_type == 'request':
-            # QB request to execute
-            self._handle_request(message)
+            # QB request to execute - queued by priority class, served from the main loop
+            self._enqueue_request(message)
+
+        elif msg_type == 'stats':
+            # Telemetry snapshot - answered immediately, ahead of queued requests
+            try:
+                self.response_queue.put({
+                    'request_id': message.get('request_id'),
+                    'success': True,
+                    'stats': self.stats()
+                }, timeout=5.0)
+            except Exception as e:
+                print(f"[QB Manager] Error sending stats: {e}")
+
+        elif msg_type == 'shm_release':
+            # Main app has finished reading a shared memory response
+            name = message.get('name')
+            readers = self.shared_segment_readers.get(name, 1) - 1
+            if readers > 0:
+                # Coalesced response - other readers still have to read it
+                self.shared_segment_readers[name] = readers
+            else:
+                self.shared_segment_readers.pop(name, None)
+                segment = self.shared_segments.pop(name, None)
+                if segment:
+                    release_segment(segment)
 
         else:
             print(f"[QB Manager] Unknown message type: {msg_type}")
 
+    def _enqueue_request(self, message: Dict[str, Any]):
+        """
+        Queue a request in its priority class, or attach it to an identical queued query.
+
+        Byte-identical read-only requests for the same company file are executed
+        once and the response is sent to every caller, whether the first one is
+        still queued or already executing. Any mutating request closes all open
+        coalescing entries so later queries see its effects.
+        """
+        priority = message.get('priority')
+        if priority not in self.pending_requests:
+            priority = PRIORITY_INTERACTIVE
+        message['priority'] = priority
+
+        qbxml = message.get('qbxml')
+        if not _is_read_only(qbxml):
+            self.coalescing.clear()
+            self.pending_requests[priority].append((time.time(), message))
+            return
+
+        key = (message.get('company_file'), qbxml)
+        lead = self.coalescing.get(key)
+
+        # Join a request that is already executing, or one queued at the same or a more urgent class
+        if lead is not None and (lead.get('in_flight') or
+                                 PRIORITY_CLASSES.index(lead['priority']) <= PRIORITY_CLASSES.index(priority)):
+            lead['coalesced_ids'].append(message.get('request_id'))
+            lead['coalesced_at'].append(message.get('submitted_at', time.time()))
+            # The lead runs while any of its callers still waits
+            if lead.get('expires_at') is not None:
+                expires_at = message.get('expires_at')
+                lead['expires_at'] = None if expires_at is None else max(lead['expires_at'], expires_at)
+            self.coalesced_requests += 1
+            return
+
+        message['coalesce_key'] = key
+        message['coalesced_ids'] = []
+        message['coalesced_at'] = []  # Submission time of each coalesced_ids entry
+        self.coalescing[key] = message
+        self.pending_requests[priority].append((time.time(), message))
+
+    def _drain_messages(self):
+        """Take every message already waiting on the request queue without blocking."""
+        while True:
+            try:
+                message = self.request_queue.get_nowait()
+            except Empty:
+                return
+            self._handle_message(message)
+
+    def _drain_requests(self):
+        """
+        Queue the requests already waiting on the request queue without blocking.
+
+        Used while a request is executing: control messages (shutdown,
+        disconnect, stats, ...) are set aside for the main loop, so none of them
+        acts on the session the request is using.
+        """
+        while True:
+            try:
+                message = self.request_queue.get_nowait()
+            except Empty:
+                return
+            if message.get('type') == 'request':
+                self._enqueue_request(message)
+            else:
+                self.deferred_messages.append(message)
+
+    def _handle_deferred_messages(self):
+        """Handle the control messages set aside while a request executed."""
+        while self.deferred_messages and self.running:
+            self._handle_message(self.deferred_messages.popleft())
+
+    def _has_pending_requests(self) -> bool:
+        """Check whether any priority class has queued requests."""
+        return any(self.pending_requests.values())
+
+    def _next_request(self) -> Optional[Dict[str, Any]]:
+        """
+        Pick the next request to serve.
+
+        Each class starts at its rank (interactive 0, monitor 1, bulk 2) and the
+        request at the head of a class gains one rank for every aging_interval
+        seconds it has waited, so lower classes are never starved.
+
+        Requests whose caller has already timed out are dropped instead of
+        served (see _expire_request).
+
+        Returns:
+            Request message, or None if nothing is queued or the circuit breaker is open
+        """
+        if self._breaker_is_open():
+            return None
+
+        self._requeue_due_retries()
+
+        while True:
+            now = time.time()
+            best_class = None
+            best_score = None
+
+            for rank, priority in enumerate(PRIORITY_CLASSES):
+                queue = self.pending_requests[priority]
+                if not queue:
+                    continue
+                queued_at, _ = queue[0]
+                score = rank - (now - queued_at) / self.aging_interval
+                if best_score is None or score < best_score:
+                    best_class, best_score = priority, score
+
+            if best_class is None:
+                return None
+
+            queued_at, message = self.pending_requests[best_class].popleft()
+            expires_at = message.get('expires_at')
+            if expires_at is None or now < expires_at:
+                break
+            self._expire_request(message)
+
+        # Backoff before a retry counts as waiting, not as QuickBooks time
+        message['queued_at'] = queued_at
+        message['queue_wait'] = now - queued_at - (message.get('qb_time') or 0.0)
+        message['started_at'] = message.get('started_at', now)
+
+        # Stays open to duplicates until its response is sent (see _join_in_flight_duplicates)
+        message['in_flight'] = True
+
+        return message
+
+    def _requeue_due_retries(self):
+        """Put requests whose retry backoff is over back at the head of their class."""
+        now = time.time()
+        due = [message for message in self.retry_requests if message['retry_at'] <= now]
+        if not due:
+            return
+        self.retry_requests = [message for message in self.retry_requests if message['retry_at'] > now]
+        for message in reversed(due):
+            self.pending_requests[message['priority']].appendleft((message['queued_at'], message))
+
+    def _expire_request(self, message: Dict[str, Any]):
+        """
+        Drop a request every caller has stopped waiting for.
+
+        Running it anyway would, for an add, write a transaction nobody sees
+        the result of; a request held back by the circuit breaker is the usual
+        case.
+        """
+        self.expired_requests += 1
+        key = message.get('coalesce_key')
+        if key is not None and self.coalescing.get(key) is message:
+            del self.coalescing[key]
+        print(f"[QB Manager] Dropping request {message.get('request_id')} - its caller timed out")
+        self._fail_request(message, 'Request expired before the connection manager could run it')
+
+    def _fail_request(self, message: Dict[str, Any], error: str, timeout: float = 5.0):
+        """Send a failure response to a request's caller and everyone coalesced with it."""
+        for recipient_id in [message.get('request_id')] + message.get('coalesced_ids', []):
+            try:
+                self.response_queue.put({
+                    'request_id': recipient_id,
+                    'success': False,
+                    'response': None,
+                    'error': error
+                }, timeout=timeout)
+            except Exception:
+                pass
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Get the number of queued requests per priority class."""
+        return {priority: len(queue) for priority, queue in self.pending_requests.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get a telemetry snapshot.
+
+        Returns:
+            Dict with per-request-type histograms (see ManagerTelemetry.snapshot),
+            queue depths, coalescing and connection state
+        """
+        stats = self.telemetry.snapshot()
+        stats.update({
+            'uptime': time.time() - self.started_at,
+            'queue_depths': self.queue_depths(),
+            'coalesced_requests': self.coalesced_requests,
+            'connection_active': bool(self.sessions),
+            'sessions': self.session_info(),
+            'shared_segments': len(self.shared_segments),
+            'retries': self.retries,
+            'expired_requests': self.expired_requests,
+            'reconnects': self.reconnects,
+            'circuit_breaker': self.breaker_state(),
+            'consecutive_failures': self.consecutive_failures,
+            'breaker_trips': self.breaker_trips,
+        })
+        return stats
+
+    def session_info(self) -> Dict[str, float]:
+        """Get the open sessions as company file -> seconds idle ('' = the currently open file)."""
+        now = time.time()
+        return {key: now - self.session_last_used.get(key, now) for key in self.sessions}
+
+    def _breaker_is_open(self) -> bool:
+        """Check whether the circuit breaker is pausing the request queue."""
+        return self.breaker_open_until is not None and time.time() < self.breaker_open_until
+
+    def breaker_state(self) -> str:
+        """
+        Get the circuit breaker state.
+
+        Returns:
+            'closed' (serving normally), 'open' (queue paused) or 'half-open'
+            (cooldown over, the next request decides whether it closes again)
+        """
+        if self.consecutive_failures < self.breaker_threshold:
+            return 'closed'
+        return 'open' if self._breaker_is_open() else 'half-open'
+
+    def _record_outcome(self, error_class: Optional[str]):
+        """
+        Update the circuit breaker after a request finishes.
+
+        Args:
+            error_class: None on success, otherwise the request's error class.
+                         Only transient and session errors count towards opening
+                         the breaker; fatal errors say nothing about availability.
+        """
+        if error_class is None:
+            if self.consecutive_failures >= self.breaker_threshold:
+                print("[QB Manager] Circuit breaker closed - QuickBooks is responding again")
+            self.consecutive_failures = 0
+            self.breaker_open_until = None
+            self.breaker_reopens = 0
+            return
+
+        if error_class not in (ERROR_TRANSIENT, ERROR_SESSION):
+            return
+
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.breaker_threshold:
+            cooldown = min(self.breaker_max_cooldown, self.breaker_cooldown * 2 ** self.breaker_reopens)
+            self.breaker_open_until = time.time() + cooldown
+            self.breaker_reopens += 1
+            self.breaker_trips += 1
+            print(f"[QB Manager] Circuit breaker open after {self.consecutive_failures} failed requests - "
+                  f"pausing queue for {cooldown:.1f}s")
+
     def _handle_request(self, message: Dict[str, Any]):
         """
         Handle QuickBooks request using persistent connection.
@@ -135,78 +489,303 @@ class QBConnectionManager:
         request_id = message.get('request_id')
         qbxml = message.get('qbxml')
         company_file = message.get('company_file')
+        coalesced_ids = message.get('coalesced_ids', [])
 
         response = {
             'request_id': request_id,
             'success': False,
             'response': None,
-            'error': None
+            'error': None,
+            'queue_wait': message.get('queue_wait', 0.0),
+            'qb_time': message.get('qb_time'),
+            'queue_depths': self.queue_depths()
         }
+        response_size = None
 
         try:
-            # Create persistent connection if it doesn't exist
-            if not self.qb_connection:
-                print(f"[QB Manager] Creating new QB connection")
-                self.qb_connection = QBConnection()
-                self.qb_connection.connect(company_file)
-                self.connection_active = True
-
-            # Update last request time for idle timeout tracking
-            self.last_request_time = time.time()
-
-            # Reuse existing connection for request
-            qb_response = self.qb_connection.send_request(qbxml)
+            qb_response = self._send_with_retry(qbxml, company_file, response)
+            response_size = len(qb_response)
+            self._join_in_flight_duplicates(message)
 
             response['success'] = True
-            response['response'] = qb_response
+            response['response'] = self._export_response(qb_response, readers=1 + len(coalesced_ids))
+            self._record_outcome(None)
 
         except Exception as e:
+            if self._schedule_retry(message, e, response['qb_time']):
+                return
+
             response['success'] = False
             response['error'] = str(e)
             print(f"[QB Manager] Error executing request {request_id}: {e}")
+            self._join_in_flight_duplicates(message)
+
+            error_class = classify_qb_error(e)
+            self._record_outcome(error_class)
+
+            # QuickBooks was only busy - keep the session for the next request.
+            # Otherwise disconnect and cleanup connection for next request
+            if error_class != ERROR_TRANSIENT:
+                self._drop_session(_session_key(company_file))
+
+        self.telemetry.record_request(qbxml, response['queue_wait'], response['qb_time'],
+                                      response_size, response['success'])
+
+        # Send response back to main app (once per coalesced caller)
+        recipients = [(request_id, response)]
+        for recipient_id, joined_at in zip(coalesced_ids, message.get('coalesced_at', [])):
+            recipients.append((recipient_id, self._coalesced_response(response, message, joined_at)))
+
+        for recipient_id, recipient_response in recipients:
+            try:
+                self.response_queue.put({**recipient_response, 'request_id': recipient_id}, timeout=5.0)
+            except Exception as e:
+                print(f"[QB Manager] Error sending response: {e}")
+
+    def _coalesced_response(self, response: Dict[str, Any], message: Dict[str, Any],
+                            joined_at: float) -> Dict[str, Any]:
+        """
+        Get the response for a caller that joined a request, timed from its own submission.
+
+        A caller that joined while the request was queued waited until it
+        started; one that joined while it executed only waited for the rest of
+        ProcessRequest. Reporting the lead's timings instead would skew the
+        caller's ipc_ms.
+        """
+        started_at = message.get('started_at', joined_at)
+        late_by = max(0.0, joined_at - started_at)
+        qb_time = response['qb_time']
+        return {
+            **response,
+            'queue_wait': max(0.0, started_at - joined_at),
+            'qb_time': None if qb_time is None else max(0.0, qb_time - late_by)
+        }
+
+    def _join_in_flight_duplicates(self, message: Dict[str, Any]):
+        """
+        Attach identical queries that arrived while a request executed, then close it to new ones.
+
+        The loop doesn't read the request queue during ProcessRequest (or retry
+        backoff), so duplicates sent meanwhile are still waiting there. Reading
+        them now adds them to the request's coalesced_ids; whatever arrives
+        after this executes on its own. Only requests are read here (see
+        _drain_requests).
+        """
+        key = message.get('coalesce_key')
+        if key is None:
+            return
+
+        self._drain_requests()
+        if self.coalescing.get(key) is message:
+            del self.coalescing[key]
+
+    def _schedule_retry(self, message: Dict[str, Any], error: Exception, qb_time: Optional[float]) -> bool:
+        """
+        Set a request that hit a transient error (QuickBooks busy) aside for a retry.
+
+        The request waits out an exponential backoff in retry_requests rather
+        than in a sleep, so the loop keeps handling heartbeats, shutdown and
+        other requests meanwhile; _next_deadline wakes it when the retry is due.
+        It stays open to identical queries, which join it as if it were executing.
+
+        Returns:
+            Whether the request will be retried (False: out of retries or not transient)
+        """
+        attempt = message.get('attempt', 0)
+        if classify_qb_error(error) != ERROR_TRANSIENT or attempt >= self.max_retries:
+            return False
+
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt)
+        message['attempt'] = attempt + 1
+        message['qb_time'] = qb_time
+        message['retry_at'] = time.time() + delay
+        self.retries += 1
+        print(f"[QB Manager] QuickBooks busy, retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        self.retry_requests.append(message)
+        return True
+
+    def _send_with_retry(self, qbxml: str, company_file: Optional[str], response: Dict[str, Any]) -> str:
+        """
+        Send a request on the company file's pooled session, recovering from session errors.
+
+        After a session-level error the session is reopened once and read-only
+        requests are resent; a mutating request may already have been applied,
+        so it fails instead. Transient errors are raised for _schedule_retry.
+
+        Args:
+            qbxml: QBXML request string
+            company_file: Company file to open if there is no connection
+            response: Response dict; 'qb_time' accumulates time spent in
+                      ProcessRequest
 
-            # On error, disconnect and cleanup connection for next request
-            if self.qb_connection:
+        Returns:
+            QBXML response string
+
+        Raises:
+            Exception: The last error once retries are exhausted or it is not retryable
+        """
+        key = _session_key(company_file)
+        reconnected = False
+
+        while True:
+            try:
+                connection = self._get_session(key, company_file)
+
+                # Update last request time for idle timeout tracking
+                self.session_last_used[key] = time.time()
+
+                request_started = time.perf_counter()
                 try:
-                    self.qb_connection.disconnect()
-                except:
-                    pass
-                self.qb_connection = None
-                self.connection_active = False
+                    return connection.send_request(qbxml)
+                finally:
+                    response['qb_time'] = (response['qb_time'] or 0.0) + time.perf_counter() - request_started
+
+            except Exception as e:
+                error_class = classify_qb_error(e)
+
+                if error_class == ERROR_SESSION and not reconnected and _is_read_only(qbxml):
+                    reconnected = True
+                    self.reconnects += 1
+                    print(f"[QB Manager] Session lost ({e}), reconnecting")
+                    self._drop_session(key)
+                    continue
 
-        # Send response back to main app
+                raise
+
+    def _get_session(self, key: str, company_file: Optional[str]) -> QBConnection:
+        """
+        Get the pooled session for a company file, opening it if needed.
+
+        Opening a session when the pool is full closes the least recently used one.
+
+        Args:
+            key: Session key (see _session_key)
+            company_file: Company file path to open (None = currently open file)
+
+        Returns:
+            Connected QBConnection
+        """
+        connection = self.sessions.get(key)
+        if connection is not None:
+            self.sessions.move_to_end(key)
+            return connection
+
+        while len(self.sessions) >= max(1, self.max_sessions):
+            lru_key = next(iter(self.sessions))
+            print(f"[QB Manager] Session pool full - closing least recently used session ({lru_key or 'open file'})")
+            self._close_session(lru_key)
+
+        print(f"[QB Manager] Creating new QB connection ({company_file or 'open file'})")
+        connect_started = time.perf_counter()
+        connection = create_connection(self.backend_config)
         try:
-            self.response_queue.put(response, timeout=5.0)
+            connection.connect(company_file)
+        except Exception:
+            self.telemetry.record_connect(time.perf_counter() - connect_started, success=False)
+            raise
+        self.telemetry.record_connect(time.perf_counter() - connect_started, success=True)
+
+        self.sessions[key] = connection
+        self.session_last_used[key] = time.time()
+        return connection
+
+    def _close_session(self, key: str):
+        """Disconnect a pooled session and remove it from the pool."""
+        connection = self.sessions.pop(key, None)
+        self.session_last_used.pop(key, None)
+        if connection is None:
+            return
+        try:
+            connection.disconnect()
+            print(f"[QB Manager] Disconnected session ({key or 'open file'})")
         except Exception as e:
-            print(f"[QB Manager] Error sending response: {e}")
+            print(f"[QB Manager] Error disconnecting session ({key or 'open file'}): {e}")
+
+    def _drop_session(self, key: str):
+        """Remove a session that failed from the pool, ignoring disconnect errors."""
+        connection = self.sessions.pop(key, None)
+        self.session_last_used.pop(key, None)
+        if connection is not None:
+            try:
+                connection.disconnect()
+            except Exception:
+                pass
+
+    def _evict_idle_sessions(self):
+        """Disconnect every session that has had no requests for idle_timeout seconds."""
+        now = time.time()
+        for key, last_used in list(self.session_last_used.items()):
+            idle_time = now - last_used
+            if idle_time > self.idle_timeout:
+                print(f"[QB Manager] Idle timeout ({idle_time:.1f}s) - disconnecting session ({key or 'open file'})")
+                self._close_session(key)
+
+    def _export_response(self, qb_response: str, readers: int = 1):
+        """
+        Move a large response into shared memory.
+
+        Args:
+            qb_response: QBXML response string
+            readers: Number of callers that will read (and release) the response
+
+        Returns:
+            SharedPayload descriptor for large responses, otherwise the string itself
+        """
+        try:
+            payload, segment = export_payload(qb_response, self.shm_threshold)
+        except OSError as e:
+            # Shared memory unavailable or exhausted - fall back to the queue
+            print(f"[QB Manager] Shared memory export failed, sending inline: {e}")
+            return qb_response
+
+        if segment:
+            self.shared_segments[segment.name] = segment
+            self.shared_segment_readers[segment.name] = readers
+        return payload
 
     def _cleanup(self):
         """Clean up resources before exit."""
         print("[QB Manager] Cleaning up resources...")
 
-        # Close persistent QB connection
-        if self.qb_connection:
+        # Fail requests that were still waiting to be served (or retried)
+        waiting = [message for queue in self.pending_requests.values() for _, message in queue]
+        waiting.extend(self.retry_requests)
+        for queue in self.pending_requests.values():
+            queue.clear()
+        self.retry_requests = []
+        for message in waiting:
+            self._fail_request(message, 'Connection manager stopped before the request was processed', timeout=1.0)
+
+        # Destroy shared memory responses the main app never released
+        for segment in self.shared_segments.values():
             try:
-                print("[QB Manager] Disconnecting from QuickBooks...")
-                self.qb_connection.disconnect()
-                self.connection_active = False
-                self.qb_connection = None
-                print("[QB Manager] Disconnected successfully")
+                release_segment(segment)
             except Exception as e:
-                print(f"[QB Manager] Error disconnecting: {e}")
+                print(f"[QB Manager] Error releasing shared memory: {e}")
+        self.shared_segments.clear()
+        self.shared_segment_readers.clear()
+
+        # Close pooled QB sessions
+        if self.sessions:
+            print("[QB Manager] Disconnecting from QuickBooks...")
+            for key in list(self.sessions):
+                self._close_session(key)
 
         print("[QB Manager] Cleanup complete")
 
 
-def run_connection_manager(request_queue: Queue, response_queue: Queue):
+def run_connection_manager(request_queue: Queue, response_queue: Queue,
+                           backend_config: Optional[Dict[str, Any]] = None, heartbeat=None):
     """
     Entry point for connection manager process.
 
     Args:
         request_queue: Queue to receive requests
         response_queue: Queue to send responses
+        backend_config: QuickBooks backend settings (see create_connection)
+        heartbeat: Shared heartbeat timestamp (see QBConnectionManager)
     """
-    manager = QBConnectionManager(request_queue, response_queue)
+    manager = QBConnectionManager(request_queue, response_queue, backend_config, heartbeat)
     manager.run()
 
 
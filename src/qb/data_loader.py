@@ -5,13 +5,25 @@ Handles QuickBooks data loading operations with pure business logic.
 Separated from UI/threading concerns for better testability and maintainability.
 """
 
-from typing import Dict, List, Any
+from typing import Callable, Dict, Iterator, List, Any
 from .ipc_client import QBIPCClient
 from .connection import QBConnectionError
 from .xml_builder import QBXMLBuilder
 from .xml_parser import QBXMLParser
 
 
+# Records per page for iterator-based list loads
+LIST_PAGE_SIZE = 500
+
+# Small reference lists load_all fetches in one envelope (customers and items are paged):
+# requestID (also the parsed data key and result key) -> query builder
+REFERENCE_QUERIES = {
+    'terms': QBXMLBuilder.build_terms_query,
+    'classes': QBXMLBuilder.build_class_query,
+    'accounts': QBXMLBuilder.build_account_query,
+}
+
+
 class DataLoader:
     """
     Handles QuickBooks data loading operations.
@@ -37,12 +49,9 @@ class DataLoader:
             # Build request
             request = QBXMLBuilder.build_item_query()
 
-            # Execute QB call
+            # Execute QB call and parse (large lists are parsed straight from shared memory)
             client = QBIPCClient()
-            response_xml = client.execute_request(request)
-
-            # Parse response
-            parser_result = QBXMLParser.parse_response(response_xml)
+            parser_result = client.execute_and_parse(request, QBXMLParser.parse_response)
 
             if not parser_result['success']:
                 return {
@@ -89,12 +98,9 @@ class DataLoader:
             # Build request
             request = QBXMLBuilder.build_terms_query()
 
-            # Execute QB call
+            # Execute QB call and parse (large lists are parsed straight from shared memory)
             client = QBIPCClient()
-            response_xml = client.execute_request(request)
-
-            # Parse response
-            parser_result = QBXMLParser.parse_response(response_xml)
+            parser_result = client.execute_and_parse(request, QBXMLParser.parse_response)
 
             if not parser_result['success']:
                 return {
@@ -141,12 +147,9 @@ class DataLoader:
             # Build request
             request = QBXMLBuilder.build_class_query()
 
-            # Execute QB call
+            # Execute QB call and parse (large lists are parsed straight from shared memory)
             client = QBIPCClient()
-            response_xml = client.execute_request(request)
-
-            # Parse response
-            parser_result = QBXMLParser.parse_response(response_xml)
+            parser_result = client.execute_and_parse(request, QBXMLParser.parse_response)
 
             if not parser_result['success']:
                 return {
@@ -196,12 +199,9 @@ class DataLoader:
             # Build request
             request = QBXMLBuilder.build_account_query()
 
-            # Execute QB call
+            # Execute QB call and parse (large lists are parsed straight from shared memory)
             client = QBIPCClient()
-            response_xml = client.execute_request(request)
-
-            # Parse response
-            parser_result = QBXMLParser.parse_response(response_xml)
+            parser_result = client.execute_and_parse(request, QBXMLParser.parse_response)
 
             if not parser_result['success']:
                 return {
@@ -258,12 +258,9 @@ class DataLoader:
             # Build request
             request = QBXMLBuilder.build_customer_query()
 
-            # Execute QB call
+            # Execute QB call and parse (large lists are parsed straight from shared memory)
             client = QBIPCClient()
-            response_xml = client.execute_request(request)
-
-            # Parse response
-            parser_result = QBXMLParser.parse_response(response_xml)
+            parser_result = client.execute_and_parse(request, QBXMLParser.parse_response)
 
             if not parser_result['success']:
                 return {
@@ -301,3 +298,225 @@ class DataLoader:
                 'count': 0,
                 'error': f"Failed to load customers: {str(e)}"
             }
+
+    @staticmethod
+    def load_all(filter_deposit_accounts: bool = True,
+                 page_size: int = LIST_PAGE_SIZE) -> Dict[str, Dict[str, Any]]:
+        """
+        Load customers, items, terms, classes and accounts.
+
+        The terms, classes and accounts queries go to QuickBooks in one
+        continueOnError envelope, parsed in one pass where it lands. Customers and
+        items can run to many thousands of records, so they are paged through
+        QBXML iterators instead of being returned in a single response. Each list
+        gets its own result, so a failed query doesn't hide the others. An empty
+        list (status 1) loads as zero records.
+
+        Args:
+            filter_deposit_accounts: If True, filter accounts to only Bank and OtherCurrentAsset types
+            page_size: Maximum customers or items per iterator page
+
+        Returns:
+            dict: Result dict per list, keyed 'customers', 'items', 'terms', 'classes' and
+                  'accounts' (customers are marked created_by_app = False, as in load_customers)
+        """
+        results = {
+            'customers': DataLoader._collect_pages(DataLoader.iter_customer_pages(page_size)),
+            'items': DataLoader._collect_pages(DataLoader.iter_item_pages(page_size)),
+        }
+
+        try:
+            request = QBXMLBuilder.build_batch_request(
+                [build_query() for build_query in REFERENCE_QUERIES.values()],
+                request_ids=list(REFERENCE_QUERIES)
+            )
+
+            client = QBIPCClient()
+            responses = client.execute_and_parse(request, QBXMLParser.parse_batch_response)
+
+        except QBConnectionError as e:
+            error = f"QuickBooks connection error: {str(e)}"
+            results.update({name: DataLoader._failed(error) for name in REFERENCE_QUERIES})
+            return results
+        except Exception as e:
+            results.update({name: DataLoader._failed(f"Failed to load {name}: {str(e)}") for name in REFERENCE_QUERIES})
+            return results
+
+        for name in REFERENCE_QUERIES:
+            parser_result = responses.get(name)
+
+            if parser_result is None:
+                results[name] = DataLoader._failed(f"No response to the {name} query")
+                continue
+            if parser_result['success']:
+                records = parser_result['data'].get(name, [])
+            elif parser_result.get('status_code') == '1':
+                records = []
+            else:
+                results[name] = DataLoader._failed(parser_result.get('error', 'Unknown parsing error'))
+                continue
+
+            results[name] = {
+                'success': True,
+                'data': records,
+                'count': len(records),
+                'error': None
+            }
+
+        accounts = results['accounts']
+        if filter_deposit_accounts and accounts['success']:
+            accounts['data'] = [
+                acc for acc in accounts['data']
+                if acc.get('account_type') in ['Bank', 'OtherCurrentAsset']
+            ]
+            accounts['count'] = len(accounts['data'])
+
+        return results
+
+    @staticmethod
+    def _collect_pages(pages: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+        """Gather the pages of a paged load into one result dict (failed if any page failed)."""
+        records = []
+        for page in pages:
+            if not page['success']:
+                return DataLoader._failed(page['error'])
+            records.extend(page['data'])
+
+        return {
+            'success': True,
+            'data': records,
+            'count': len(records),
+            'error': None
+        }
+
+    @staticmethod
+    def _failed(error: str) -> Dict[str, Any]:
+        """Build a failed result dict."""
+        return {
+            'success': False,
+            'data': [],
+            'count': 0,
+            'error': error
+        }
+
+    @staticmethod
+    def iter_customer_pages(page_size: int = LIST_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Load customers from QuickBooks one page at a time using a QBXML iterator.
+
+        Each page is marked with created_by_app = False, like load_customers.
+
+        Args:
+            page_size: Maximum customers per page
+
+        Yields:
+            dict: Result per page with success status, data (customers in this page), count,
+                  remaining (customers still to come), and error. Stops after a failed page.
+        """
+        for page in DataLoader._iter_pages(QBXMLBuilder.build_customer_query, 'customers', page_size):
+            for customer in page['data']:
+                customer['created_by_app'] = False
+            yield page
+
+    @staticmethod
+    def iter_item_pages(page_size: int = LIST_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Load items from QuickBooks one page at a time using a QBXML iterator.
+
+        Args:
+            page_size: Maximum items per page
+
+        Yields:
+            dict: Result per page with success status, data (items in this page), count,
+                  remaining (items still to come), and error. Stops after a failed page.
+        """
+        yield from DataLoader._iter_pages(QBXMLBuilder.build_item_query, 'items', page_size)
+
+    @staticmethod
+    def _iter_pages(build_query: Callable[..., str], data_key: str,
+                    page_size: int) -> Iterator[Dict[str, Any]]:
+        """
+        Drive a QBXML iterator (iterator="Start", then "Continue") to the end of a list.
+
+        Args:
+            build_query: QBXMLBuilder list query method accepting max_returned/iterator/iterator_id
+            data_key: Key of the record list in the parsed response data (e.g. 'customers')
+            page_size: MaxReturned for each page
+
+        Yields:
+            dict: Standard result dict per page, plus 'remaining'
+
+        If the load ends early (a failed page, or the caller closing the
+        generator) the QuickBooks iterator is stopped so it doesn't linger.
+        """
+        client = QBIPCClient()
+        iterator_id = None
+        finished = False
+
+        try:
+            while True:
+                if iterator_id:
+                    request = build_query(max_returned=page_size, iterator='Continue', iterator_id=iterator_id)
+                else:
+                    request = build_query(max_returned=page_size, iterator='Start')
+
+                parser_result = client.execute_and_parse(request, QBXMLParser.parse_response)
+
+                if not parser_result['success']:
+                    # Status 1: the list is empty - not an error
+                    if parser_result.get('status_code') == '1':
+                        yield {'success': True, 'data': [], 'count': 0, 'remaining': 0, 'error': None}
+                    else:
+                        yield {
+                            'success': False,
+                            'data': [],
+                            'count': 0,
+                            'remaining': 0,
+                            'error': parser_result.get('error', 'Unknown parsing error')
+                        }
+                    return
+
+                data = parser_result['data']
+                records = data.get(data_key, [])
+                remaining = data.get('iterator_remaining_count', 0)
+                iterator_id = data.get('iterator_id')
+
+                yield {
+                    'success': True,
+                    'data': records,
+                    'count': len(records),
+                    'remaining': remaining,
+                    'error': None
+                }
+
+                if not remaining or not iterator_id:
+                    finished = True
+                    return
+
+        except QBConnectionError as e:
+            yield {
+                'success': False,
+                'data': [],
+                'count': 0,
+                'remaining': 0,
+                'error': f"QuickBooks connection error: {str(e)}"
+            }
+        except Exception as e:
+            yield {
+                'success': False,
+                'data': [],
+                'count': 0,
+                'remaining': 0,
+                'error': f"Failed to load {data_key}: {str(e)}"
+            }
+        finally:
+            if iterator_id and not finished:
+                DataLoader._stop_iterator(client, build_query, iterator_id)
+
+    @staticmethod
+    def _stop_iterator(client: QBIPCClient, build_query: Callable[..., str], iterator_id: str):
+        """Release an unfinished QBXML iterator (iterator="Stop"); failures are only logged."""
+        try:
+            client.execute_request(build_query(iterator='Stop', iterator_id=iterator_id))
+        except Exception as e:
+            print(f"[DataLoader] Failed to stop iterator {iterator_id}: {e}")
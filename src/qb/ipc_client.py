@@ -5,20 +5,49 @@ Drop-in replacement for QBConnection that communicates with
 the connection manager process via multiprocessing queues.
 """
 
+import asyncio
+import os
 import time
 import uuid
 import threading
-from multiprocessing import Queue, Process
-from typing import Optional
+from collections import deque
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
+from multiprocessing import Queue, Process, Value, resource_tracker
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator, Union
 from queue import Empty
+from .shm_transport import SharedPayload, open_payload, read_text
+from .xml_parser import QBXMLParser
+from .request_priority import PRIORITY_INTERACTIVE, PRIORITY_BULK
+from .telemetry import Histogram, LATENCY_BUCKETS_MS
 
 
+# Requests submit_many keeps queued at the connection manager at once
+PIPELINE_WINDOW = 16
+
 # Global references to manager process and queues
 _manager_process: Optional[Process] = None
 _request_queue: Optional[Queue] = None
 _response_queue: Optional[Queue] = None
 _heartbeat_thread: Optional[threading.Thread] = None
 _heartbeat_stop_flag = False
+_heartbeat_value = None  # Shared Value('d') stamped with time.time(), read by the manager
+
+# Response routing: request_id -> Future waiting for that response
+_pending_requests: Dict[str, Future] = {}
+_pending_lock = threading.Lock()
+_dispatcher_thread: Optional[threading.Thread] = None
+_dispatcher_stop_flag = False
+
+# Per-priority queue depth reported with the most recent response
+_last_queue_depths: Dict[str, int] = {}
+
+# Client-side timings: IPC overhead (round trip minus manager queue wait and
+# QuickBooks time) and response parsing
+_client_timings = {
+    'ipc_ms': Histogram(LATENCY_BUCKETS_MS),
+    'parse_ms': Histogram(LATENCY_BUCKETS_MS),
+}
+_client_timings_lock = threading.Lock()
 
 
 class QBIPCClient:
@@ -29,19 +58,26 @@ class QBIPCClient:
     """
 
     @staticmethod
-    def execute_request(qbxml_request: str, company_file: Optional[str] = None) -> str:
+    def submit_request(qbxml_request: str, company_file: Optional[str] = None,
+                       priority: str = PRIORITY_INTERACTIVE, timeout: Optional[float] = None) -> Future:
         """
-        Execute a QBXML request via the connection manager process.
+        Send a QBXML request to the connection manager without waiting.
+
+        The returned future resolves to the manager's raw response dict once
+        the response dispatcher thread receives it.
 
         Args:
             qbxml_request: QBXML request string
             company_file: Optional path to company file
+            priority: Scheduling class (PRIORITY_INTERACTIVE, PRIORITY_MONITOR or PRIORITY_BULK)
+            timeout: Seconds the caller will wait; the manager drops the request
+                     instead of running it once this has passed (None = never)
 
         Returns:
-            QBXML response string
+            Future resolving to the response dict
 
         Raises:
-            Exception: If request fails or times out
+            Exception: If the manager is not running or the request cannot be sent
         """
         global _request_queue, _response_queue
 
@@ -52,45 +88,175 @@ class QBIPCClient:
         request_id = str(uuid.uuid4())
 
         # Create request message
+        submitted_at = time.time()
         request = {
             'type': 'request',
             'request_id': request_id,
             'qbxml': qbxml_request,
-            'company_file': company_file
+            'company_file': company_file,
+            'priority': priority,
+            'submitted_at': submitted_at,  # Wall clock, comparable with the manager's
+            'expires_at': None if timeout is None else submitted_at + timeout
         }
 
+        # Register before sending so the response can never arrive unclaimed
+        future = Future()
+        future.request_id = request_id
+        future.submitted_at = time.perf_counter()
+        with _pending_lock:
+            _pending_requests[request_id] = future
+
         # Send request to manager
         try:
             _request_queue.put(request, timeout=5.0)
         except Exception as e:
+            _discard_pending(request_id)
             raise Exception(f"Failed to send request to connection manager: {e}")
 
-        # Wait for response with timeout
-        timeout = 30.0  # 30 seconds
-        start_time = time.time()
+        return future
+
+    @staticmethod
+    def execute_request(qbxml_request: str, company_file: Optional[str] = None,
+                        timeout: float = 30.0, priority: str = PRIORITY_INTERACTIVE) -> str:
+        """
+        Execute a QBXML request via the connection manager process.
+
+        Safe to call from several threads at once: each call waits on its own
+        future, which the response dispatcher thread resolves by request_id.
+
+        Args:
+            qbxml_request: QBXML request string
+            company_file: Optional path to company file
+            timeout: Seconds to wait for the response
+            priority: Scheduling class (PRIORITY_INTERACTIVE, PRIORITY_MONITOR or PRIORITY_BULK)
+
+        Returns:
+            QBXML response string
+
+        Raises:
+            Exception: If request fails or times out
+        """
+        future = QBIPCClient.submit_request(qbxml_request, company_file, priority, timeout)
+        return _wait_for_response(future, timeout)
+
+    @staticmethod
+    def execute_and_parse(qbxml_request: str, parse: Optional[Callable[[Any], Any]] = None,
+                          company_file: Optional[str] = None, timeout: float = 30.0,
+                          priority: str = PRIORITY_INTERACTIVE) -> Any:
+        """
+        Execute a QBXML request and parse the response where it lands.
+
+        Large responses arrive in shared memory; this parses them straight from
+        the segment instead of first decoding them into a str.
+
+        Args:
+            qbxml_request: QBXML request string
+            parse: Parser taking str or a bytes-like buffer (default QBXMLParser.parse_response)
+            company_file: Optional path to company file
+            timeout: Seconds to wait for the response
+            priority: Scheduling class (PRIORITY_INTERACTIVE, PRIORITY_MONITOR or PRIORITY_BULK)
+
+        Returns:
+            Whatever parse returns
+
+        Raises:
+            Exception: If request fails or times out
+        """
+        parse = parse or QBXMLParser.parse_response
+
+        future = QBIPCClient.submit_request(qbxml_request, company_file, priority, timeout)
+        response = _wait_for_raw_response(future, timeout)
+
+        payload = response.get('response')
+        parse_started = time.perf_counter()
+
+        try:
+            if not isinstance(payload, SharedPayload):
+                return parse(_unwrap_response(response))
 
-        while time.time() - start_time < timeout:
             try:
-                response = _response_queue.get(timeout=0.5)
+                with open_payload(payload) as view:
+                    return parse(view)
+            finally:
+                _release_shared_payload(payload)
+        finally:
+            _record_client_timing('parse_ms', time.perf_counter() - parse_started)
 
-                # Check if this is our response
-                if response.get('request_id') == request_id:
-                    if response.get('success'):
-                        return response.get('response')
-                    else:
-                        error = response.get('error', 'Unknown error')
-                        raise Exception(f"QB request failed: {error}")
+    @staticmethod
+    def submit_many(qbxml_requests: Iterable[str], company_file: Optional[str] = None,
+                    window: int = PIPELINE_WINDOW, timeout: float = 30.0,
+                    priority: str = PRIORITY_BULK) -> Iterator[Union[str, Exception]]:
+        """
+        Pipeline QBXML requests through the connection manager.
 
-                else:
-                    # Not our response, put it back (shouldn't happen with sequential processing)
-                    _response_queue.put(response)
+        Keeps up to ``window`` requests queued at the manager so it never waits
+        on this process between requests. Requests are pulled from
+        ``qbxml_requests`` lazily, so a generator can build them on demand.
 
-            except Empty:
-                # No response yet, keep waiting
-                continue
+        Args:
+            qbxml_requests: QBXML request strings, in submission order
+            company_file: Optional path to company file
+            window: Maximum number of requests in flight at once
+            timeout: Seconds to wait for each response once it is next in line
+            priority: Scheduling class (defaults to PRIORITY_BULK)
 
-        # Timeout
-        raise Exception(f"Request timed out after {timeout} seconds")
+        Yields:
+            The QBXML response string for each request, in submission order,
+            or the Exception describing why that request failed
+        """
+        in_flight = deque()
+
+        try:
+            for qbxml_request in qbxml_requests:
+                in_flight.append(QBIPCClient.submit_request(qbxml_request, company_file, priority))
+
+                if len(in_flight) >= max(1, window):
+                    yield _collect_response(in_flight.popleft(), timeout)
+
+            while in_flight:
+                yield _collect_response(in_flight.popleft(), timeout)
+
+        finally:
+            # Caller stopped early - forget whatever is still outstanding
+            for future in in_flight:
+                _abandon_future(future)
+
+    @staticmethod
+    async def execute_request_async(qbxml_request: str, company_file: Optional[str] = None,
+                                    timeout: float = 30.0, priority: str = PRIORITY_INTERACTIVE) -> str:
+        """
+        Execute a QBXML request without blocking the event loop.
+
+        Many calls can be awaited concurrently from one event loop thread;
+        the connection manager still processes them one at a time.
+
+        Args:
+            qbxml_request: QBXML request string
+            company_file: Optional path to company file
+            timeout: Seconds to wait for the response
+            priority: Scheduling class (PRIORITY_INTERACTIVE, PRIORITY_MONITOR or PRIORITY_BULK)
+
+        Returns:
+            QBXML response string
+
+        Raises:
+            Exception: If request fails or times out
+        """
+        future = QBIPCClient.submit_request(qbxml_request, company_file, priority, timeout)
+        response = None
+
+        try:
+            response = await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise Exception(f"Request timed out after {timeout} seconds")
+        finally:
+            # Covers timeout and task cancellation as well as normal completion
+            if response is None:
+                _abandon_future(future)
+            else:
+                _discard_pending(future.request_id)
+
+        return _unwrap_response(response)
 
     def __enter__(self):
         """Context manager entry (no-op for IPC client)."""
@@ -100,10 +266,89 @@ class QBIPCClient:
         """Context manager exit (no-op for IPC client)."""
         return False
 
+    async def __aenter__(self):
+        """Async context manager entry (no-op for IPC client)."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit (no-op for IPC client)."""
+        return False
+
 
-def start_manager():
-    """Start the connection manager process and heartbeat thread."""
+def _discard_pending(request_id: str):
+    """Stop tracking a request; any response that arrives later is dropped."""
+    with _pending_lock:
+        _pending_requests.pop(request_id, None)
+
+
+def _wait_for_raw_response(future: Future, timeout: float) -> Dict[str, Any]:
+    """Block until a submitted request's response dict arrives."""
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        _abandon_future(future)
+        raise Exception(f"Request timed out after {timeout} seconds")
+    finally:
+        # Unregister so a late response is dropped by the dispatcher
+        _discard_pending(future.request_id)
+
+
+def _abandon_future(future: Future):
+    """
+    Give up on a submitted request without leaking its response.
+
+    A response that already landed on the future is released here; one still
+    in transit fails to land on the cancelled future and the dispatcher
+    releases it instead.
+    """
+    _discard_pending(future.request_id)
+
+    if future.cancel() or future.exception() is not None:
+        return
+
+    payload = future.result().get('response')
+    if isinstance(payload, SharedPayload):
+        _release_shared_payload(payload)
+
+
+def _wait_for_response(future: Future, timeout: float) -> str:
+    """Block until a submitted request's response arrives and unwrap it."""
+    return _unwrap_response(_wait_for_raw_response(future, timeout))
+
+
+def _collect_response(future: Future, timeout: float) -> Union[str, Exception]:
+    """Like _wait_for_response, but return the failure instead of raising it."""
+    try:
+        return _wait_for_response(future, timeout)
+    except Exception as e:
+        return e
+
+
+def _unwrap_response(response: Dict[str, Any]) -> str:
+    """Return the QBXML from a manager response dict or raise its error."""
+    if response.get('success'):
+        payload = response.get('response')
+        if isinstance(payload, SharedPayload):
+            try:
+                return read_text(payload)
+            finally:
+                _release_shared_payload(payload)
+        return payload
+    else:
+        error = response.get('error', 'Unknown error')
+        raise Exception(f"QB request failed: {error}")
+
+
+def start_manager(backend_config: Optional[Dict[str, Any]] = None):
+    """
+    Start the connection manager process, response dispatcher and heartbeat thread.
+
+    Args:
+        backend_config: QuickBooks backend settings passed to the manager
+                        (see AppConfig.get_qb_backend_settings)
+    """
     global _manager_process, _request_queue, _response_queue, _heartbeat_thread, _heartbeat_stop_flag
+    global _dispatcher_thread, _dispatcher_stop_flag, _heartbeat_value
 
     if _manager_process and _manager_process.is_alive():
         print("[IPC Client] Connection manager already running")
@@ -113,16 +358,29 @@ def start_manager():
     _request_queue = Queue()
     _response_queue = Queue()
 
+    # Heartbeats bypass the request queue so a backlog can't delay them
+    _heartbeat_value = Value('d', time.time())
+
+    # Start the resource tracker here so the manager inherits it: shared memory
+    # responses are registered by both processes and must be tracked only once
+    if os.name == 'posix':
+        resource_tracker.ensure_running()
+
     # Start connection manager process
     from .connection_manager import run_connection_manager
 
     _manager_process = Process(
         target=run_connection_manager,
-        args=(_request_queue, _response_queue),
+        args=(_request_queue, _response_queue, backend_config, _heartbeat_value),
         daemon=False  # Not daemon so it can cleanup properly
     )
     _manager_process.start()
 
+    # Start response dispatcher thread
+    _dispatcher_stop_flag = False
+    _dispatcher_thread = threading.Thread(target=_response_dispatch_loop, daemon=True)
+    _dispatcher_thread.start()
+
     # Start heartbeat thread
     _heartbeat_stop_flag = False
     _heartbeat_thread = threading.Thread(target=_heartbeat_loop, daemon=True)
@@ -148,6 +406,7 @@ def disconnect_qb():
 def stop_manager():
     """Stop the connection manager process gracefully."""
     global _manager_process, _request_queue, _heartbeat_stop_flag, _heartbeat_thread
+    global _dispatcher_stop_flag, _dispatcher_thread
 
     if not _manager_process or not _manager_process.is_alive():
         print("[IPC Client] Connection manager not running")
@@ -177,23 +436,83 @@ def stop_manager():
             _manager_process.terminate()
             _manager_process.join(timeout=2.0)
 
+    # Stop response dispatcher and fail anything still waiting
+    _dispatcher_stop_flag = True
+    if _dispatcher_thread:
+        _dispatcher_thread.join(timeout=2.0)
+
+    with _pending_lock:
+        orphaned = list(_pending_requests.values())
+        _pending_requests.clear()
+    for future in orphaned:
+        try:
+            future.set_exception(Exception("Connection manager stopped"))
+        except InvalidStateError:
+            pass
+
     print("[IPC Client] Connection manager stopped")
 
 
+def _release_shared_payload(payload: SharedPayload):
+    """Tell the connection manager it can destroy a shared memory response."""
+    global _request_queue
+
+    if _request_queue:
+        try:
+            _request_queue.put({'type': 'shm_release', 'name': payload.name}, timeout=1.0)
+        except Exception as e:
+            print(f"[IPC Client] Failed to release shared memory {payload.name}: {e}")
+
+
+def _response_dispatch_loop():
+    """Route responses from the connection manager to the future waiting for them."""
+    global _response_queue, _dispatcher_stop_flag, _last_queue_depths
+
+    while not _dispatcher_stop_flag:
+        try:
+            response = _response_queue.get(timeout=0.5)
+        except Empty:
+            continue
+        except (EOFError, OSError):
+            # Queue closed - manager is gone
+            break
+
+        if 'queue_depths' in response:
+            _last_queue_depths = response['queue_depths']
+
+        received_at = time.perf_counter()
+
+        with _pending_lock:
+            future = _pending_requests.pop(response.get('request_id'), None)
+
+        if future is None:
+            # Caller already timed out or gave up - drop the late response
+            if isinstance(response.get('response'), SharedPayload):
+                _release_shared_payload(response['response'])
+            continue
+
+        if 'qb_time' in response:
+            overhead = received_at - future.submitted_at - response['queue_wait'] - (response['qb_time'] or 0.0)
+            _record_client_timing('ipc_ms', max(0.0, overhead))
+
+        try:
+            future.set_result(response)
+        except InvalidStateError:
+            # Future was cancelled while the response was in transit - nobody will read it
+            if isinstance(response.get('response'), SharedPayload):
+                _release_shared_payload(response['response'])
+
+
 def _heartbeat_loop():
-    """Send periodic heartbeats to connection manager."""
-    global _request_queue, _heartbeat_stop_flag
+    """Stamp the shared heartbeat timestamp the connection manager watches."""
+    global _heartbeat_value, _heartbeat_stop_flag
 
     heartbeat_interval = 5.0  # Send heartbeat every 5 seconds
 
     while not _heartbeat_stop_flag:
         try:
-            if _request_queue:
-                heartbeat_msg = {
-                    'type': 'heartbeat',
-                    'timestamp': time.time()
-                }
-                _request_queue.put(heartbeat_msg, timeout=1.0)
+            if _heartbeat_value is not None:
+                _heartbeat_value.value = time.time()
 
         except Exception as e:
             print(f"[IPC Client] Error sending heartbeat: {e}")
@@ -202,6 +521,66 @@ def _heartbeat_loop():
         time.sleep(heartbeat_interval)
 
 
+def _record_client_timing(name: str, seconds: float):
+    """Add a client-side timing observation (see _client_timings)."""
+    with _client_timings_lock:
+        _client_timings[name].record(seconds * 1000)
+
+
+def get_manager_stats(timeout: float = 2.0) -> Dict[str, Any]:
+    """
+    Get a telemetry snapshot from the connection manager.
+
+    The manager answers stats requests ahead of any queued QuickBooks requests.
+
+    Args:
+        timeout: Seconds to wait for the snapshot
+
+    Returns:
+        Dict with per-request-type 'request_types' (queue_wait_ms, qb_time_ms and
+        response_bytes histograms, requests, errors), 'connect_ms', 'queue_depths',
+        'coalesced_requests', 'connection_active', 'sessions' (company file -> seconds
+        idle), 'uptime', and 'client' (this process's ipc_ms and parse_ms histograms)
+
+    Raises:
+        Exception: If the manager is not running or does not answer in time
+    """
+    global _request_queue
+
+    if not _request_queue:
+        raise Exception("Connection manager not started. Call start_manager() first.")
+
+    request_id = str(uuid.uuid4())
+    future = Future()
+    future.request_id = request_id
+    future.submitted_at = time.perf_counter()
+    with _pending_lock:
+        _pending_requests[request_id] = future
+
+    try:
+        _request_queue.put({'type': 'stats', 'request_id': request_id}, timeout=1.0)
+    except Exception as e:
+        _discard_pending(request_id)
+        raise Exception(f"Failed to request stats from connection manager: {e}")
+
+    stats = _wait_for_raw_response(future, timeout)['stats']
+
+    with _client_timings_lock:
+        stats['client'] = {name: histogram.snapshot() for name, histogram in _client_timings.items()}
+
+    return stats
+
+
+def get_queue_depths() -> Dict[str, int]:
+    """
+    Get the connection manager's per-priority queue depth.
+
+    Returns:
+        Dict of priority class -> queued requests, as of the most recent response
+    """
+    return dict(_last_queue_depths)
+
+
 def is_manager_alive() -> bool:
     """Check if connection manager is still running."""
     global _manager_process
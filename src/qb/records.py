@@ -0,0 +1,247 @@
+"""
+Compact record types for parsed QuickBooks entities.
+
+Loaded customers, items, accounts, terms and classes stay in AppState for
+the whole session, and linked transactions ride along in the payment_info
+of every monitored transaction. These classes keep their fields in
+__slots__ instead of a per-record dict, and intern the strings that repeat
+across records (names, account and transaction types, dates).
+
+Records read like the dicts the parser used to return: record['name'],
+record.get('email', ''), 'payment_method' in record, dict(record), and
+equality with a dict of the same content. Fields are also attributes
+(record.name). A field that was never set reads as a missing key, the way
+the optional keys of the old dicts did.
+
+Transaction query results (invoices, sales receipts) are LazyRecords
+instead: a view over the *Ret element that converts a field the first time
+it is read, since most consumers only look at a handful of them.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+# Returned by a LazyRecord field converter when the optional field is absent
+MISSING = object()
+
+
+def intern_text(value: Optional[str]) -> Optional[str]:
+    """Intern a string that repeats across records (None and '' pass through)."""
+    return sys.intern(value) if value else value
+
+
+class Record(Mapping):
+    """Base class for slotted records with read-only-dict access plus item assignment."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__slots__:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__slots__:
+            raise KeyError(f"{type(self).__name__} has no field '{key}'")
+        setattr(self, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self.__slots__:
+            if hasattr(self, name):
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__ and hasattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.__slots__:
+            return getattr(self, key, default)
+        return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get a plain dict copy (nested records included), e.g. for JSON."""
+        return {name: _plain(self[name]) for name in self}
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self)
+        return f"{type(self).__name__}({fields})"
+
+
+def _plain(value: Any) -> Any:
+    """Convert a field value for to_dict (records and lists of records become dicts)."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [entry.to_dict() if isinstance(entry, Record) else entry for entry in value]
+    return value
+
+
+class CustomerRecord(Record):
+    """A CustomerRet. created_by_app is only present once a loader sets it."""
+
+    __slots__ = ('list_id', 'name', 'full_name', 'email', 'is_active', 'balance', 'created_by_app')
+
+    def __init__(self, list_id: Optional[str], name: Optional[str], full_name: Optional[str],
+                 email: str, is_active: bool, balance: float):
+        self.list_id = list_id
+        self.name = intern_text(name)
+        self.full_name = intern_text(full_name)
+        self.email = email
+        self.is_active = is_active
+        self.balance = balance
+
+
+class ItemRecord(Record):
+    """An Item*Ret (type is the tag without 'Item'/'Ret', e.g. 'Service')."""
+
+    __slots__ = ('list_id', 'name', 'full_name', 'type', 'description', 'is_active')
+
+    def __init__(self, list_id: Optional[str], name: Optional[str], full_name: Optional[str],
+                 type: str, description: str, is_active: bool):
+        self.list_id = list_id
+        self.name = intern_text(name)
+        self.full_name = intern_text(full_name)
+        self.type = intern_text(type)
+        self.description = description
+        self.is_active = is_active
+
+
+class AccountRecord(Record):
+    """An AccountRet."""
+
+    __slots__ = ('list_id', 'name', 'full_name', 'account_type', 'balance', 'account_number')
+
+    def __init__(self, list_id: Optional[str], name: Optional[str], full_name: Optional[str],
+                 account_type: Optional[str], balance: float, account_number: Optional[str]):
+        self.list_id = list_id
+        self.name = intern_text(name)
+        self.full_name = intern_text(full_name)
+        self.account_type = intern_text(account_type)
+        self.balance = balance
+        self.account_number = account_number
+
+
+class TermsRecord(Record):
+    """A StandardTermsRet."""
+
+    __slots__ = ('list_id', 'name', 'is_active', 'std_due_days', 'std_discount_days', 'discount_pct')
+
+    def __init__(self, list_id: Optional[str], name: Optional[str], is_active: bool,
+                 std_due_days: Optional[str], std_discount_days: Optional[str], discount_pct: Optional[str]):
+        self.list_id = list_id
+        self.name = intern_text(name)
+        self.is_active = is_active
+        self.std_due_days = std_due_days
+        self.std_discount_days = std_discount_days
+        self.discount_pct = discount_pct
+
+
+class ClassRecord(Record):
+    """A ClassRet."""
+
+    __slots__ = ('list_id', 'name', 'full_name', 'is_active')
+
+    def __init__(self, list_id: Optional[str], name: Optional[str], full_name: Optional[str], is_active: bool):
+        self.list_id = list_id
+        self.name = intern_text(name)
+        self.full_name = intern_text(full_name)
+        self.is_active = is_active
+
+
+class LinkedTxnRecord(Record):
+    """A LinkedTxn of an invoice or charge. payment_method is only present when QuickBooks sent one."""
+
+    __slots__ = ('txn_id', 'txn_type', 'txn_date', 'ref_number', 'amount', 'payment_method')
+
+    def __init__(self, txn_id: Optional[str], txn_type: Optional[str], txn_date: Optional[str],
+                 ref_number: Optional[str], amount: Optional[str]):
+        self.txn_id = txn_id
+        self.txn_type = intern_text(txn_type)
+        self.txn_date = intern_text(txn_date)
+        self.ref_number = ref_number
+        self.amount = amount
+
+
+class LazyRecord(Record):
+    """
+    A record that converts the fields of its element on first access.
+
+    fields maps each key, in dict order, to a converter taking the element.
+    A converter returns MISSING for an optional field the element doesn't
+    have, which then reads as a missing key. Converted values are cached, and
+    keys can be assigned or added like a dict's.
+
+    The record keeps its element (and the element's whole document) alive
+    until materialize() is called, so pass it an element detached from a
+    large response tree.
+    """
+
+    __slots__ = ('_element', '_fields', '_values')
+
+    def __init__(self, element: Any, fields: Dict[str, Callable[[Any], Any]]):
+        self._element = element
+        self._fields = fields
+        self._values = {}
+
+    def __getitem__(self, key: str) -> Any:
+        values = self._values
+        if key in values:
+            value = values[key]
+        elif key in self._fields and self._element is not None:
+            value = values[key] = self._fields[key](self._element)
+        else:
+            raise KeyError(key)
+
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self._values[key] = value
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._fields:
+            if key in self:
+                yield key
+        for key in self._values:
+            if key not in self._fields:
+                yield key
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def materialize(self) -> 'LazyRecord':
+        """Convert every remaining field and drop the element."""
+        if self._element is not None:
+            values = self._values
+            for key, convert in self._fields.items():
+                if key not in values:
+                    values[key] = convert(self._element)
+            self._element = None
+        return self
+
+    def __reduce__(self):
+        # Elements don't pickle; send the converted fields as a plain dict
+        return dict, (self.to_dict(),)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{key}={self[key]!r}" for key in self)
+        return f"{type(self).__name__}({fields})"
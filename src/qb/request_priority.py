@@ -0,0 +1,18 @@
+"""
+Request priority classes for the QuickBooks connection manager.
+
+Shared by the IPC client (which tags each request) and the connection manager
+(which schedules queued requests by class).
+"""
+
+# User is waiting on the result (searches, data loads, connection checks)
+PRIORITY_INTERACTIVE = 'interactive'
+
+# Background monitoring and change verification
+PRIORITY_MONITOR = 'monitor'
+
+# Batch creation and bulk deletion
+PRIORITY_BULK = 'bulk'
+
+# Highest priority first
+PRIORITY_CLASSES = (PRIORITY_INTERACTIVE, PRIORITY_MONITOR, PRIORITY_BULK)
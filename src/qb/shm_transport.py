@@ -0,0 +1,103 @@
+"""
+Shared memory transport for large QBXML payloads.
+
+Full-list query responses can run to many megabytes. Rather than pickling them
+through the response queue, the connection manager writes them into a
+multiprocessing.shared_memory segment and sends only a SharedPayload
+descriptor. The app reads (or parses) the payload straight from the segment.
+
+Segment lifecycle:
+    1. Manager creates the segment and keeps its handle open
+    2. App attaches, reads, closes its handle
+    3. App sends a 'shm_release' message; manager closes and unlinks
+
+The manager has to hold its handle until step 3 because on Windows a
+segment is destroyed as soon as the last handle to it is closed.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Iterator, Optional, Tuple, Union
+
+
+# Payloads at or above this size (UTF-8 bytes) travel through shared memory
+SHM_THRESHOLD_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class SharedPayload:
+    """Queue-safe descriptor for a payload stored in a shared memory segment."""
+    name: str
+    size: int
+
+
+def export_payload(text: str, threshold: int = SHM_THRESHOLD_BYTES
+                   ) -> Tuple[Union[str, SharedPayload], Optional[shared_memory.SharedMemory]]:
+    """
+    Move a large payload into shared memory.
+
+    Args:
+        text: Payload to send
+        threshold: Minimum encoded size for shared memory to be used
+
+    Returns:
+        Tuple of (payload, segment). For small payloads this is (text, None).
+        Otherwise payload is a SharedPayload and segment is the creator's
+        handle, which must stay open until the reader releases it.
+    """
+    # Cheap lower bound first: UTF-8 never encodes a character in less than one byte
+    if len(text) < threshold:
+        return text, None
+
+    data = text.encode('utf-8')
+    if len(data) < threshold:
+        return text, None
+
+    segment = shared_memory.SharedMemory(create=True, size=len(data))
+    segment.buf[:len(data)] = data
+    return SharedPayload(segment.name, len(data)), segment
+
+
+def release_segment(segment: shared_memory.SharedMemory):
+    """Close and destroy a segment created by export_payload."""
+    try:
+        segment.close()
+    finally:
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+
+@contextmanager
+def open_payload(payload: SharedPayload) -> Iterator[memoryview]:
+    """
+    Attach to a shared payload and expose it as a read-only memoryview.
+
+    The view is only valid inside the with block; copy or parse it there.
+    """
+    segment = _attach(payload.name)
+    view = segment.buf[:payload.size].toreadonly()
+    try:
+        yield view
+    finally:
+        view.release()
+        segment.close()
+
+
+def read_text(payload: SharedPayload) -> str:
+    """Decode a shared payload into a str (one copy, straight from the segment)."""
+    with open_payload(payload) as view:
+        return str(view, 'utf-8')
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing segment without taking ownership of it."""
+    try:
+        # Python 3.13+
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Older Pythons register the segment with the resource tracker on attach;
+        # start_manager shares one tracker with the manager, so this is a no-op.
+        return shared_memory.SharedMemory(name=name)
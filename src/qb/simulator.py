@@ -0,0 +1,879 @@
+"""
+In-process QuickBooks Desktop simulator.
+
+Stateful stand-in for the QBXMLRP2 request processor. Answers the QBXML requests
+this tool sends (customers, invoices, sales receipts, statement charges, reference
+lists and deletes) from an in-memory company file, so the connection manager,
+workers and monitor can run and be benchmarked without QuickBooks or Windows.
+"""
+
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from lxml import etree
+
+from .connection import QBConnection, QBConnectionError, ERROR_SESSION
+
+
+# (statusCode, statusSeverity, statusMessage)
+STATUS_OK = ('0', 'Info', 'Status OK')
+STATUS_NO_MATCH = ('1', 'Info', 'A query request did not find a matching object in QuickBooks')
+
+# ItemTypeFilter value -> *Ret element name
+ITEM_TYPE_TAGS = {
+    'Service': 'ItemServiceRet',
+    'Inventory': 'ItemInventoryRet',
+    'NonInventory': 'ItemNonInventoryRet',
+    'OtherCharge': 'ItemOtherChargeRet',
+    'Discount': 'ItemDiscountRet',
+}
+
+# QBXML versions reported by HostQuery
+SUPPORTED_QBXML_VERSIONS = ['1.0', '1.1', '2.0', '2.1', '3.0', '4.0', '4.1', '5.0', '6.0', '7.0',
+                            '8.0', '9.0', '10.0', '11.0', '12.0', '13.0', '14.0', '15.0', '16.0']
+
+# TxnDelType / transaction kind -> *Ret element name
+TXN_RET_TAGS = {
+    'Invoice': 'InvoiceRet',
+    'SalesReceipt': 'SalesReceiptRet',
+    'Charge': 'ChargeRet',
+}
+
+
+def _status(code: str, severity: str, message: str) -> Tuple[str, str, str]:
+    """Build a status tuple for a *Rs element."""
+    return (code, severity, message)
+
+
+def _invalid_reference(list_name: str, ref: str, txn_name: str) -> Tuple[str, str, str]:
+    """Status returned when an Add request references a missing list element."""
+    return _status(
+        '3140', 'Error',
+        f'There is an invalid reference to QuickBooks {list_name} "{ref}" in the {txn_name}. '
+        'QuickBooks error message: Invalid argument. The specified record does not exist in the list.'
+    )
+
+
+def _to_element(tag: str, fields: Dict[str, Any]) -> etree.Element:
+    """
+    Convert a stored entity to a QBXML element.
+
+    Values are serialized in insertion order: str -> text element,
+    dict -> nested element, list -> repeated nested elements.
+    """
+    elem = etree.Element(tag)
+    for name, value in fields.items():
+        if value is None:
+            continue
+        if isinstance(value, dict):
+            elem.append(_to_element(name, value))
+        elif isinstance(value, list):
+            for entry in value:
+                elem.append(_to_element(name, entry))
+        else:
+            child = etree.SubElement(elem, name)
+            child.text = value
+    return elem
+
+
+def _money(value: float) -> str:
+    """Format an amount the way QuickBooks does."""
+    return f"{value:.2f}"
+
+
+class SimulatedCompany:
+    """
+    In-memory company file.
+
+    Entities are stored as ordered dicts keyed by their QBXML element names so
+    they can be serialized straight into *Ret elements.
+    """
+
+    def __init__(self, seed: bool = True):
+        """
+        Initialize company data.
+
+        Args:
+            seed: Populate accounts, items, terms, classes and a few customers
+        """
+        self.lock = threading.RLock()
+        self._next_id = 0x10000
+        self._next_txn_number = 1
+        self._edit_sequence = int(time.time())
+
+        self.customers: Dict[str, Dict[str, Any]] = {}
+        self.accounts: Dict[str, Dict[str, Any]] = {}
+        self.items: Dict[str, Tuple[str, Dict[str, Any]]] = {}  # list_id -> (ret tag, fields)
+        self.terms: Dict[str, Dict[str, Any]] = {}
+        self.classes: Dict[str, Dict[str, Any]] = {}
+        self.transactions: Dict[str, Dict[str, Dict[str, Any]]] = {kind: {} for kind in TXN_RET_TAGS}
+        self.iterators: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}  # iteratorID -> remaining matches
+
+        if seed:
+            self._seed()
+
+    # ------------------------------------------------------------------
+    # Id / timestamp helpers
+    # ------------------------------------------------------------------
+
+    def _new_list_id(self) -> str:
+        self._next_id += 1
+        return f"{self._next_id:X}-{int(time.time())}"
+
+    def _new_txn_id(self) -> str:
+        self._next_id += 1
+        return f"{self._next_id:X}-{int(time.time())}"
+
+    def _new_edit_sequence(self) -> str:
+        self._edit_sequence += 1
+        return str(self._edit_sequence)
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().astimezone().isoformat(timespec='seconds')
+
+    def _list_entity(self, name: str, **fields) -> Dict[str, Any]:
+        """Create the common header of a list element (customer, account, item, ...)."""
+        now = self._now()
+        entity = {
+            'ListID': self._new_list_id(),
+            'TimeCreated': now,
+            'TimeModified': now,
+            'EditSequence': self._new_edit_sequence(),
+            'Name': name,
+            'FullName': name,
+            'IsActive': 'true',
+        }
+        entity.update(fields)
+        return entity
+
+    def _seed(self):
+        """Populate reference lists with a small, realistic data set."""
+        for name, account_type, number in [
+            ('Checking', 'Bank', '1000'),
+            ('Savings', 'Bank', '1010'),
+            ('Undeposited Funds', 'OtherCurrentAsset', '1499'),
+            ('Accounts Receivable', 'AccountsReceivable', '1200'),
+            ('Sales', 'Income', '4000'),
+        ]:
+            account = self._list_entity(name, AccountType=account_type, AccountNumber=number, Balance='0.00')
+            self.accounts[account['ListID']] = account
+
+        for name, item_type, desc, price in [
+            ('Consulting', 'Service', 'Consulting services', '150.00'),
+            ('Installation', 'Service', 'Installation labor', '85.00'),
+            ('Widget', 'NonInventory', 'Standard widget', '25.00'),
+            ('Gadget', 'Inventory', 'Deluxe gadget', '60.00'),
+            ('Shipping', 'OtherCharge', 'Shipping and handling', '12.50'),
+        ]:
+            if item_type in ('Service', 'NonInventory', 'OtherCharge'):
+                item = self._list_entity(name, SalesOrPurchase={'Desc': desc, 'Price': price})
+            else:
+                item = self._list_entity(name, SalesDesc=desc, SalesPrice=price)
+            self.items[item['ListID']] = (ITEM_TYPE_TAGS[item_type], item)
+
+        for name, due_days in [('Net 30', '30'), ('Net 15', '15'), ('Due on receipt', '0')]:
+            term = self._list_entity(name, StdDueDays=due_days, StdDiscountDays='0', DiscountPct='0.00')
+            del term['FullName']
+            self.terms[term['ListID']] = term
+
+        for name in ['East', 'West']:
+            cls = self._list_entity(name, Sublevel='0')
+            self.classes[cls['ListID']] = cls
+
+        for name in ['Acme Corp', 'Globex Inc']:
+            customer = self._list_entity(name, Sublevel='0', CompanyName=name, Balance='0.00', TotalBalance='0.00')
+            self.customers[customer['ListID']] = customer
+
+    # ------------------------------------------------------------------
+    # Request processing
+    # ------------------------------------------------------------------
+
+    def process_request(self, qbxml_request: str) -> str:
+        """
+        Process a QBXML request document and return the response document.
+
+        Args:
+            qbxml_request: QBXML request string
+
+        Returns:
+            QBXML response string
+
+        Raises:
+            QBConnectionError: If the request is not well-formed QBXML
+        """
+        try:
+            root = etree.fromstring(qbxml_request.encode('utf-8'))
+        except etree.XMLSyntaxError as e:
+            raise QBConnectionError(
+                f"QuickBooks found an error when parsing the provided XML text stream. (0x80040400) {e}"
+            )
+
+        msgs_rq = root.find('QBXMLMsgsRq')
+        if root.tag != 'QBXML' or msgs_rq is None:
+            raise QBConnectionError(
+                "QuickBooks found an error when parsing the provided XML text stream. (0x80040400)"
+            )
+
+        stop_on_error = msgs_rq.get('onError', 'stopOnError') == 'stopOnError'
+
+        response_root = etree.Element('QBXML')
+        msgs_rs = etree.SubElement(response_root, 'QBXMLMsgsRs')
+
+        with self.lock:
+            for request in msgs_rq:
+                if not isinstance(request.tag, str):
+                    continue
+
+                rs = self._process_single(request)
+                msgs_rs.append(rs)
+
+                if stop_on_error and rs.get('statusSeverity') == 'Error':
+                    break
+
+        body = etree.tostring(response_root, encoding='unicode', pretty_print=True)
+        return '<?xml version="1.0" ?>\n' + body
+
+    def _process_single(self, request: etree.Element) -> etree.Element:
+        """Dispatch one *Rq element and wrap the result in its *Rs element."""
+        request_type = request.tag
+        response_tag = request_type[:-2] + 'Rs' if request_type.endswith('Rq') else request_type + 'Rs'
+
+        handler = self._HANDLERS.get(request_type)
+        if handler is None:
+            status = _status('3250', 'Error',
+                             f'This feature is not enabled or not available in this version of QuickBooks ({request_type}).')
+            children = []
+        else:
+            status, children, *extra = handler(self, request)
+
+        rs = etree.Element(response_tag)
+        if request.get('requestID') is not None:
+            rs.set('requestID', request.get('requestID'))
+        rs.set('statusCode', status[0])
+        rs.set('statusSeverity', status[1])
+        rs.set('statusMessage', status[2])
+        if handler is not None and extra:
+            # Handler-specific *Rs attributes (e.g. iteratorID)
+            for name, value in extra[0].items():
+                rs.set(name, value)
+        for child in children:
+            rs.append(child)
+        return rs
+
+    # ------------------------------------------------------------------
+    # Query helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _project(tag: str, fields: Dict[str, Any], request: etree.Element,
+                 omit: Optional[List[str]] = None) -> etree.Element:
+        """Serialize an entity, honoring IncludeRetElement and omitting optional blocks."""
+        include = [e.text for e in request.findall('IncludeRetElement')]
+        selected = {}
+        for name, value in fields.items():
+            if omit and name in omit:
+                continue
+            if include and name not in include:
+                continue
+            selected[name] = value
+        return _to_element(tag, selected)
+
+    @staticmethod
+    def _active_filter(request: etree.Element):
+        """Return a predicate for the ActiveStatus filter of a list query."""
+        active_status = request.findtext('ActiveStatus', 'ActiveOnly')
+        if active_status == 'All':
+            return lambda entity: True
+        if active_status == 'InactiveOnly':
+            return lambda entity: entity.get('IsActive') == 'false'
+        return lambda entity: entity.get('IsActive') == 'true'
+
+    def _query_list(self, request: etree.Element, entities: List[Tuple[str, Dict[str, Any]]]):
+        """Shared implementation of the list (non-transaction) queries."""
+        list_ids = [e.text for e in request.findall('ListID')]
+        full_names = [e.text for e in request.findall('FullName')]
+        max_returned = request.findtext('MaxReturned')
+        iterator = request.get('iterator')
+
+        if iterator in ('Continue', 'Stop'):
+            return self._continue_iterator(request, iterator, max_returned)
+
+        if list_ids or full_names:
+            # Explicit ids ignore ActiveStatus
+            matches = [
+                (tag, entity) for tag, entity in entities
+                if entity['ListID'] in list_ids or entity.get('FullName', entity['Name']) in full_names
+            ]
+        else:
+            is_included = self._active_filter(request)
+            matches = [(tag, entity) for tag, entity in entities if is_included(entity)]
+
+        if iterator == 'Start':
+            iterator_id = '{' + str(uuid.uuid4()).upper() + '}'
+            self.iterators[iterator_id] = matches
+            return self._continue_iterator(request, 'Continue', max_returned, iterator_id)
+
+        if max_returned:
+            matches = matches[:int(max_returned)]
+
+        if not matches:
+            return STATUS_NO_MATCH, []
+
+        return STATUS_OK, [self._project(tag, entity, request) for tag, entity in matches]
+
+    def _continue_iterator(self, request: etree.Element, iterator: str, max_returned: Optional[str],
+                           iterator_id: Optional[str] = None):
+        """Return the next page of an iterator started by _query_list (or stop it)."""
+        iterator_id = iterator_id or request.get('iteratorID')
+        remaining = self.iterators.get(iterator_id)
+
+        if remaining is None:
+            return _status('3170', 'Error', f'The iterator "{iterator_id}" is invalid or has expired.'), []
+
+        if iterator == 'Stop':
+            del self.iterators[iterator_id]
+            return STATUS_OK, [], {'iteratorRemainingCount': '0', 'iteratorID': iterator_id}
+
+        page_size = int(max_returned) if max_returned else len(remaining)
+        page, remaining = remaining[:page_size], remaining[page_size:]
+
+        if remaining:
+            self.iterators[iterator_id] = remaining
+        else:
+            del self.iterators[iterator_id]
+
+        status = STATUS_OK if page else STATUS_NO_MATCH
+        children = [self._project(tag, entity, request) for tag, entity in page]
+        return status, children, {'iteratorRemainingCount': str(len(remaining)), 'iteratorID': iterator_id}
+
+    def _query_transactions(self, request: etree.Element, kind: str, line_tag: Optional[str]):
+        """Shared implementation of InvoiceQuery / SalesReceiptQuery / ChargeQuery."""
+        store = self.transactions[kind]
+        ret_tag = TXN_RET_TAGS[kind]
+
+        txn_ids = [e.text for e in request.findall('TxnID')]
+        ref_numbers = [e.text for e in request.findall('RefNumber')]
+        max_returned = request.findtext('MaxReturned')
+
+        missing = []
+        if txn_ids:
+            matches = []
+            for txn_id in txn_ids:
+                if txn_id in store:
+                    matches.append(store[txn_id])
+                else:
+                    missing.append(txn_id)
+        elif ref_numbers:
+            matches = [txn for txn in store.values() if txn.get('RefNumber') in ref_numbers]
+        else:
+            matches = list(store.values())
+
+            modified = request.find('ModifiedDateRangeFilter')
+            if modified is not None:
+                from_date = modified.findtext('FromModifiedDate')
+                to_date = modified.findtext('ToModifiedDate')
+                if from_date:
+                    matches = [t for t in matches if t['TimeModified'] >= from_date]
+                if to_date:
+                    matches = [t for t in matches if t['TimeModified'][:len(to_date)] <= to_date]
+
+            txn_date_range = request.find('TxnDateRangeFilter')
+            if txn_date_range is not None:
+                from_date = txn_date_range.findtext('FromTxnDate')
+                to_date = txn_date_range.findtext('ToTxnDate')
+                if from_date:
+                    matches = [t for t in matches if t['TxnDate'] >= from_date]
+                if to_date:
+                    matches = [t for t in matches if t['TxnDate'] <= to_date]
+
+        if max_returned:
+            matches = matches[:int(max_returned)]
+
+        omit = []
+        if line_tag and request.findtext('IncludeLineItems') != 'true':
+            omit.append(line_tag)
+        if request.findtext('IncludeLinkedTxns') != 'true':
+            omit.append('LinkedTxn')
+
+        children = [self._project(ret_tag, txn, request, omit) for txn in matches]
+
+        if missing:
+            status = _status(
+                '500', 'Warn',
+                'The query request has not been fully completed. There was a required element '
+                f'("{missing[0]}") that could not be found in QuickBooks.'
+            )
+        elif not matches:
+            status = STATUS_NO_MATCH
+        else:
+            status = STATUS_OK
+
+        return status, children
+
+    def _ref(self, elem: Optional[etree.Element], entities: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        """Resolve a *Ref element (ListID or FullName) against a list."""
+        if elem is None:
+            return None
+        list_id = elem.findtext('ListID')
+        full_name = elem.findtext('FullName')
+        for entity in entities.values():
+            if isinstance(entity, tuple):
+                entity = entity[1]
+            if entity['ListID'] == list_id or (full_name and entity.get('FullName', entity['Name']) == full_name):
+                return {'ListID': entity['ListID'], 'FullName': entity.get('FullName', entity['Name'])}
+        return {'missing': list_id or full_name}
+
+    def _lines(self, add: etree.Element, line_add_tag: str, txn_name: str):
+        """Build line rets for an Add request. Returns (lines, subtotal, error_status)."""
+        lines = []
+        subtotal = 0.0
+        for line in add.findall(line_add_tag):
+            item_ref = self._ref(line.find('ItemRef'), self.items)
+            if item_ref and 'missing' in item_ref:
+                return None, 0.0, _invalid_reference('Item', item_ref['missing'], txn_name)
+
+            quantity = float(line.findtext('Quantity', '1'))
+            rate = float(line.findtext('Rate', '0'))
+            amount = round(quantity * rate, 2)
+            subtotal += amount
+
+            lines.append({
+                'TxnLineID': self._new_list_id(),
+                'ItemRef': item_ref,
+                'Desc': line.findtext('Desc'),
+                'Quantity': line.findtext('Quantity'),
+                'Rate': line.findtext('Rate'),
+                'Amount': _money(amount),
+            })
+        return lines, round(subtotal, 2), None
+
+    def _txn_header(self, customer_ref: Dict[str, str]) -> Dict[str, Any]:
+        """Common leading fields of a new transaction."""
+        now = self._now()
+        txn_number = str(self._next_txn_number)
+        self._next_txn_number += 1
+        return {
+            'TxnID': self._new_txn_id(),
+            'TimeCreated': now,
+            'TimeModified': now,
+            'EditSequence': self._new_edit_sequence(),
+            'TxnNumber': txn_number,
+            'CustomerRef': customer_ref,
+        }
+
+    def _require_customer(self, add: etree.Element, txn_name: str):
+        """Resolve the mandatory CustomerRef of an Add request."""
+        customer_ref = self._ref(add.find('CustomerRef'), self.customers)
+        if customer_ref is None:
+            return None, _invalid_reference('Customer', '', txn_name)
+        if 'missing' in customer_ref:
+            return None, _invalid_reference('Customer', customer_ref['missing'], txn_name)
+        return customer_ref, None
+
+    def _adjust_customer_balance(self, customer_ref: Dict[str, str], delta: float):
+        customer = self.customers.get(customer_ref['ListID'])
+        if customer is not None:
+            balance = float(customer.get('Balance', '0')) + delta
+            customer['Balance'] = _money(balance)
+            customer['TotalBalance'] = _money(balance)
+
+    # ------------------------------------------------------------------
+    # Request handlers
+    # ------------------------------------------------------------------
+
+    def _customer_add(self, request: etree.Element):
+        add = request.find('CustomerAdd')
+        name = add.findtext('Name') if add is not None else None
+        if not name:
+            return _status('3000', 'Error', 'The given object name is missing or invalid.'), []
+
+        parent_ref = self._ref(add.find('ParentRef'), self.customers)
+        if parent_ref and 'missing' in parent_ref:
+            return _invalid_reference('Customer', parent_ref['missing'], 'Customer'), []
+
+        full_name = f"{parent_ref['FullName']}:{name}" if parent_ref else name
+        if any(c['FullName'] == full_name for c in self.customers.values()):
+            return _status('3100', 'Error',
+                           f'The name "{full_name}" of the list element is already in use.'), []
+
+        def address(tag):
+            addr = add.find(tag)
+            if addr is None:
+                return None
+            return {child.tag: child.text for child in addr}
+
+        customer = self._list_entity(
+            name,
+            FullName=full_name,
+            ParentRef=parent_ref,
+            Sublevel=str(full_name.count(':')),
+            CompanyName=add.findtext('CompanyName'),
+            FirstName=add.findtext('FirstName'),
+            LastName=add.findtext('LastName'),
+            BillAddress=address('BillAddress'),
+            ShipAddress=address('ShipAddress'),
+            Phone=add.findtext('Phone'),
+            Email=add.findtext('Email'),
+            Balance='0.00',
+            TotalBalance='0.00',
+        )
+        self.customers[customer['ListID']] = customer
+        return STATUS_OK, [_to_element('CustomerRet', customer)]
+
+    def _host_query(self, request: etree.Element):
+        host = etree.Element('HostRet')
+        for name, value in [('ProductName', 'QuickBooks Desktop Simulator'), ('MajorVersion', '34'),
+                            ('MinorVersion', '0'), ('Country', 'US')]:
+            etree.SubElement(host, name).text = value
+        for version in SUPPORTED_QBXML_VERSIONS:
+            etree.SubElement(host, 'SupportedQBXMLVersion').text = version
+        etree.SubElement(host, 'IsAutomaticLogin').text = 'false'
+        etree.SubElement(host, 'QBFileMode').text = 'SingleUser'
+        return STATUS_OK, [host]
+
+    def _customer_query(self, request: etree.Element):
+        return self._query_list(request, [('CustomerRet', c) for c in self.customers.values()])
+
+    def _account_query(self, request: etree.Element):
+        account_types = [e.text for e in request.findall('AccountType')]
+        accounts = [a for a in self.accounts.values() if not account_types or a['AccountType'] in account_types]
+        return self._query_list(request, [('AccountRet', a) for a in accounts])
+
+    def _item_query(self, request: etree.Element):
+        item_type = request.findtext('ItemTypeFilter')
+        items = [
+            (tag, item) for tag, item in self.items.values()
+            if not item_type or ITEM_TYPE_TAGS.get(item_type) == tag
+        ]
+        return self._query_list(request, items)
+
+    def _terms_query(self, request: etree.Element):
+        return self._query_list(request, [('StandardTermsRet', t) for t in self.terms.values()])
+
+    def _class_query(self, request: etree.Element):
+        return self._query_list(request, [('ClassRet', c) for c in self.classes.values()])
+
+    def _invoice_add(self, request: etree.Element):
+        add = request.find('InvoiceAdd')
+        customer_ref, error = self._require_customer(add, 'Invoice')
+        if error:
+            return error, []
+
+        class_ref = self._ref(add.find('ClassRef'), self.classes)
+        if class_ref and 'missing' in class_ref:
+            return _invalid_reference('Class', class_ref['missing'], 'Invoice'), []
+
+        terms_ref = self._ref(add.find('TermsRef'), self.terms)
+        if terms_ref and 'missing' in terms_ref:
+            return _invalid_reference('Terms', terms_ref['missing'], 'Invoice'), []
+
+        lines, subtotal, error = self._lines(add, 'InvoiceLineAdd', 'Invoice')
+        if error:
+            return error, []
+
+        invoice = self._txn_header(customer_ref)
+        invoice.update({
+            'ClassRef': class_ref,
+            'TxnDate': add.findtext('TxnDate') or datetime.now().strftime('%Y-%m-%d'),
+            'RefNumber': add.findtext('RefNumber') or invoice['TxnNumber'],
+            'IsPending': add.findtext('IsPending', 'false'),
+            'PONumber': add.findtext('PONumber'),
+            'TermsRef': terms_ref,
+            'Subtotal': _money(subtotal),
+            'AppliedAmount': '0.00',
+            'BalanceRemaining': _money(subtotal),
+            'Memo': add.findtext('Memo'),
+            'IsPaid': 'true' if subtotal == 0 else 'false',
+            'LinkedTxn': [],
+            'InvoiceLineRet': lines,
+        })
+        self.transactions['Invoice'][invoice['TxnID']] = invoice
+        self._adjust_customer_balance(customer_ref, subtotal)
+        return STATUS_OK, [_to_element('InvoiceRet', invoice)]
+
+    def _invoice_query(self, request: etree.Element):
+        return self._query_transactions(request, 'Invoice', 'InvoiceLineRet')
+
+    def _invoice_mod(self, request: etree.Element):
+        mod = request.find('InvoiceMod')
+        txn_id = mod.findtext('TxnID')
+        invoice = self.transactions['Invoice'].get(txn_id)
+        if invoice is None:
+            return _status('3120', 'Error',
+                           f'Object "{txn_id}" specified in the request cannot be found.'), []
+
+        edit_sequence = mod.findtext('EditSequence')
+        if edit_sequence != invoice['EditSequence']:
+            return _status('3200', 'Error',
+                           f'The provided edit sequence "{edit_sequence}" is out-of-date.'), []
+
+        if mod.find('IsPending') is not None:
+            invoice['IsPending'] = mod.findtext('IsPending')
+        if mod.find('Memo') is not None:
+            invoice['Memo'] = mod.findtext('Memo')
+
+        invoice['TimeModified'] = self._now()
+        invoice['EditSequence'] = self._new_edit_sequence()
+        return STATUS_OK, [_to_element('InvoiceRet', invoice)]
+
+    def _sales_receipt_add(self, request: etree.Element):
+        add = request.find('SalesReceiptAdd')
+        customer_ref, error = self._require_customer(add, 'SalesReceipt')
+        if error:
+            return error, []
+
+        lines, subtotal, error = self._lines(add, 'SalesReceiptLineAdd', 'SalesReceipt')
+        if error:
+            return error, []
+
+        deposit_account = next((a for a in self.accounts.values() if a['Name'] == 'Undeposited Funds'), None)
+
+        receipt = self._txn_header(customer_ref)
+        receipt.update({
+            'TxnDate': add.findtext('TxnDate') or datetime.now().strftime('%Y-%m-%d'),
+            'RefNumber': add.findtext('RefNumber') or receipt['TxnNumber'],
+            'IsPending': add.findtext('IsPending', 'false'),
+            'Subtotal': _money(subtotal),
+            'TotalAmount': _money(subtotal),
+            'Memo': add.findtext('Memo'),
+            'IsToBePrinted': 'false',
+            'IsToBeEmailed': 'false',
+            'DepositToAccountRef': {
+                'ListID': deposit_account['ListID'],
+                'FullName': deposit_account['FullName'],
+            } if deposit_account else None,
+            'SalesReceiptLineRet': lines,
+        })
+        self.transactions['SalesReceipt'][receipt['TxnID']] = receipt
+        return STATUS_OK, [_to_element('SalesReceiptRet', receipt)]
+
+    def _sales_receipt_query(self, request: etree.Element):
+        return self._query_transactions(request, 'SalesReceipt', 'SalesReceiptLineRet')
+
+    def _charge_add(self, request: etree.Element):
+        add = request.find('ChargeAdd')
+        customer_ref, error = self._require_customer(add, 'Charge')
+        if error:
+            return error, []
+
+        item_ref = self._ref(add.find('ItemRef'), self.items)
+        if item_ref and 'missing' in item_ref:
+            return _invalid_reference('Item', item_ref['missing'], 'Charge'), []
+
+        quantity = float(add.findtext('Quantity', '1'))
+        rate = float(add.findtext('Rate', '0'))
+        amount = round(quantity * rate, 2)
+
+        charge = self._txn_header(customer_ref)
+        charge.update({
+            'TxnDate': add.findtext('TxnDate') or datetime.now().strftime('%Y-%m-%d'),
+            'RefNumber': add.findtext('RefNumber'),
+            'ItemRef': item_ref,
+            'Quantity': add.findtext('Quantity'),
+            'Rate': add.findtext('Rate'),
+            'Amount': _money(amount),
+            'BalanceRemaining': _money(amount),
+            'Desc': add.findtext('Desc'),
+            'IsPaid': 'true' if amount == 0 else 'false',
+            'LinkedTxn': [],
+        })
+        self.transactions['Charge'][charge['TxnID']] = charge
+        self._adjust_customer_balance(customer_ref, amount)
+        return STATUS_OK, [_to_element('ChargeRet', charge)]
+
+    def _charge_query(self, request: etree.Element):
+        return self._query_transactions(request, 'Charge', None)
+
+    def _txn_del(self, request: etree.Element):
+        txn_del_type = request.findtext('TxnDelType')
+        txn_id = request.findtext('TxnID')
+
+        store = self.transactions.get(txn_del_type)
+        if store is None:
+            return _status('3250', 'Error',
+                           f'TxnDelType "{txn_del_type}" is not supported by the simulator.'), []
+        if txn_id not in store:
+            return _status('3120', 'Error',
+                           f'Object "{txn_id}" specified in the request cannot be found.'), []
+
+        txn = store.pop(txn_id)
+        balance = txn.get('BalanceRemaining')
+        if balance:
+            self._adjust_customer_balance(txn['CustomerRef'], -float(balance))
+
+        children = []
+        for name, value in [('TxnDelType', txn_del_type), ('TxnID', txn_id), ('TimeDeleted', self._now())]:
+            elem = etree.Element(name)
+            elem.text = value
+            children.append(elem)
+        return STATUS_OK, children
+
+    _HANDLERS = {
+        'CustomerAddRq': _customer_add,
+        'HostQueryRq': _host_query,
+        'CustomerQueryRq': _customer_query,
+        'AccountQueryRq': _account_query,
+        'ItemQueryRq': _item_query,
+        'StandardTermsQueryRq': _terms_query,
+        'ClassQueryRq': _class_query,
+        'InvoiceAddRq': _invoice_add,
+        'InvoiceQueryRq': _invoice_query,
+        'InvoiceModRq': _invoice_mod,
+        'SalesReceiptAddRq': _sales_receipt_add,
+        'SalesReceiptQueryRq': _sales_receipt_query,
+        'ChargeAddRq': _charge_add,
+        'ChargeQueryRq': _charge_query,
+        'TxnDelRq': _txn_del,
+    }
+
+    # ------------------------------------------------------------------
+    # Simulating the integration under test
+    # ------------------------------------------------------------------
+
+    def receive_payment(self, txn_id: str, amount: Optional[float] = None,
+                        payment_method: str = 'Check', memo: Optional[str] = None) -> bool:
+        """
+        Apply a payment to an invoice or statement charge, as an integration would.
+
+        Args:
+            txn_id: TxnID of the invoice or charge
+            amount: Payment amount (None = pay the remaining balance)
+            payment_method: PaymentMethodRef full name
+            memo: Optional payment memo
+
+        Returns:
+            True if the transaction was found and the payment applied
+        """
+        with self.lock:
+            for kind in ('Invoice', 'Charge'):
+                txn = self.transactions[kind].get(txn_id)
+                if txn is None:
+                    continue
+
+                balance = float(txn['BalanceRemaining'])
+                paid = balance if amount is None else min(amount, balance)
+                new_balance = round(balance - paid, 2)
+
+                txn['LinkedTxn'].append({
+                    'TxnID': self._new_txn_id(),
+                    'TxnType': 'ReceivePayment',
+                    'TxnDate': datetime.now().strftime('%Y-%m-%d'),
+                    'RefNumber': memo,
+                    'LinkType': 'AMTTYPE',
+                    'Amount': _money(-paid),
+                    'PaymentMethodRef': {'FullName': payment_method},
+                })
+                txn['BalanceRemaining'] = _money(new_balance)
+                txn['IsPaid'] = 'true' if new_balance == 0 else 'false'
+                if 'AppliedAmount' in txn:
+                    txn['AppliedAmount'] = _money(float(txn['AppliedAmount']) - paid)
+                txn['TimeModified'] = self._now()
+                txn['EditSequence'] = self._new_edit_sequence()
+                self._adjust_customer_balance(txn['CustomerRef'], -paid)
+                return True
+
+        return False
+
+
+# Company files shared by every simulator connection in this process, keyed by path
+_companies: Dict[str, SimulatedCompany] = {}
+_companies_lock = threading.Lock()
+
+
+def get_simulated_company(company_file: Optional[str] = None) -> SimulatedCompany:
+    """
+    Get (or create) the simulated company for a company file path.
+
+    State survives disconnect/reconnect, like a real company file.
+
+    Args:
+        company_file: Company file path (None or '' = the "currently open" file)
+
+    Returns:
+        SimulatedCompany instance
+    """
+    key = company_file or ''
+    with _companies_lock:
+        if key not in _companies:
+            _companies[key] = SimulatedCompany()
+        return _companies[key]
+
+
+class QBSimulatorConnection(QBConnection):
+    """
+    Drop-in replacement for QBConnection backed by SimulatedCompany.
+
+    Each send_request() sleeps for the configured latency (plus uniform jitter)
+    to model the cost of a ProcessRequest round trip.
+    """
+
+    def __init__(self, app_name: str = "QBDTestTool", app_id: str = "",
+                 latency_ms: float = 0, jitter_ms: float = 0):
+        """
+        Initialize simulator connection.
+
+        Args:
+            app_name: Application name (kept for interface compatibility)
+            app_id: Application ID (kept for interface compatibility)
+            latency_ms: Simulated ProcessRequest latency in milliseconds
+            jitter_ms: Maximum random deviation from latency_ms in milliseconds
+        """
+        super().__init__(app_name, app_id)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.company: Optional[SimulatedCompany] = None
+
+    def connect(self, company_file: Optional[str] = None) -> bool:
+        """
+        Open a session on the simulated company file.
+
+        Args:
+            company_file: Path to company file (None = currently open file)
+
+        Returns:
+            True (the simulator is always available)
+        """
+        self.company = get_simulated_company(company_file)
+        self.session_manager = self.company
+        self.ticket = f"sim-{id(self):x}-{int(time.time())}"
+        return True
+
+    def disconnect(self) -> bool:
+        """
+        End the simulated session.
+
+        Returns:
+            True
+        """
+        self.ticket = None
+        self.session_manager = None
+        self.company = None
+        return True
+
+    def send_request(self, qbxml_request: str) -> str:
+        """
+        Process a QBXML request against the simulated company.
+
+        Args:
+            qbxml_request: QBXML formatted request string
+
+        Returns:
+            QBXML response string
+
+        Raises:
+            QBConnectionError: If not connected or the request is malformed
+        """
+        if not self.company or not self.ticket:
+            raise QBConnectionError("Not connected to QuickBooks. Call connect() first.", ERROR_SESSION)
+
+        delay_ms = self.latency_ms
+        if self.jitter_ms:
+            delay_ms += random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+
+        return self.company.process_request(qbxml_request)
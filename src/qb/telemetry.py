@@ -0,0 +1,171 @@
+"""
+Request telemetry for the QuickBooks connection manager.
+
+Fixed-bucket histograms of queue wait, QuickBooks (COM ProcessRequest) time and
+response size per request type, plus error counts. Snapshots are plain dicts
+so they can be sent over the IPC queues.
+"""
+
+import bisect
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+
+# Bucket upper bounds (the last bucket is open-ended)
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+# Request element names in a QBXML document, e.g. 'CustomerQuery' for <CustomerQueryRq>
+_REQUEST_TAG_PATTERN = re.compile(r'<(\w+)Rq[\s>/]')
+
+
+def request_names(qbxml: Optional[str]) -> List[str]:
+    """Get the name of every request in a QBXML document, e.g. ['InvoiceQuery', 'InvoiceQuery']."""
+    return [tag for tag in _REQUEST_TAG_PATTERN.findall(qbxml or '') if tag != 'QBXMLMsgs']
+
+
+def request_type(qbxml: Optional[str]) -> str:
+    """
+    Classify a QBXML request for telemetry.
+
+    Returns:
+        The request name (e.g. 'InvoiceQuery'), suffixed with ' (batch)' for
+        multi-request envelopes of one type, or 'Mixed batch'
+    """
+    tags = request_names(qbxml)
+    if not tags:
+        return 'Unknown'
+    if len(set(tags)) > 1:
+        return 'Mixed batch'
+    if len(tags) > 1:
+        return f"{tags[0]} (batch)"
+    return tags[0]
+
+
+class Histogram:
+    """Fixed-bucket histogram with approximate percentiles."""
+
+    def __init__(self, bounds: Sequence[float]):
+        """
+        Initialize histogram.
+
+        Args:
+            bounds: Ascending bucket upper bounds
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float):
+        """Add one observation."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Estimate a percentile as the upper bound of the bucket containing it.
+
+        Args:
+            fraction: Percentile as a fraction (0.5 for p50)
+
+        Returns:
+            Bucket upper bound (capped at the observed maximum), or 0.0 if empty
+        """
+        if not self.count:
+            return 0.0
+
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                if index < len(self.bounds):
+                    return min(self.bounds[index], self.max)
+                return self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        """Summarize the histogram."""
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'max': self.max,
+        }
+
+
+class RequestTypeStats:
+    """Telemetry for one request type."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.queue_wait_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.qb_time_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.response_bytes = Histogram(SIZE_BUCKETS_BYTES)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summarize this request type."""
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'queue_wait_ms': self.queue_wait_ms.snapshot(),
+            'qb_time_ms': self.qb_time_ms.snapshot(),
+            'response_bytes': self.response_bytes.snapshot(),
+        }
+
+
+class ManagerTelemetry:
+    """Collects per-request-type telemetry inside the connection manager process."""
+
+    def __init__(self):
+        self.by_type: Dict[str, RequestTypeStats] = {}
+        self.connect_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.connect_errors = 0
+
+    def record_request(self, qbxml: Optional[str], queue_wait: float, qb_time: Optional[float],
+                       response_size: Optional[int], success: bool):
+        """
+        Record one executed request.
+
+        Args:
+            qbxml: The request (used to classify it)
+            queue_wait: Seconds spent queued in the manager
+            qb_time: Seconds spent in QuickBooks ProcessRequest, or None if it never ran
+            response_size: Response length, or None on failure
+            success: Whether the request succeeded
+        """
+        name = request_type(qbxml)
+        stats = self.by_type.get(name)
+        if stats is None:
+            stats = self.by_type[name] = RequestTypeStats()
+
+        stats.requests += 1
+        stats.queue_wait_ms.record(queue_wait * 1000)
+        if qb_time is not None:
+            stats.qb_time_ms.record(qb_time * 1000)
+        if response_size is not None:
+            stats.response_bytes.record(response_size)
+        if not success:
+            stats.errors += 1
+
+    def record_connect(self, seconds: float, success: bool):
+        """Record opening a QuickBooks session."""
+        self.connect_ms.record(seconds * 1000)
+        if not success:
+            self.connect_errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summarize all telemetry."""
+        return {
+            'request_types': {name: stats.snapshot() for name, stats in sorted(self.by_type.items())},
+            'connect_ms': self.connect_ms.snapshot(),
+            'connect_errors': self.connect_errors,
+        }
+
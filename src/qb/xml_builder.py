@@ -3,13 +3,33 @@ QBXML request builder for QuickBooks Desktop operations.
 """
 
 from lxml import etree
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
+from . import xml_templates
 
 
 class QBXMLBuilder:
     """Helper class to build QBXML requests."""
 
+    # Render the Add requests from precompiled templates (byte-identical to the
+    # lxml path below, several times faster). Set False to build through lxml.
+    use_templates = True
+
+    # IncludeRetElement projections for status polling (monitor and change detection):
+    # just what the status checks and payment verification read, no address blocks or lines
+    INVOICE_STATUS_ELEMENTS = [
+        'TxnID', 'TimeModified', 'EditSequence', 'RefNumber',
+        'BalanceRemaining', 'Memo', 'IsPaid', 'DepositToAccountRef', 'LinkedTxn'
+    ]
+    SALES_RECEIPT_STATUS_ELEMENTS = [
+        'TxnID', 'TimeModified', 'EditSequence', 'RefNumber',
+        'Memo', 'DepositToAccountRef'
+    ]
+    CHARGE_STATUS_ELEMENTS = [
+        'TxnID', 'TimeModified', 'EditSequence', 'RefNumber',
+        'BalanceRemaining', 'Desc', 'IsPaid', 'LinkedTxn'
+    ]
+
     @staticmethod
     def _create_base_qbxml() -> tuple:
         """Create base QBXML structure with proper processing instruction."""
@@ -25,6 +45,55 @@ class QBXMLBuilder:
 
         return tree, qbxml, qbxml_msgs_rq
 
+    @staticmethod
+    def _set_iterator(query_rq: etree.Element, iterator: Optional[str], iterator_id: Optional[str]):
+        """Set the QBXML iterator attributes on a *QueryRq element."""
+        if not iterator:
+            return
+
+        if iterator not in ('Start', 'Continue', 'Stop'):
+            raise ValueError(f"Invalid iterator mode: {iterator}")
+        if iterator != 'Start' and not iterator_id:
+            raise ValueError(f"iterator_id is required for iterator='{iterator}'")
+
+        query_rq.set("iterator", iterator)
+        if iterator != 'Start':
+            query_rq.set("iteratorID", iterator_id)
+
+    @staticmethod
+    def _add_id_filters(query_rq: etree.Element, txn_id: Optional[Union[str, List[str]]],
+                        ref_number: Optional[Union[str, List[str]]]):
+        """Append one TxnID / RefNumber element per value (a single str is one value)."""
+        for tag, values in (("TxnID", txn_id), ("RefNumber", ref_number)):
+            if not values:
+                continue
+            if isinstance(values, str):
+                values = [values]
+            for value in values:
+                elem = etree.SubElement(query_rq, tag)
+                elem.text = value
+
+    @staticmethod
+    def _add_include_options(query_rq: etree.Element, line_ret_tag: Optional[str],
+                             include_linked_txns: bool, include_ret_elements: Optional[List[str]]):
+        """
+        Append IncludeLineItems, IncludeLinkedTxns and IncludeRetElement to a
+        transaction *QueryRq element, in QBXML spec order.
+
+        Line items are requested unless a projection leaves out line_ret_tag.
+        """
+        if line_ret_tag and (not include_ret_elements or line_ret_tag in include_ret_elements):
+            include_line_items = etree.SubElement(query_rq, "IncludeLineItems")
+            include_line_items.text = "true"
+
+        if include_linked_txns:
+            include_linked = etree.SubElement(query_rq, "IncludeLinkedTxns")
+            include_linked.text = "true"
+
+        for element_name in include_ret_elements or []:
+            include_elem = etree.SubElement(query_rq, "IncludeRetElement")
+            include_elem.text = element_name
+
     @staticmethod
     def build_customer_add(customer_data: Dict[str, Any]) -> str:
         """
@@ -34,6 +103,9 @@ class QBXMLBuilder:
             customer_data: Dict with keys: name, email, first_name, last_name,
                           company, phone, billing_address (optional), shipping_address (optional)
         """
+        if QBXMLBuilder.use_templates:
+            return xml_templates.CUSTOMER_ADD.render(customer_data)
+
         tree, qbxml, msgs_rq = QBXMLBuilder._create_base_qbxml()
         customer_add_rq = etree.SubElement(msgs_rq, "CustomerAddRq")
         customer_add_rq.set("requestID", "1")
@@ -114,6 +186,9 @@ class QBXMLBuilder:
                          Optional: po_number, terms_ref, class_ref
                          line_items: list of {item_ref, desc, quantity, rate}
         """
+        if QBXMLBuilder.use_templates:
+            return xml_templates.INVOICE_ADD.render(invoice_data)
+
         tree, qbxml, msgs_rq = QBXMLBuilder._create_base_qbxml()
         invoice_add_rq = etree.SubElement(msgs_rq, "InvoiceAddRq")
         invoice_add_rq.set("requestID", "1")
@@ -190,30 +265,30 @@ class QBXMLBuilder:
         return output.getvalue().decode('utf-8')
 
     @staticmethod
-    def build_invoice_query(txn_id: Optional[str] = None, ref_number: Optional[str] = None,
+    def build_invoice_query(txn_id: Optional[Union[str, List[str]]] = None,
+                            ref_number: Optional[Union[str, List[str]]] = None,
                            modified_date_range_filter: Optional[Dict[str, str]] = None,
                            txn_date_range: Optional[Dict[str, str]] = None,
-                           max_returned: Optional[int] = None) -> str:
+                           max_returned: Optional[int] = None,
+                           include_linked_txns: bool = False,
+                           include_ret_elements: Optional[List[str]] = None) -> str:
         """
         Build InvoiceQueryRq QBXML request.
 
         Args:
-            txn_id: Specific transaction ID to query
-            ref_number: Reference number to query
+            txn_id: Transaction ID, or list of IDs, to query
+            ref_number: Reference number, or list of numbers, to query
             modified_date_range_filter: Dict with 'from_modified_date' and/or 'to_modified_date'
             txn_date_range: Dict with 'from_txn_date' and/or 'to_txn_date' (format: YYYY-MM-DD)
             max_returned: Maximum number of results to return
+            include_linked_txns: Also return LinkedTxn (payments applied to the transaction)
+            include_ret_elements: Only return these *Ret elements (e.g. INVOICE_STATUS_ELEMENTS);
+                                  None returns everything
         """
         tree, qbxml, msgs_rq = QBXMLBuilder._create_base_qbxml()
         invoice_query_rq = etree.SubElement(msgs_rq, "InvoiceQueryRq")
 
-        if txn_id:
-            txn_id_elem = etree.SubElement(invoice_query_rq, "TxnID")
-            txn_id_elem.text = txn_id
-
-        if ref_number:
-            ref_num_elem = etree.SubElement(invoice_query_rq, "RefNumber")
-            ref_num_elem.text = ref_number
+        QBXMLBuilder._add_id_filters(invoice_query_rq, txn_id, ref_number)
 
         if modified_date_range_filter:
             filter_elem = etree.SubElement(invoice_query_rq, "ModifiedDateRangeFilter")
@@ -237,9 +312,8 @@ class QBXMLBuilder:
             max_elem = etree.SubElement(invoice_query_rq, "MaxReturned")
             max_elem.text = str(max_returned)
 
-        # Include full details
-        include_line_items = etree.SubElement(invoice_query_rq, "IncludeLineItems")
-        include_line_items.text = "true"
+        QBXMLBuilder._add_include_options(invoice_query_rq, "InvoiceLineRet",
+                                          include_linked_txns, include_ret_elements)
 
         # Serialize with processing instruction included
         from io import BytesIO
@@ -289,6 +363,9 @@ class QBXMLBuilder:
         Returns:
             QBXML formatted sales receipt add request
         """
+        if QBXMLBuilder.use_templates:
+            return xml_templates.SALES_RECEIPT_ADD.render(sales_receipt_data)
+
         tree, qbxml, msgs_rq = QBXMLBuilder._create_base_qbxml()
         sales_receipt_add_rq = etree.SubElement(msgs_rq, "SalesReceiptAddRq")
         sales_receipt_add_rq.set("requestID", "1")
@@ -348,19 +425,23 @@ class QBXMLBuilder:
         return output.getvalue().decode('utf-8')
 
     @staticmethod
-    def build_sales_receipt_query(txn_id: Optional[str] = None, ref_number: Optional[str] = None,
+    def build_sales_receipt_query(txn_id: Optional[Union[str, List[str]]] = None,
+                                  ref_number: Optional[Union[str, List[str]]] = None,
                                   modified_date_range_filter: Optional[Dict[str, str]] = None,
                                   txn_date_range: Optional[Dict[str, str]] = None,
-                                  max_returned: Optional[int] = None) -> str:
+                                  max_returned: Optional[int] = None,
+                                  include_ret_elements: Optional[List[str]] = None) -> str:
         """
         Build SalesReceiptQueryRq QBXML request.
 
         Args:
-            txn_id: Specific transaction ID to query
-            ref_number: Reference number to query
+            txn_id: Transaction ID, or list of IDs, to query
+            ref_number: Reference number, or list of numbers, to query
             modified_date_range_filter: Dict with 'from_modified_date' and/or 'to_modified_date'
             txn_date_range: Dict with 'from_txn_date' and/or 'to_txn_date' (format: YYYY-MM-DD)
             max_returned: Maximum number of results to return
+            include_ret_elements: Only return these *Ret elements (e.g. SALES_RECEIPT_STATUS_ELEMENTS);
+                                  None returns everything
 
         Returns:
             QBXML formatted sales receipt query request
@@ -368,13 +449,7 @@ class QBXMLBuilder:
         tree, qbxml, msgs_rq = QBXMLBuilder._create_base_qbxml()
         sales_receipt_query_rq = etree.SubElement(msgs_rq, "SalesReceiptQueryRq")
 
-        if txn_id:
-            txn_id_elem = etree.SubElement(sales_receipt_query_rq, "TxnID")
-            txn_id_elem.text = txn_id
-
-        if ref_number:
-            ref_num_elem = etree.SubElement(sales_receipt_query_rq, "RefNumber")
-            ref_num_elem.text = ref_number
+        QBXMLBuilder._add_id_filters(sales_receipt_query_rq, txn_id, ref_number)
 
         if modified_date_range_filter:
             filter_elem = etree.SubElement(sales_receipt_query_rq, "ModifiedDateRangeFilter")
@@ -398,9 +473,8 @@ class QBXMLBuilder:
             max_elem = etree.SubElement(sales_receipt_query_rq, "MaxReturned")
             max_elem.text = str(max_returned)
 
-        # Include full details
-        include_line_items = etree.SubElement(sales_receipt_query_rq, "IncludeLineItems")
-        include_line_items.text = "true"
+        QBXMLBuilder._add_include_options(sales_receipt_query_rq, "SalesReceiptLineRet",
+                                          False, include_ret_elements)
 
         # Serialize with processing instruction included
         from io import BytesIO
@@ -419,6 +493,9 @@ class QBXMLBuilder:
         Returns:
             QBXML formatted charge add request
         """
+        if QBXMLBuilder.use_templates:
+            return xml_templates.CHARGE_ADD.render(charge_data)
+
         tree, qbxml, msgs_rq = QBXMLBuilder._create_base_qbxml()
         charge_add_rq = etree.SubElement(msgs_rq, "ChargeAddRq")
         charge_add_rq.set("requestID", "1")
@@ -469,19 +546,25 @@ class QBXMLBuilder:
         return output.getvalue().decode('utf-8')
 
     @staticmethod
-    def build_charge_query(txn_id: Optional[str] = None, ref_number: Optional[str] = None,
+    def build_charge_query(txn_id: Optional[Union[str, List[str]]] = None,
+                           ref_number: Optional[Union[str, List[str]]] = None,
                           modified_date_range_filter: Optional[Dict[str, str]] = None,
                           txn_date_range: Optional[Dict[str, str]] = None,
-                          max_returned: Optional[int] = None) -> str:
+                          max_returned: Optional[int] = None,
+                          include_linked_txns: bool = False,
+                          include_ret_elements: Optional[List[str]] = None) -> str:
         """
         Build ChargeQueryRq QBXML request (for statement charges).
 
         Args:
-            txn_id: Specific transaction ID to query
-            ref_number: Reference number to query
+            txn_id: Transaction ID, or list of IDs, to query
+            ref_number: Reference number, or list of numbers, to query
             modified_date_range_filter: Dict with 'from_modified_date' and/or 'to_modified_date'
             txn_date_range: Dict with 'from_txn_date' and/or 'to_txn_date' (format: YYYY-MM-DD)
             max_returned: Maximum number of results to return
+            include_linked_txns: Also return LinkedTxn (payments applied to the transaction)
+            include_ret_elements: Only return these *Ret elements (e.g. CHARGE_STATUS_ELEMENTS);
+                                  None returns everything
 
         Returns:
             QBXML formatted charge query request
@@ -489,13 +572,7 @@ class QBXMLBuilder:
         tree, qbxml, msgs_rq = QBXMLBuilder._create_base_qbxml()
         charge_query_rq = etree.SubElement(msgs_rq, "ChargeQueryRq")
 
-        if txn_id:
-            txn_id_elem = etree.SubElement(charge_query_rq, "TxnID")
-            txn_id_elem.text = txn_id
-
-        if ref_number:
-            ref_num_elem = etree.SubElement(charge_query_rq, "RefNumber")
-            ref_num_elem.text = ref_number
+        QBXMLBuilder._add_id_filters(charge_query_rq, txn_id, ref_number)
 
         if modified_date_range_filter:
             filter_elem = etree.SubElement(charge_query_rq, "ModifiedDateRangeFilter")
@@ -519,6 +596,9 @@ class QBXMLBuilder:
             max_elem = etree.SubElement(charge_query_rq, "MaxReturned")
             max_elem.text = str(max_returned)
 
+        QBXMLBuilder._add_include_options(charge_query_rq, None,
+                                          include_linked_txns, include_ret_elements)
+
         # Serialize with processing instruction included
         from io import BytesIO
         output = BytesIO()
@@ -547,19 +627,32 @@ class QBXMLBuilder:
         return output.getvalue().decode('utf-8')
 
     @staticmethod
-    def build_customer_query() -> str:
+    def build_customer_query(max_returned: Optional[int] = None, iterator: Optional[str] = None,
+                             iterator_id: Optional[str] = None) -> str:
         """
         Build CustomerQueryRq QBXML request.
 
+        Args:
+            max_returned: Maximum number of customers to return (page size when iterating)
+            iterator: QBXML iterator mode - 'Start', 'Continue' or 'Stop'
+            iterator_id: iteratorID from the previous page (required for 'Continue'/'Stop')
+
         Returns:
             QBXML formatted customer query request
         """
         tree, qbxml, msgs_rq = QBXMLBuilder._create_base_qbxml()
         customer_query_rq = etree.SubElement(msgs_rq, "CustomerQueryRq")
+        QBXMLBuilder._set_iterator(customer_query_rq, iterator, iterator_id)
 
-        # Limit to active customers only
-        active_status = etree.SubElement(customer_query_rq, "ActiveStatus")
-        active_status.text = "ActiveOnly"
+        if max_returned:
+            max_elem = etree.SubElement(customer_query_rq, "MaxReturned")
+            max_elem.text = str(max_returned)
+
+        # Continuing an iterator reuses the filters it was started with
+        if iterator not in ('Continue', 'Stop'):
+            # Limit to active customers only
+            active_status = etree.SubElement(customer_query_rq, "ActiveStatus")
+            active_status.text = "ActiveOnly"
 
         # Serialize with processing instruction included
         from io import BytesIO
@@ -568,27 +661,38 @@ class QBXMLBuilder:
         return output.getvalue().decode('utf-8')
 
     @staticmethod
-    def build_item_query(item_type: Optional[str] = None) -> str:
+    def build_item_query(item_type: Optional[str] = None, max_returned: Optional[int] = None,
+                         iterator: Optional[str] = None, iterator_id: Optional[str] = None) -> str:
         """
         Build ItemQueryRq QBXML request.
 
         Args:
             item_type: Optional item type filter (e.g., 'Service', 'Inventory', 'NonInventory')
+            max_returned: Maximum number of items to return (page size when iterating)
+            iterator: QBXML iterator mode - 'Start', 'Continue' or 'Stop'
+            iterator_id: iteratorID from the previous page (required for 'Continue'/'Stop')
 
         Returns:
             QBXML formatted item query request
         """
         tree, qbxml, msgs_rq = QBXMLBuilder._create_base_qbxml()
         item_query_rq = etree.SubElement(msgs_rq, "ItemQueryRq")
+        QBXMLBuilder._set_iterator(item_query_rq, iterator, iterator_id)
+
+        if max_returned:
+            max_elem = etree.SubElement(item_query_rq, "MaxReturned")
+            max_elem.text = str(max_returned)
 
-        # Filter by item type if specified
-        if item_type:
-            type_filter = etree.SubElement(item_query_rq, "ItemTypeFilter")
-            type_filter.text = item_type
+        # Continuing an iterator reuses the filters it was started with
+        if iterator not in ('Continue', 'Stop'):
+            # Filter by item type if specified
+            if item_type:
+                type_filter = etree.SubElement(item_query_rq, "ItemTypeFilter")
+                type_filter.text = item_type
 
-        # Limit to active items only
-        active_status = etree.SubElement(item_query_rq, "ActiveStatus")
-        active_status.text = "ActiveOnly"
+            # Limit to active items only
+            active_status = etree.SubElement(item_query_rq, "ActiveStatus")
+            active_status.text = "ActiveOnly"
 
         # Serialize with processing instruction included
         from io import BytesIO
@@ -638,6 +742,26 @@ class QBXMLBuilder:
         tree.write(output, xml_declaration=False, encoding='UTF-8', pretty_print=True)
         return output.getvalue().decode('utf-8')
 
+    @staticmethod
+    def build_host_query() -> str:
+        """
+        Build HostQueryRq QBXML request.
+
+        Returns a few hundred bytes describing the QuickBooks product and the
+        QBXML versions it supports, which makes it a cheap connectivity check.
+
+        Returns:
+            QBXML formatted host query request
+        """
+        tree, qbxml, msgs_rq = QBXMLBuilder._create_base_qbxml()
+        etree.SubElement(msgs_rq, "HostQueryRq")
+
+        # Serialize with processing instruction included
+        from io import BytesIO
+        output = BytesIO()
+        tree.write(output, xml_declaration=False, encoding='UTF-8', pretty_print=True)
+        return output.getvalue().decode('utf-8')
+
     @staticmethod
     def build_txn_del(txn_del_type: str, txn_id: str) -> str:
         """
@@ -665,3 +789,45 @@ class QBXMLBuilder:
         output = BytesIO()
         tree.write(output, xml_declaration=False, encoding='UTF-8', pretty_print=True)
         return output.getvalue().decode('utf-8')
+
+    @staticmethod
+    def build_batch_request(requests: List[str], request_ids: Optional[List[str]] = None,
+                            on_error: str = "continueOnError") -> str:
+        """
+        Pack several single-request QBXML documents into one QBXMLMsgsRq envelope.
+
+        Each request keeps its own requestID so the responses can be matched back up
+        with QBXMLParser.parse_batch_response(). QuickBooks processes the whole
+        envelope in a single ProcessRequest round trip.
+
+        Args:
+            requests: QBXML request strings produced by the other build_* methods
+            request_ids: requestID for each request (defaults to its index as a string)
+            on_error: QBXMLMsgsRq onError mode ('continueOnError' or 'stopOnError')
+
+        Returns:
+            QBXML formatted multi-request envelope
+        """
+        if request_ids is None:
+            request_ids = [str(index) for index in range(len(requests))]
+
+        if len(request_ids) != len(requests):
+            raise ValueError("request_ids must have one entry per request")
+
+        tree, qbxml, msgs_rq = QBXMLBuilder._create_base_qbxml()
+        msgs_rq.set("onError", on_error)
+
+        # Drop the indentation of the source documents so pretty_print re-indents cleanly
+        parser = etree.XMLParser(remove_blank_text=True)
+
+        for request_xml, request_id in zip(requests, request_ids):
+            source = etree.fromstring(request_xml.encode('utf-8'), parser)
+            for request_elem in source.xpath('/QBXML/QBXMLMsgsRq/*'):
+                request_elem.set("requestID", str(request_id))
+                msgs_rq.append(request_elem)
+
+        # Serialize with processing instruction included
+        from io import BytesIO
+        output = BytesIO()
+        tree.write(output, xml_declaration=False, encoding='UTF-8', pretty_print=True)
+        return output.getvalue().decode('utf-8')
@@ -2,67 +2,261 @@
 QBXML response parser for QuickBooks Desktop operations.
 """
 
+import copy
+import re
+from functools import partial
 from lxml import etree
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+
+from .records import (
+    MISSING, AccountRecord, ClassRecord, CustomerRecord, ItemRecord, LazyRecord, LinkedTxnRecord,
+    TermsRecord, intern_text
+)
+
+
+# Item list element types returned by ItemQueryRs
+ITEM_RET_TAGS = ('ItemServiceRet', 'ItemInventoryRet', 'ItemNonInventoryRet',
+                 'ItemOtherChargeRet', 'ItemDiscountRet')
+
+# Bytes fed to the pull parser at a time by iter_records
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# XPath expressions used on every call, compiled once. Text selectors skip
+# lxml's "smart" strings, which would keep the parsed tree alive.
+_RESPONSES = etree.XPath('QBXMLMsgsRs/*')
+_CUSTOMER_REF_LIST_ID = etree.XPath('CustomerRef/ListID/text()', smart_strings=False)
+_CUSTOMER_REF_FULL_NAME = etree.XPath('CustomerRef/FullName/text()', smart_strings=False)
+_LINKED_TXNS = etree.XPath('LinkedTxn')
+
+# TxnID and EditSequence of each transaction *Ret, for scan_edit_sequences. QBXML
+# puts TxnID first in a *Ret and EditSequence ahead of any LinkedTxn (whose own
+# TxnID doesn't follow a "Ret>"), so the first EditSequence after it is its own.
+_EDIT_SEQUENCE_PATTERN = r'Ret>\s*<TxnID>([^<]*)</TxnID>.*?<EditSequence>([^<]*)</EditSequence>'
+_EDIT_SEQUENCES = re.compile(_EDIT_SEQUENCE_PATTERN, re.S)
+_EDIT_SEQUENCES_BYTES = re.compile(_EDIT_SEQUENCE_PATTERN.encode('ascii'), re.S)
+_STATUS_CODES = re.compile(r'statusCode="([^"]*)"')
+_STATUS_CODES_BYTES = re.compile(rb'statusCode="([^"]*)"')
+
+
+class QBStatusError(Exception):
+    """A QBXML response reported an error statusCode."""
+
+    def __init__(self, message: str, status_code: str):
+        super().__init__(message)
+        self.status_code = status_code
 
 
 class QBXMLParser:
     """Helper class to parse QBXML responses."""
 
     @staticmethod
-    def parse_response(xml_string: str) -> Dict[str, Any]:
+    def parse_response(xml_string: Union[str, bytes, memoryview]) -> Dict[str, Any]:
         """
         Parse QBXML response and return structured data.
 
+        Accepts the response as a str or as UTF-8 bytes / a buffer (e.g. a
+        shared memory view), which is parsed without copying to a str first.
+
+        Only the first *Rs element is parsed; use parse_batch_response for
+        envelopes carrying several requests.
+
         Returns:
             Dict with 'success' (bool), 'data' (parsed content), 'error' (if failed)
         """
         try:
-            root = etree.fromstring(xml_string.encode('utf-8'))
+            root = etree.fromstring(QBXMLParser._to_bytes(xml_string))
+
+            responses = _RESPONSES(root)
+            if not responses:
+                return {'success': True, 'data': {'response_type': ''}}
+
+            return QBXMLParser._parse_rs_element(responses[0])
+
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    @staticmethod
+    def parse_batch_response(xml_string: Union[str, bytes, memoryview]) -> Dict[str, Dict[str, Any]]:
+        """
+        Parse a multi-request QBXML response (see QBXMLBuilder.build_batch_request).
+
+        Every *Rs element in the envelope is parsed on its own, with its own
+        statusCode, so one failed request does not hide the others.
+
+        Args:
+            xml_string: QBXML response string
+
+        Returns:
+            Dict mapping requestID to a result dict in the same shape as parse_response().
+            Responses without a requestID are keyed by their position in the envelope.
+
+        Raises:
+            etree.XMLSyntaxError: If the envelope itself is not valid XML
+        """
+        root = etree.fromstring(QBXMLParser._to_bytes(xml_string))
+
+        results = {}
+        for index, response in enumerate(_RESPONSES(root)):
+            request_id = response.get('requestID', str(index))
+            results[request_id] = QBXMLParser._parse_rs_element(response)
+
+        return results
+
+    @staticmethod
+    def scan_edit_sequences(xml_string: Union[str, bytes, memoryview]) -> Optional[Dict[str, str]]:
+        """
+        Read the TxnID and EditSequence of each transaction in a query response, without parsing it.
+
+        A regular expression pass over the raw response, for callers that only
+        need to know whether anything changed before paying for a parse. The
+        query has to return EditSequence (mind IncludeRetElement projections).
 
+        Args:
+            xml_string: Transaction query response, as a str or UTF-8 bytes / buffer
+
+        Returns:
+            Dict of TxnID -> EditSequence, or None if a *Rs reports a status other
+            than 0 (OK) or 1 (no matches); parse those to get the error
+        """
+        if isinstance(xml_string, str):
+            status_codes, edit_sequences = _STATUS_CODES, _EDIT_SEQUENCES
+        else:
+            status_codes, edit_sequences = _STATUS_CODES_BYTES, _EDIT_SEQUENCES_BYTES
+
+        for match in status_codes.finditer(xml_string):
+            if match.group(1) not in ('0', '1', b'0', b'1'):
+                return None
+
+        if isinstance(xml_string, str):
+            return dict(edit_sequences.findall(xml_string))
+        return {
+            txn_id.decode('utf-8'): edit_sequence.decode('utf-8')
+            for txn_id, edit_sequence in edit_sequences.findall(xml_string)
+        }
+
+    @staticmethod
+    def iter_records(source: Any, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream the records of a query response one at a time.
+
+        The response is fed to a pull parser in chunks. Each *Ret element is
+        converted as soon as it is complete and then freed, so memory use
+        stays flat however many records the response holds (parse_response
+        keeps the whole tree and every record alive at once).
+
+        Args:
+            source: Response as a str, UTF-8 bytes / buffer (e.g. a shared
+                    memory view) or a binary file object
+            chunk_size: Bytes fed to the parser at a time
+
+        Yields:
+            Tuple of (data key, record), e.g. ('invoices', {...}); the record is
+            what parse_response puts under that key (invoice and sales receipt
+            records keep a detached copy of their element and convert on access)
+
+        Raises:
+            QBStatusError: If a query response has an error status
+                           (statusCode 1, no matches, just yields nothing)
+            etree.XMLSyntaxError: If the response is not well-formed XML
+        """
+        parser = etree.XMLPullParser(events=('start', 'end'), tag=_STREAM_TAGS)
+
+        for chunk in QBXMLParser._iter_chunks(source, chunk_size):
+            parser.feed(chunk)
+            yield from QBXMLParser._read_records(parser)
+
+        parser.close()
+        yield from QBXMLParser._read_records(parser)
+
+    @staticmethod
+    def _iter_chunks(source: Any, chunk_size: int) -> Iterator[bytes]:
+        """Split a response (or read a file object) into chunks for the pull parser."""
+        if hasattr(source, 'read'):
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+        # Only one chunk at a time is copied out of a buffer (feed() needs bytes)
+        view = memoryview(QBXMLParser._to_bytes(source))
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start:start + chunk_size])
+
+    @staticmethod
+    def _read_records(parser: etree.XMLPullParser) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Convert the *Ret elements the pull parser has completed so far."""
+        for event, elem in parser.read_events():
+            if event == 'start':
+                # Check an *Rs status before any of its records (*Ret starts carry no statusCode)
+                status_code = elem.get('statusCode')
+                if status_code and status_code not in ('0', '1'):
+                    raise QBStatusError(elem.get('statusMessage') or 'Unknown error', status_code)
+                continue
+
+            converter = _RET_CONVERTERS.get(elem.tag)
+            if converter is None:
+                # End of an *Rs; its records have already been yielded
+                QBXMLParser._release(elem)
+                continue
+
+            data_key, convert = converter
+            record = convert(elem)
+            # Lazy records hold a copy of the element, so it can be cleared now
+            QBXMLParser._release(elem)
+            yield data_key, record
+
+    @staticmethod
+    def _release(elem: etree.Element):
+        """Free a converted element, and the already-released siblings before it."""
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+    @staticmethod
+    def _to_bytes(xml_string: Union[str, bytes, memoryview]) -> Union[bytes, memoryview]:
+        """Encode str input for lxml; bytes-like input is passed through as-is."""
+        if isinstance(xml_string, str):
+            return xml_string.encode('utf-8')
+        return xml_string
+
+    @staticmethod
+    def _parse_rs_element(response: etree.Element) -> Dict[str, Any]:
+        """
+        Parse a single *Rs element from a QBXMLMsgsRs envelope.
+
+        Args:
+            response: The *Rs element (e.g. InvoiceQueryRs)
+
+        Returns:
+            Dict with 'success' (bool), 'data' (parsed content), 'error' (if failed)
+        """
+        try:
             # Check for errors
-            status_code = root.xpath('//QBXMLMsgsRs/*/@statusCode')
-            if status_code and status_code[0] != '0':
-                status_msg = root.xpath('//QBXMLMsgsRs/*/@statusMessage')
+            status_code = response.get('statusCode')
+            if status_code and status_code != '0':
                 return {
                     'success': False,
-                    'error': status_msg[0] if status_msg else 'Unknown error',
-                    'status_code': status_code[0]
+                    'error': response.get('statusMessage') or 'Unknown error',
+                    'status_code': status_code
                 }
 
             # Determine response type
-            response_type = root.xpath('local-name(//QBXMLMsgsRs/*[1])')
-
-            if response_type == 'CustomerAddRs':
-                return QBXMLParser._parse_customer_response(root)
-            elif response_type == 'CustomerQueryRs':
-                return QBXMLParser._parse_customer_query_response(root)
-            elif response_type == 'InvoiceAddRs':
-                return QBXMLParser._parse_invoice_add_response(root)
-            elif response_type == 'InvoiceQueryRs':
-                return QBXMLParser._parse_invoice_query_response(root)
-            elif response_type == 'InvoiceModRs':
-                return QBXMLParser._parse_invoice_mod_response(root)
-            elif response_type == 'SalesReceiptAddRs':
-                return QBXMLParser._parse_sales_receipt_add_response(root)
-            elif response_type == 'SalesReceiptQueryRs':
-                return QBXMLParser._parse_sales_receipt_query_response(root)
-            elif response_type == 'ChargeAddRs':
-                return QBXMLParser._parse_charge_add_response(root)
-            elif response_type == 'ChargeQueryRs':
-                return QBXMLParser._parse_charge_query_response(root)
-            elif response_type == 'AccountQueryRs':
-                return QBXMLParser._parse_account_query_response(root)
-            elif response_type == 'ItemQueryRs':
-                return QBXMLParser._parse_item_query_response(root)
-            elif response_type == 'StandardTermsQueryRs':
-                return QBXMLParser._parse_terms_query_response(root)
-            elif response_type == 'ClassQueryRs':
-                return QBXMLParser._parse_class_query_response(root)
-            elif response_type == 'TxnDelRs':
-                return QBXMLParser._parse_txn_del_response(root)
+            response_type = etree.QName(response).localname
+
+            parse = _RS_PARSERS.get(response_type)
+            if parse is not None:
+                result = parse(response)
             else:
-                return {'success': True, 'data': {'response_type': response_type}}
+                result = {'success': True, 'data': {'response_type': response_type}}
+
+            # Iterator queries report where they are in the result set
+            iterator_id = response.get('iteratorID')
+            if iterator_id and result.get('success'):
+                result['data']['iterator_id'] = iterator_id
+                result['data']['iterator_remaining_count'] = int(response.get('iteratorRemainingCount', '0'))
+
+            return result
 
         except Exception as e:
             return {'success': False, 'error': str(e)}
@@ -70,9 +264,9 @@ class QBXMLParser:
     @staticmethod
     def _parse_customer_response(root: etree.Element) -> Dict[str, Any]:
         """Parse CustomerAddRs response."""
-        customer = root.xpath('//CustomerRet')[0] if root.xpath('//CustomerRet') else None
+        customer = root.find('CustomerRet')
 
-        if not customer:
+        if customer is None:
             return {'success': False, 'error': 'No customer data in response'}
 
         return {
@@ -86,32 +280,72 @@ class QBXMLParser:
         }
 
     @staticmethod
-    def _parse_customer_query_response(root: etree.Element) -> Dict[str, Any]:
-        """Parse CustomerQueryRs response."""
-        customers = root.xpath('//CustomerRet')
+    def _parse_query_response(root: etree.Element, data_key: str,
+                              ret_xpaths: Tuple[etree.XPath, ...], convert) -> Dict[str, Any]:
+        """
+        Parse a *QueryRs response (see _QUERY_RESPONSES).
 
-        if not customers:
-            return {'success': True, 'data': {'customers': []}}
+        Args:
+            root: The *QueryRs element
+            data_key: Key of the record list in 'data' (e.g. 'invoices')
+            ret_xpaths: Precompiled selectors for its *Ret elements, one per Ret type
+            convert: Converts one *Ret element to a dict
 
-        customer_list = []
-        for customer in customers:
-            customer_list.append({
-                'list_id': customer.findtext('ListID'),
-                'name': customer.findtext('Name'),
-                'full_name': customer.findtext('FullName'),
-                'email': customer.findtext('Email') or '',
-                'is_active': customer.findtext('IsActive') == 'true',
-                'balance': float(customer.findtext('Balance', '0'))
-            })
+        Returns:
+            Dict with 'success' and 'data' ({data_key: [records]})
+        """
+        records = []
+        for ret_xpath in ret_xpaths:
+            records.extend(convert(ret) for ret in ret_xpath(root))
+        return {'success': True, 'data': {data_key: records}}
+
+    @staticmethod
+    def _customer_ref(ret: etree.Element) -> Dict[str, Optional[str]]:
+        """Read the CustomerRef of a transaction *Ret element."""
+        list_id = _CUSTOMER_REF_LIST_ID(ret)
+        full_name = _CUSTOMER_REF_FULL_NAME(ret)
+        return {
+            'list_id': list_id[0] if list_id else None,
+            'full_name': intern_text(full_name[0]) if full_name else None
+        }
+
+    @staticmethod
+    def _linked_txn_from_element(linked: etree.Element) -> LinkedTxnRecord:
+        """Convert a LinkedTxn element of an invoice or charge."""
+        linked_txn = LinkedTxnRecord(
+            txn_id=linked.findtext('TxnID'),
+            txn_type=linked.findtext('TxnType'),
+            txn_date=linked.findtext('TxnDate'),
+            ref_number=linked.findtext('RefNumber'),
+            amount=linked.findtext('Amount')
+        )
+
+        # Add payment method if available (typically requires separate payment query)
+        # For now, check if PaymentMethodRef is in the linked transaction
+        payment_method_ref = linked.find('PaymentMethodRef')
+        if payment_method_ref is not None:
+            linked_txn['payment_method'] = intern_text(payment_method_ref.findtext('FullName'))
+
+        return linked_txn
 
-        return {'success': True, 'data': {'customers': customer_list}}
+    @staticmethod
+    def _customer_from_ret(customer: etree.Element) -> CustomerRecord:
+        """Convert a CustomerRet element."""
+        return CustomerRecord(
+            list_id=customer.findtext('ListID'),
+            name=customer.findtext('Name'),
+            full_name=customer.findtext('FullName'),
+            email=customer.findtext('Email') or '',
+            is_active=customer.findtext('IsActive') == 'true',
+            balance=float(customer.findtext('Balance', '0'))
+        )
 
     @staticmethod
     def _parse_invoice_add_response(root: etree.Element) -> Dict[str, Any]:
         """Parse InvoiceAddRs response."""
-        invoice = root.xpath('//InvoiceRet')[0] if root.xpath('//InvoiceRet') else None
+        invoice = root.find('InvoiceRet')
 
-        if not invoice:
+        if invoice is None:
             return {'success': False, 'error': 'No invoice data in response'}
 
         return {
@@ -120,10 +354,7 @@ class QBXMLParser:
                 'txn_id': invoice.findtext('TxnID'),
                 'ref_number': invoice.findtext('RefNumber'),
                 'txn_date': invoice.findtext('TxnDate'),
-                'customer_ref': {
-                    'list_id': invoice.find('CustomerRef/ListID').text if invoice.find('CustomerRef/ListID') is not None else None,
-                    'full_name': invoice.find('CustomerRef/FullName').text if invoice.find('CustomerRef/FullName') is not None else None
-                },
+                'customer_ref': QBXMLParser._customer_ref(invoice),
                 'subtotal': invoice.findtext('Subtotal'),
                 'balance_remaining': invoice.findtext('BalanceRemaining'),
                 'is_paid': invoice.findtext('IsPaid') == 'true',
@@ -132,70 +363,40 @@ class QBXMLParser:
         }
 
     @staticmethod
-    def _parse_invoice_query_response(root: etree.Element) -> Dict[str, Any]:
-        """Parse InvoiceQueryRs response."""
-        invoices = root.xpath('//InvoiceRet')
-
-        if not invoices:
-            return {'success': True, 'data': {'invoices': []}}
-
-        invoice_list = []
-        for invoice in invoices:
-            invoice_data = {
-                'txn_id': invoice.findtext('TxnID'),
-                'ref_number': invoice.findtext('RefNumber'),
-                'txn_date': invoice.findtext('TxnDate'),
-                'customer_ref': {
-                    'list_id': invoice.find('CustomerRef/ListID').text if invoice.find('CustomerRef/ListID') is not None else None,
-                    'full_name': invoice.find('CustomerRef/FullName').text if invoice.find('CustomerRef/FullName') is not None else None
-                },
-                'subtotal': float(invoice.findtext('Subtotal', '0')),
-                'balance_remaining': float(invoice.findtext('BalanceRemaining', '0')),
-                'is_paid': invoice.findtext('IsPaid') == 'true',
-                'is_pending': invoice.findtext('IsPending') == 'true',
-                'edit_sequence': invoice.findtext('EditSequence'),
-                'time_modified': invoice.findtext('TimeModified')
-            }
-
-            # Parse deposit/payment info if present
-            deposit_to_account_ref = invoice.find('DepositToAccountRef')
-            if deposit_to_account_ref is not None:
-                invoice_data['deposit_account'] = {
-                    'list_id': deposit_to_account_ref.findtext('ListID'),
-                    'full_name': deposit_to_account_ref.findtext('FullName')
-                }
-
-            # Parse linked transactions (payments)
-            linked_txns = invoice.xpath('LinkedTxn')
-            if linked_txns:
-                invoice_data['linked_transactions'] = []
-                for linked in linked_txns:
-                    linked_data = {
-                        'txn_id': linked.findtext('TxnID'),
-                        'txn_type': linked.findtext('TxnType'),
-                        'txn_date': linked.findtext('TxnDate'),
-                        'ref_number': linked.findtext('RefNumber'),
-                        'amount': linked.findtext('Amount')
-                    }
-
-                    # Add payment method if available (typically requires separate payment query)
-                    # For now, check if PaymentMethodRef is in the linked transaction
-                    payment_method_ref = linked.find('PaymentMethodRef')
-                    if payment_method_ref is not None:
-                        linked_data['payment_method'] = payment_method_ref.findtext('FullName')
+    def _invoice_from_ret(invoice: etree.Element) -> LazyRecord:
+        """
+        Wrap an InvoiceRet element (fields convert on first access, see _INVOICE_FIELDS).
 
-                    invoice_data['linked_transactions'].append(linked_data)
+        The record holds a detached copy of the element, so keeping the record
+        does not keep the rest of the response tree alive.
+        """
+        return LazyRecord(copy.deepcopy(invoice), _INVOICE_FIELDS)
 
-            invoice_list.append(invoice_data)
+    @staticmethod
+    def _deposit_account(ret: etree.Element) -> Any:
+        """Get the DepositToAccountRef of a transaction as a dict, or MISSING."""
+        deposit_to_account_ref = ret.find('DepositToAccountRef')
+        if deposit_to_account_ref is None:
+            return MISSING
+        return {
+            'list_id': deposit_to_account_ref.findtext('ListID'),
+            'full_name': deposit_to_account_ref.findtext('FullName')
+        }
 
-        return {'success': True, 'data': {'invoices': invoice_list}}
+    @staticmethod
+    def _linked_transactions(ret: etree.Element) -> Any:
+        """Get the LinkedTxns (payments) of a transaction, or MISSING if it has none."""
+        linked_txns = _LINKED_TXNS(ret)
+        if not linked_txns:
+            return MISSING
+        return [QBXMLParser._linked_txn_from_element(linked) for linked in linked_txns]
 
     @staticmethod
     def _parse_invoice_mod_response(root: etree.Element) -> Dict[str, Any]:
         """Parse InvoiceModRs response."""
-        invoice = root.xpath('//InvoiceRet')[0] if root.xpath('//InvoiceRet') else None
+        invoice = root.find('InvoiceRet')
 
-        if not invoice:
+        if invoice is None:
             return {'success': False, 'error': 'No invoice data in response'}
 
         return {
@@ -211,9 +412,9 @@ class QBXMLParser:
     @staticmethod
     def _parse_sales_receipt_add_response(root: etree.Element) -> Dict[str, Any]:
         """Parse SalesReceiptAddRs response."""
-        sales_receipt = root.xpath('//SalesReceiptRet')[0] if root.xpath('//SalesReceiptRet') else None
+        sales_receipt = root.find('SalesReceiptRet')
 
-        if not sales_receipt:
+        if sales_receipt is None:
             return {'success': False, 'error': 'No sales receipt data in response'}
 
         return {
@@ -222,10 +423,7 @@ class QBXMLParser:
                 'txn_id': sales_receipt.findtext('TxnID'),
                 'ref_number': sales_receipt.findtext('RefNumber'),
                 'txn_date': sales_receipt.findtext('TxnDate'),
-                'customer_ref': {
-                    'list_id': sales_receipt.find('CustomerRef/ListID').text if sales_receipt.find('CustomerRef/ListID') is not None else None,
-                    'full_name': sales_receipt.find('CustomerRef/FullName').text if sales_receipt.find('CustomerRef/FullName') is not None else None
-                },
+                'customer_ref': QBXMLParser._customer_ref(sales_receipt),
                 'subtotal': sales_receipt.findtext('Subtotal'),
                 'total_amount': sales_receipt.findtext('TotalAmount'),
                 'balance_remaining': sales_receipt.findtext('BalanceRemaining'),
@@ -235,97 +433,40 @@ class QBXMLParser:
         }
 
     @staticmethod
-    def _parse_sales_receipt_query_response(root: etree.Element) -> Dict[str, Any]:
-        """Parse SalesReceiptQueryRs response."""
-        sales_receipts = root.xpath('//SalesReceiptRet')
-
-        if not sales_receipts:
-            return {'success': True, 'data': {'sales_receipts': []}}
-
-        receipt_list = []
-        for receipt in sales_receipts:
-            receipt_data = {
-                'txn_id': receipt.findtext('TxnID'),
-                'ref_number': receipt.findtext('RefNumber'),
-                'txn_date': receipt.findtext('TxnDate'),
-                'txn_number': receipt.findtext('TxnNumber'),
-                'customer_ref': {
-                    'list_id': receipt.find('CustomerRef/ListID').text if receipt.find('CustomerRef/ListID') is not None else None,
-                    'full_name': receipt.find('CustomerRef/FullName').text if receipt.find('CustomerRef/FullName') is not None else None
-                },
-                'subtotal': float(receipt.findtext('Subtotal', '0')),
-                'total_amount': float(receipt.findtext('TotalAmount', '0')),
-                'balance_remaining': float(receipt.findtext('BalanceRemaining', '0')),
-                'is_pending': receipt.findtext('IsPending') == 'true',
-                'is_to_be_printed': receipt.findtext('IsToBePrinted') == 'true',
-                'is_to_be_emailed': receipt.findtext('IsToBeEmailed') == 'true',
-                'edit_sequence': receipt.findtext('EditSequence'),
-                'time_modified': receipt.findtext('TimeModified'),
-                'time_created': receipt.findtext('TimeCreated')
-            }
-
-            # Parse deposit account if present
-            deposit_to_account_ref = receipt.find('DepositToAccountRef')
-            if deposit_to_account_ref is not None:
-                receipt_data['deposit_account'] = {
-                    'list_id': deposit_to_account_ref.findtext('ListID'),
-                    'full_name': deposit_to_account_ref.findtext('FullName')
-                }
-
-            receipt_list.append(receipt_data)
-
-        return {'success': True, 'data': {'sales_receipts': receipt_list}}
+    def _sales_receipt_from_ret(receipt: etree.Element) -> LazyRecord:
+        """Wrap a SalesReceiptRet element (fields convert on first access, see _SALES_RECEIPT_FIELDS)."""
+        return LazyRecord(copy.deepcopy(receipt), _SALES_RECEIPT_FIELDS)
 
     @staticmethod
-    def _parse_account_query_response(root: etree.Element) -> Dict[str, Any]:
-        """Parse AccountQueryRs response."""
-        accounts = root.xpath('//AccountRet')
-
-        if not accounts:
-            return {'success': True, 'data': {'accounts': []}}
-
-        account_list = []
-        for account in accounts:
-            account_list.append({
-                'list_id': account.findtext('ListID'),
-                'name': account.findtext('Name'),
-                'full_name': account.findtext('FullName'),
-                'account_type': account.findtext('AccountType'),
-                'balance': float(account.findtext('Balance', '0')),
-                'account_number': account.findtext('AccountNumber')
-            })
-
-        return {'success': True, 'data': {'accounts': account_list}}
+    def _account_from_ret(account: etree.Element) -> AccountRecord:
+        """Convert an AccountRet element."""
+        return AccountRecord(
+            list_id=account.findtext('ListID'),
+            name=account.findtext('Name'),
+            full_name=account.findtext('FullName'),
+            account_type=account.findtext('AccountType'),
+            balance=float(account.findtext('Balance', '0')),
+            account_number=account.findtext('AccountNumber')
+        )
 
     @staticmethod
-    def _parse_item_query_response(root: etree.Element) -> Dict[str, Any]:
-        """Parse ItemQueryRs response."""
-        # Items can be of different types (Service, Inventory, NonInventory, etc.)
-        # We'll look for common item types
-        item_types = ['ItemServiceRet', 'ItemInventoryRet', 'ItemNonInventoryRet',
-                      'ItemOtherChargeRet', 'ItemDiscountRet']
-
-        items = []
-        for item_type in item_types:
-            found_items = root.xpath(f'//{item_type}')
-            for item in found_items:
-                items.append({
-                    'list_id': item.findtext('ListID'),
-                    'name': item.findtext('Name'),
-                    'full_name': item.findtext('FullName'),
-                    'type': item_type.replace('Item', '').replace('Ret', ''),
-                    'description': item.findtext('SalesOrPurchaseDesc') or item.findtext('SalesDesc') or '',
-                    'is_active': item.findtext('IsActive') == 'true'
-                })
-
-        return {'success': True, 'data': {'items': items}}
+    def _item_from_ret(item: etree.Element) -> ItemRecord:
+        """Convert an Item*Ret element (the type comes from the tag)."""
+        return ItemRecord(
+            list_id=item.findtext('ListID'),
+            name=item.findtext('Name'),
+            full_name=item.findtext('FullName'),
+            type=item.tag.replace('Item', '').replace('Ret', ''),
+            description=item.findtext('SalesOrPurchaseDesc') or item.findtext('SalesDesc') or '',
+            is_active=item.findtext('IsActive') == 'true'
+        )
 
     @staticmethod
     def _parse_charge_add_response(root: etree.Element) -> Dict[str, Any]:
         """Parse ChargeAddRs response."""
-        charge = root.xpath('//ChargeRet')[0] if root.xpath('//ChargeRet') else None
+        charge = root.find('ChargeRet')
 
-        if not charge:
+        if charge is None:
             return {'success': False, 'error': 'No charge data in response'}
 
         return {
@@ -333,10 +474,7 @@ class QBXMLParser:
             'data': {
                 'txn_id': charge.findtext('TxnID'),
                 'txn_date': charge.findtext('TxnDate'),
-                'customer_ref': {
-                    'list_id': charge.find('CustomerRef/ListID').text if charge.find('CustomerRef/ListID') is not None else None,
-                    'full_name': charge.find('CustomerRef/FullName').text if charge.find('CustomerRef/FullName') is not None else None
-                },
+                'customer_ref': QBXMLParser._customer_ref(charge),
                 'amount': charge.findtext('Amount'),
                 'quantity': charge.findtext('Quantity'),
                 'memo': charge.findtext('Memo'),
@@ -345,94 +483,71 @@ class QBXMLParser:
         }
 
     @staticmethod
-    def _parse_charge_query_response(root: etree.Element) -> Dict[str, Any]:
-        """Parse ChargeQueryRs response."""
-        charges = root.xpath('//ChargeRet')
-
-        if not charges:
-            return {'success': True, 'data': {'charges': []}}
-
-        charges_list = []
-        for charge in charges:
-            charge_data = {
-                'txn_id': charge.findtext('TxnID'),
-                'ref_number': charge.findtext('RefNumber'),
-                'txn_date': charge.findtext('TxnDate'),
-                'customer_ref': {
-                    'list_id': charge.find('CustomerRef/ListID').text if charge.find('CustomerRef/ListID') is not None else None,
-                    'full_name': charge.find('CustomerRef/FullName').text if charge.find('CustomerRef/FullName') is not None else None
-                },
-                'amount': float(charge.findtext('Amount')) if charge.findtext('Amount') else 0.0,
-                'balance_remaining': float(charge.findtext('BalanceRemaining', '0')),
-                'is_paid': charge.findtext('IsPaid') == 'true',
-                'quantity': charge.findtext('Quantity'),
-                'desc': charge.findtext('Desc'),
-                'edit_sequence': charge.findtext('EditSequence')
-            }
-
-            # Parse linked transactions (payments)
-            linked_txns = charge.xpath('LinkedTxn')
-            if linked_txns:
-                charge_data['linked_transactions'] = []
-                for linked in linked_txns:
-                    linked_data = {
-                        'txn_id': linked.findtext('TxnID'),
-                        'txn_type': linked.findtext('TxnType'),
-                        'txn_date': linked.findtext('TxnDate'),
-                        'ref_number': linked.findtext('RefNumber'),
-                        'amount': linked.findtext('Amount')
-                    }
-
-                    # Add payment method if available
-                    payment_method_ref = linked.find('PaymentMethodRef')
-                    if payment_method_ref is not None:
-                        linked_data['payment_method'] = payment_method_ref.findtext('FullName')
-
-                    charge_data['linked_transactions'].append(linked_data)
+    def _charge_from_ret(charge: etree.Element) -> Dict[str, Any]:
+        """Convert a ChargeRet element."""
+        charge_data = {
+            'txn_id': charge.findtext('TxnID'),
+            'ref_number': charge.findtext('RefNumber'),
+            'txn_date': charge.findtext('TxnDate'),
+            'customer_ref': QBXMLParser._customer_ref(charge),
+            'amount': float(charge.findtext('Amount')) if charge.findtext('Amount') else 0.0,
+            'balance_remaining': float(charge.findtext('BalanceRemaining', '0')),
+            'is_paid': charge.findtext('IsPaid') == 'true',
+            'quantity': charge.findtext('Quantity'),
+            'desc': charge.findtext('Desc'),
+            'edit_sequence': charge.findtext('EditSequence')
+        }
 
-            charges_list.append(charge_data)
+        # Parse linked transactions (payments)
+        linked_txns = _LINKED_TXNS(charge)
+        if linked_txns:
+            charge_data['linked_transactions'] = []
+            for linked in linked_txns:
+                charge_data['linked_transactions'].append(QBXMLParser._linked_txn_from_element(linked))
 
-        return {'success': True, 'data': {'charges': charges_list}}
+        return charge_data
 
     @staticmethod
-    def _parse_terms_query_response(root: etree.Element) -> Dict[str, Any]:
-        """Parse StandardTermsQueryRs response."""
-        terms_list = root.xpath('//StandardTermsRet')
-
-        if not terms_list:
-            return {'success': True, 'data': {'terms': []}}
-
-        terms = []
-        for term in terms_list:
-            terms.append({
-                'list_id': term.findtext('ListID'),
-                'name': term.findtext('Name'),
-                'is_active': term.findtext('IsActive') == 'true',
-                'std_due_days': term.findtext('StdDueDays'),
-                'std_discount_days': term.findtext('StdDiscountDays'),
-                'discount_pct': term.findtext('DiscountPct')
-            })
-
-        return {'success': True, 'data': {'terms': terms}}
+    def _terms_from_ret(term: etree.Element) -> TermsRecord:
+        """Convert a StandardTermsRet element."""
+        return TermsRecord(
+            list_id=term.findtext('ListID'),
+            name=term.findtext('Name'),
+            is_active=term.findtext('IsActive') == 'true',
+            std_due_days=term.findtext('StdDueDays'),
+            std_discount_days=term.findtext('StdDiscountDays'),
+            discount_pct=term.findtext('DiscountPct')
+        )
 
     @staticmethod
-    def _parse_class_query_response(root: etree.Element) -> Dict[str, Any]:
-        """Parse ClassQueryRs response."""
-        classes_list = root.xpath('//ClassRet')
+    def _class_from_ret(cls: etree.Element) -> ClassRecord:
+        """Convert a ClassRet element."""
+        return ClassRecord(
+            list_id=cls.findtext('ListID'),
+            name=cls.findtext('Name'),
+            full_name=cls.findtext('FullName'),
+            is_active=cls.findtext('IsActive') == 'true'
+        )
 
-        if not classes_list:
-            return {'success': True, 'data': {'classes': []}}
+    @staticmethod
+    def _parse_host_query_response(root: etree.Element) -> Dict[str, Any]:
+        """Parse HostQueryRs response."""
+        host = root.find('HostRet')
 
-        classes = []
-        for cls in classes_list:
-            classes.append({
-                'list_id': cls.findtext('ListID'),
-                'name': cls.findtext('Name'),
-                'full_name': cls.findtext('FullName'),
-                'is_active': cls.findtext('IsActive') == 'true'
-            })
+        if host is None:
+            return {'success': False, 'error': 'No host data in response'}
 
-        return {'success': True, 'data': {'classes': classes}}
+        return {
+            'success': True,
+            'data': {
+                'product_name': host.findtext('ProductName'),
+                'major_version': host.findtext('MajorVersion'),
+                'minor_version': host.findtext('MinorVersion'),
+                'country': host.findtext('Country'),
+                'supported_qbxml_versions': [v.text for v in host.findall('SupportedQBXMLVersion')],
+                'qb_file_mode': host.findtext('QBFileMode')
+            }
+        }
 
     @staticmethod
     def _parse_txn_del_response(root: etree.Element) -> Dict[str, Any]:
@@ -442,19 +557,104 @@ class QBXMLParser:
         TxnDelRs doesn't return much data - success is indicated by statusCode='0'.
         The response contains TxnDelType and TxnID confirming what was deleted.
         """
-        txn_del_rs = root.xpath('//TxnDelRs')
-
-        if not txn_del_rs:
-            return {'success': False, 'error': 'No TxnDelRs in response'}
-
-        txn_del_rs = txn_del_rs[0]
-
         return {
             'success': True,
             'data': {
                 'deleted': True,
-                'txn_del_type': txn_del_rs.findtext('TxnDelType'),
-                'txn_id': txn_del_rs.findtext('TxnID'),
+                'txn_del_type': root.findtext('TxnDelType'),
+                'txn_id': root.findtext('TxnID'),
                 'message': 'Transaction deleted successfully'
             }
         }
+
+
+def _text(tag: str):
+    """Field converter: the element's text (None if absent)."""
+    return lambda ret: ret.findtext(tag)
+
+
+def _amount(tag: str):
+    """Field converter: the element's text as a float (0.0 if absent)."""
+    return lambda ret: float(ret.findtext(tag, '0'))
+
+
+def _flag(tag: str):
+    """Field converter: whether the element's text is 'true'."""
+    return lambda ret: ret.findtext(tag) == 'true'
+
+
+# LazyRecord fields of an InvoiceRet, in the order the keys iterate
+_INVOICE_FIELDS = {
+    'txn_id': _text('TxnID'),
+    'ref_number': _text('RefNumber'),
+    'txn_date': _text('TxnDate'),
+    'customer_ref': QBXMLParser._customer_ref,
+    'subtotal': _amount('Subtotal'),
+    'balance_remaining': _amount('BalanceRemaining'),
+    'is_paid': _flag('IsPaid'),
+    'is_pending': _flag('IsPending'),
+    'edit_sequence': _text('EditSequence'),
+    'time_modified': _text('TimeModified'),
+    'deposit_account': QBXMLParser._deposit_account,
+    'linked_transactions': QBXMLParser._linked_transactions,
+}
+
+# LazyRecord fields of a SalesReceiptRet
+_SALES_RECEIPT_FIELDS = {
+    'txn_id': _text('TxnID'),
+    'ref_number': _text('RefNumber'),
+    'txn_date': _text('TxnDate'),
+    'txn_number': _text('TxnNumber'),
+    'customer_ref': QBXMLParser._customer_ref,
+    'subtotal': _amount('Subtotal'),
+    'total_amount': _amount('TotalAmount'),
+    'balance_remaining': _amount('BalanceRemaining'),
+    'is_pending': _flag('IsPending'),
+    'is_to_be_printed': _flag('IsToBePrinted'),
+    'is_to_be_emailed': _flag('IsToBeEmailed'),
+    'edit_sequence': _text('EditSequence'),
+    'time_modified': _text('TimeModified'),
+    'time_created': _text('TimeCreated'),
+    'deposit_account': QBXMLParser._deposit_account,
+}
+
+# Query responses: *Rs tag -> (data key, *Ret tags, converter)
+_QUERY_RESPONSES = {
+    'CustomerQueryRs': ('customers', ('CustomerRet',), QBXMLParser._customer_from_ret),
+    'InvoiceQueryRs': ('invoices', ('InvoiceRet',), QBXMLParser._invoice_from_ret),
+    'SalesReceiptQueryRs': ('sales_receipts', ('SalesReceiptRet',), QBXMLParser._sales_receipt_from_ret),
+    'ChargeQueryRs': ('charges', ('ChargeRet',), QBXMLParser._charge_from_ret),
+    'AccountQueryRs': ('accounts', ('AccountRet',), QBXMLParser._account_from_ret),
+    'ItemQueryRs': ('items', ITEM_RET_TAGS, QBXMLParser._item_from_ret),
+    'StandardTermsQueryRs': ('terms', ('StandardTermsRet',), QBXMLParser._terms_from_ret),
+    'ClassQueryRs': ('classes', ('ClassRet',), QBXMLParser._class_from_ret),
+}
+
+# *Rs tag -> parser taking the *Rs element; anything else parses to just its response_type
+_RS_PARSERS = {
+    'CustomerAddRs': QBXMLParser._parse_customer_response,
+    'InvoiceAddRs': QBXMLParser._parse_invoice_add_response,
+    'InvoiceModRs': QBXMLParser._parse_invoice_mod_response,
+    'SalesReceiptAddRs': QBXMLParser._parse_sales_receipt_add_response,
+    'ChargeAddRs': QBXMLParser._parse_charge_add_response,
+    'TxnDelRs': QBXMLParser._parse_txn_del_response,
+    'HostQueryRs': QBXMLParser._parse_host_query_response,
+    **{
+        rs_tag: partial(QBXMLParser._parse_query_response, data_key=data_key,
+                        ret_xpaths=tuple(etree.XPath(tag) for tag in ret_tags), convert=convert)
+        for rs_tag, (data_key, ret_tags, convert) in _QUERY_RESPONSES.items()
+    },
+}
+
+# *Ret element -> (parse_response data key, converter), for iter_records
+_RET_CONVERTERS = {
+    tag: (data_key, convert)
+    for data_key, ret_tags, convert in _QUERY_RESPONSES.values()
+    for tag in ret_tags
+}
+
+# Query responses whose status iter_records checks
+_QUERY_RS_TAGS = tuple(_QUERY_RESPONSES)
+
+# Elements the pull parser reports (start events are only used for the *Rs status)
+_STREAM_TAGS = _QUERY_RS_TAGS + tuple(_RET_CONVERTERS)
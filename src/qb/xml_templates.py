@@ -0,0 +1,248 @@
+"""
+Template-based QBXML serialization for the high-volume Add requests.
+
+Each message is compiled once, at import, into string fragments laid out the
+way QBXMLBuilder's lxml path serializes it (processing instruction, two-space
+pretty printing, QBXML spec element order). Rendering a request is then just
+escaping the values and joining fragments, with no element tree, no
+serializer pass and no bytes round trip. The output is byte-identical to the
+lxml path, which stays available as the reference (QBXMLBuilder.use_templates).
+"""
+
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+
+# Field kinds
+TEXT = 'text'        # <Tag>value</Tag>
+NUMBER = 'number'    # <Tag>str(value)</Tag>
+REF = 'ref'          # <Tag><ListID>value</ListID></Tag>
+CONST = 'const'      # <Tag>constant</Tag>, always emitted
+GROUP = 'group'      # <Tag> + child fields read from a nested dict
+REPEAT = 'repeat'    # GROUP once per dict in a list
+
+# Characters lxml refuses in element text: controls below 0x20 except tab, LF and CR,
+# lone surrogates and the non-characters U+FFFE / U+FFFF
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+
+# Anything escape_text has to look at; most values contain none of these
+_SPECIAL_CHARS = re.compile('[&<>\r\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+
+_PROLOG = '<?qbxml version="13.0"?>\n<QBXML>\n  <QBXMLMsgsRq onError="stopOnError">\n'
+_EPILOG = '  </QBXMLMsgsRq>\n</QBXML>\n'
+
+
+def escape_text(value: str) -> str:
+    """
+    Escape element text exactly as lxml does.
+
+    Args:
+        value: Element text
+
+    Returns:
+        Escaped text
+
+    Raises:
+        TypeError: If value is not a str (lxml only accepts text)
+        ValueError: If value contains characters XML cannot represent
+    """
+    if not isinstance(value, str):
+        raise TypeError(f"Argument must be bytes or unicode, got '{type(value).__name__}'")
+    if _SPECIAL_CHARS.search(value) is None:
+        return value
+    if _INVALID_XML_CHARS.search(value):
+        raise ValueError("All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters")
+    if '&' in value:
+        value = value.replace('&', '&amp;')
+    if '<' in value:
+        value = value.replace('<', '&lt;')
+    if '>' in value:
+        value = value.replace('>', '&gt;')
+    if '\r' in value:
+        value = value.replace('\r', '&#13;')
+    return value
+
+
+class Field(NamedTuple):
+    """One element of a message template."""
+    key: Optional[str]                  # Key in the data dict (None for CONST)
+    tag: str                            # QBXML element name
+    kind: str = TEXT
+    required: bool = False              # Missing key raises KeyError instead of skipping the element
+    value: Optional[str] = None         # CONST text
+    children: Tuple['Field', ...] = ()  # GROUP / REPEAT child fields
+
+
+class _CompiledField(NamedTuple):
+    """A Field with its fragments precomputed for a nesting depth."""
+    key: Optional[str]
+    kind: str
+    required: bool
+    open: str                           # Text before the value (or the whole element for CONST)
+    close: str                          # Text after the value
+    empty: str                          # Element with no text (None) / no children
+    children: Tuple['_CompiledField', ...]
+
+
+def _compile(fields: Sequence[Field], depth: int) -> Tuple[_CompiledField, ...]:
+    """Precompute the fragments of each field at a nesting depth."""
+    indent = '  ' * depth
+    compiled = []
+    for field in fields:
+        tag = field.tag
+        empty = f'{indent}<{tag}/>\n'
+        if field.kind == REF:
+            open_ = f'{indent}<{tag}>\n{indent}  <ListID>'
+            close = f'</ListID>\n{indent}</{tag}>\n'
+            empty = f'{indent}<{tag}>\n{indent}  <ListID/>\n{indent}</{tag}>\n'
+        elif field.kind in (GROUP, REPEAT):
+            open_ = f'{indent}<{tag}>\n'
+            close = f'{indent}</{tag}>\n'
+        elif field.kind == CONST:
+            open_ = f'{indent}<{tag}>{escape_text(field.value)}</{tag}>\n'
+            close = ''
+        else:
+            open_ = f'{indent}<{tag}>'
+            close = f'</{tag}>\n'
+        compiled.append(_CompiledField(field.key, field.kind, field.required, open_, close, empty,
+                                       _compile(field.children, depth + 1)))
+    return tuple(compiled)
+
+
+def _render_fields(parts: List[str], fields: Tuple[_CompiledField, ...], data: Dict[str, Any]):
+    """Append the rendered fields of one element to parts."""
+    append = parts.append
+    for compiled in fields:
+        key, kind, required, open_, close, empty, _ = compiled
+
+        if kind == CONST:
+            append(open_)
+            continue
+
+        if key in data:
+            value = data[key]
+        elif required:
+            raise KeyError(key)
+        else:
+            continue
+
+        if kind == GROUP:
+            _render_group(parts, compiled, value)
+        elif kind == REPEAT:
+            for entry in value:
+                _render_group(parts, compiled, entry)
+        elif kind == NUMBER:
+            append(open_ + escape_text(str(value)) + close)
+        elif value is None:
+            append(empty)
+        else:
+            append(open_ + escape_text(value) + close)
+
+
+def _render_group(parts: List[str], compiled: _CompiledField, data: Dict[str, Any]):
+    """Append a GROUP element (or one REPEAT entry) to parts."""
+    start = len(parts)
+    parts.append(compiled.open)
+    _render_fields(parts, compiled.children, data)
+    if len(parts) == start + 1:
+        parts[start] = compiled.empty
+    else:
+        parts.append(compiled.close)
+
+
+class MessageTemplate:
+    """A precompiled single-request QBXML document."""
+
+    def __init__(self, request_tag: str, body_tag: str, fields: Sequence[Field], request_id: str = '1'):
+        """
+        Compile a message template.
+
+        Args:
+            request_tag: *Rq element name (e.g. 'InvoiceAddRq')
+            body_tag: Element inside it that holds the fields (e.g. 'InvoiceAdd')
+            fields: Fields in QBXML spec order
+            request_id: requestID attribute of the *Rq element
+        """
+        self.head = f'{_PROLOG}    <{request_tag} requestID="{request_id}">\n      <{body_tag}>\n'
+        self.tail = f'      </{body_tag}>\n    </{request_tag}>\n{_EPILOG}'
+        self.fields = _compile(fields, 4)
+
+    def render(self, data: Dict[str, Any]) -> str:
+        """
+        Render a request.
+
+        Args:
+            data: Dict with the template's keys
+
+        Returns:
+            QBXML formatted request
+
+        Raises:
+            KeyError: If a required key is missing
+            TypeError / ValueError: If a value is not valid element text (see escape_text)
+        """
+        parts = [self.head]
+        _render_fields(parts, self.fields, data)
+        parts.append(self.tail)
+        return ''.join(parts)
+
+
+# Field order below is the QBXML spec order (see the comments in QBXMLBuilder)
+
+_ADDRESS_FIELDS = (
+    Field('addr1', 'Addr1'),
+    Field('addr2', 'Addr2'),
+    Field('city', 'City'),
+    Field('state', 'State'),
+    Field('postal_code', 'PostalCode'),
+)
+
+_LINE_FIELDS = (
+    Field('item_ref', 'ItemRef', REF),
+    Field('desc', 'Desc'),
+    Field('quantity', 'Quantity', NUMBER),
+    Field('rate', 'Rate', NUMBER),
+)
+
+CUSTOMER_ADD = MessageTemplate('CustomerAddRq', 'CustomerAdd', (
+    Field('name', 'Name', required=True),
+    Field('parent_ref', 'ParentRef', REF),
+    Field('company', 'CompanyName'),
+    Field('first_name', 'FirstName'),
+    Field('last_name', 'LastName'),
+    Field('billing_address', 'BillAddress', GROUP, children=_ADDRESS_FIELDS),
+    Field('shipping_address', 'ShipAddress', GROUP, children=_ADDRESS_FIELDS),
+    Field('phone', 'Phone'),
+    Field('email', 'Email'),
+))
+
+INVOICE_ADD = MessageTemplate('InvoiceAddRq', 'InvoiceAdd', (
+    Field('customer_ref', 'CustomerRef', REF, required=True),
+    Field('class_ref', 'ClassRef', REF),
+    Field('txn_date', 'TxnDate'),
+    Field('ref_number', 'RefNumber'),
+    Field(None, 'IsPending', CONST, value='false'),
+    Field('po_number', 'PONumber'),
+    Field('terms_ref', 'TermsRef', REF),
+    Field('memo', 'Memo'),
+    Field('line_items', 'InvoiceLineAdd', REPEAT, children=_LINE_FIELDS),
+))
+
+SALES_RECEIPT_ADD = MessageTemplate('SalesReceiptAddRq', 'SalesReceiptAdd', (
+    Field('customer_ref', 'CustomerRef', REF, required=True),
+    Field('txn_date', 'TxnDate'),
+    Field('ref_number', 'RefNumber'),
+    Field(None, 'IsPending', CONST, value='false'),
+    Field('memo', 'Memo'),
+    Field('line_items', 'SalesReceiptLineAdd', REPEAT, children=_LINE_FIELDS),
+))
+
+CHARGE_ADD = MessageTemplate('ChargeAddRq', 'ChargeAdd', (
+    Field('customer_ref', 'CustomerRef', REF, required=True),
+    Field('txn_date', 'TxnDate'),
+    Field('ref_number', 'RefNumber'),
+    Field('item_ref', 'ItemRef', REF),
+    Field('quantity', 'Quantity', NUMBER),
+    Field('amount', 'Rate', NUMBER),
+    Field('memo', 'Desc'),
+))
@@ -26,14 +26,18 @@ from .actions import (
     # Customer actions
     add_customer,
     set_customers,
+    append_customers,
     # Item actions
     set_items,
+    append_items,
     # Terms actions
     set_terms,
     # Class actions
     set_classes,
     # Account actions
     set_accounts,
+    # Reference data actions
+    set_reference_data,
     # Invoice actions
     add_invoice,
     update_invoice,
@@ -66,10 +70,13 @@ __all__ = [
     # Actions
     'add_customer',
     'set_customers',
+    'append_customers',
     'set_items',
+    'append_items',
     'set_terms',
     'set_classes',
     'set_accounts',
+    'set_reference_data',
     'add_invoice',
     'update_invoice',
     'add_sales_receipt',
@@ -21,12 +21,22 @@ def set_customers(customers: List[Dict[str, Any]]) -> Dict[str, Any]:
     return {'type': 'SET_CUSTOMERS', 'payload': customers}
 
 
+def append_customers(customers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create APPEND_CUSTOMERS action (adds a page of loaded customers)."""
+    return {'type': 'APPEND_CUSTOMERS', 'payload': customers}
+
+
 # Item actions
 def set_items(items: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Create SET_ITEMS action."""
     return {'type': 'SET_ITEMS', 'payload': items}
 
 
+def append_items(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create APPEND_ITEMS action (adds a page of loaded items)."""
+    return {'type': 'APPEND_ITEMS', 'payload': items}
+
+
 # Terms actions
 def set_terms(terms: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Create SET_TERMS action."""
@@ -45,6 +55,23 @@ def set_accounts(accounts: List[Dict[str, Any]]) -> Dict[str, Any]:
     return {'type': 'SET_ACCOUNTS', 'payload': accounts}
 
 
+# Reference data actions
+def set_reference_data(customers: List[Dict[str, Any]], items: List[Dict[str, Any]],
+                       terms: List[Dict[str, Any]], classes: List[Dict[str, Any]],
+                       accounts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create SET_REFERENCE_DATA action (replaces all five lists in one update)."""
+    return {
+        'type': 'SET_REFERENCE_DATA',
+        'payload': {
+            'customers': customers,
+            'items': items,
+            'terms': terms,
+            'classes': classes,
+            'accounts': accounts
+        }
+    }
+
+
 # Invoice actions
 def add_invoice(invoice: InvoiceRecord) -> Dict[str, Any]:
     """Create ADD_INVOICE action."""
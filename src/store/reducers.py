@@ -24,11 +24,21 @@ def reducer(state: AppState, action: Dict[str, Any]) -> AppState:
                 **{**state.__dict__, 'customers': payload}
             )
 
+        case 'APPEND_CUSTOMERS':
+            return AppState(
+                **{**state.__dict__, 'customers': state.customers + payload}
+            )
+
         case 'SET_ITEMS':
             return AppState(
                 **{**state.__dict__, 'items': payload}
             )
 
+        case 'APPEND_ITEMS':
+            return AppState(
+                **{**state.__dict__, 'items': state.items + payload}
+            )
+
         case 'SET_TERMS':
             return AppState(
                 **{**state.__dict__, 'terms': payload}
@@ -44,6 +54,11 @@ def reducer(state: AppState, action: Dict[str, Any]) -> AppState:
                 **{**state.__dict__, 'accounts': payload}
             )
 
+        case 'SET_REFERENCE_DATA':
+            return AppState(
+                **{**state.__dict__, **payload}
+            )
+
         case 'ADD_INVOICE':
             return AppState(
                 **{**state.__dict__, 'invoices': state.invoices + [payload]}
@@ -1,7 +1,7 @@
 """
 Settings tab setup for QuickBooks Desktop Test Tool.
 
-Handles log verbosity, session persistence, and transaction cleanup.
+Handles log verbosity, session persistence, transaction cleanup, and connection manager stats.
 """
 
 import tkinter as tk
@@ -13,7 +13,8 @@ from .ui_utils import create_scrollable_frame
 from .ui_constants import (
     SPACING_SM, SPACING_MD, SPACING_LG, SPACING_XL,
     FONT_BODY, FONT_BOLD, FONT_CAPTION, FONT_CAPTION_BOLD,
-    COMBOBOX_WIDTH_SHORT, TEXT_WRAPLENGTH
+    COMBOBOX_WIDTH_SHORT, TEXT_WRAPLENGTH,
+    TREEVIEW_HEIGHT_SHORT, COLUMN_WIDTH_SM, COLUMN_WIDTH_MD, COLUMN_WIDTH_XL
 )
 
 
@@ -194,3 +195,53 @@ def setup_settings_tab(app):
         foreground='red'
     )
     warning_label.pack(anchor='w', pady=(SPACING_SM, 0))
+
+    # Separator
+    ttk.Separator(content, orient='horizontal').pack(fill='x', pady=SPACING_LG)
+
+    # Connection Manager Stats Section
+    stats_frame = ttk.LabelFrame(content, text="Connection Manager Stats", padding=SPACING_MD)
+    stats_frame.pack(fill='x', pady=(0, SPACING_MD))
+
+    # Queue depth / connection summary
+    app.manager_stats_summary_label = ttk.Label(
+        stats_frame,
+        text="Waiting for connection manager...",
+        foreground='gray'
+    )
+    app.manager_stats_summary_label.pack(anchor='w', pady=(0, SPACING_SM))
+
+    # Client-side timing summary (IPC overhead and parsing)
+    app.manager_stats_client_label = ttk.Label(
+        stats_frame,
+        text="",
+        foreground='gray'
+    )
+    app.manager_stats_client_label.pack(anchor='w', pady=(0, SPACING_MD))
+
+    # Per-request-type latency table
+    columns = ('Request Type', 'Requests', 'Errors', 'Queue p50/p95 (ms)', 'QB p50/p95 (ms)', 'Avg Size (KB)')
+    app.manager_stats_tree = ttk.Treeview(stats_frame, columns=columns, show='headings', height=TREEVIEW_HEIGHT_SHORT)
+
+    app.manager_stats_tree.heading('Request Type', text='Request Type')
+    app.manager_stats_tree.column('Request Type', width=COLUMN_WIDTH_XL)
+    for col in columns[1:3]:
+        app.manager_stats_tree.heading(col, text=col)
+        app.manager_stats_tree.column(col, width=COLUMN_WIDTH_SM, anchor='e')
+    for col in columns[3:]:
+        app.manager_stats_tree.heading(col, text=col)
+        app.manager_stats_tree.column(col, width=COLUMN_WIDTH_MD + SPACING_XL, anchor='e')
+
+    app.manager_stats_tree.pack(fill='x')
+
+    # Help text
+    stats_help_text = ttk.Label(
+        stats_frame,
+        text="Queue: time waiting in the connection manager. QB: time inside QuickBooks (ProcessRequest). "
+             "IPC: round trip minus queue and QB time. Refreshes every 2 seconds while this tab is open.",
+        font=FONT_CAPTION,
+        foreground='gray',
+        wraplength=TEXT_WRAPLENGTH,
+        justify='left'
+    )
+    stats_help_text.pack(anchor='w', pady=(SPACING_MD, 0))
@@ -4,9 +4,10 @@ Statement Charge creation worker for QuickBooks Desktop Test Tool.
 Background worker for creating batch statement charges in QuickBooks.
 """
 
+from collections import deque
 from datetime import datetime
 from tkinter import messagebox
-from qb import QBIPCClient, disconnect_qb, QBXMLBuilder, QBXMLParser
+from qb import QBIPCClient, disconnect_qb, QBXMLBuilder, QBXMLParser, PRIORITY_BULK, PIPELINE_WINDOW
 from mock_generation import ChargeGenerator
 from store.state import StatementChargeRecord
 from store.actions import add_statement_charge
@@ -44,41 +45,63 @@ def create_charge_worker(app, customer: dict, num_charges: int,
         # Create QB client once for entire batch
         qb = QBIPCClient()
 
-        # Create multiple statement charges
-        for i in range(num_charges):
-            try:
-                # Randomize amount within specified range
-                amount = round(random.uniform(amount_min, amount_max), 2)
-
-                # Randomize transaction date within range
-                if days_back > 0:
-                    random_days = random.randint(0, days_back)
-                    txn_date = (today - timedelta(days=random_days)).strftime('%Y-%m-%d')
-                else:
-                    txn_date = today.strftime('%Y-%m-%d')
+        # (charge number, generated amount) of charges awaiting a response, in submission order
+        submitted = deque()
 
-                # Generate charge data
-                charge_data = ChargeGenerator.generate_statement_charge_data(
-                    customer_ref=customer['list_id'],
-                    amount=amount,
-                    item_ref=charge_item['list_id'] if charge_item else None,
-                    txn_date=txn_date
-                )
+        def build_requests():
+            """Generate each statement charge and yield its ChargeAdd as submit_many asks for it."""
+            nonlocal failed_count
 
-                # Log current progress
+            for i in range(num_charges):
                 charge_num = i + 1
-                app.root.after(0, lambda n=charge_num, amt=amount:
-                              app._log_create(f"[{n}/{num_charges}] Creating statement charge: Amount: ${amt:.2f}", LOG_VERBOSE))
+                try:
+                    # Randomize amount within specified range
+                    amount = round(random.uniform(amount_min, amount_max), 2)
+
+                    # Randomize transaction date within range
+                    if days_back > 0:
+                        random_days = random.randint(0, days_back)
+                        txn_date = (today - timedelta(days=random_days)).strftime('%Y-%m-%d')
+                    else:
+                        txn_date = today.strftime('%Y-%m-%d')
+
+                    # Generate charge data
+                    charge_data = ChargeGenerator.generate_statement_charge_data(
+                        customer_ref=customer['list_id'],
+                        amount=amount,
+                        item_ref=charge_item['list_id'] if charge_item else None,
+                        txn_date=txn_date
+                    )
+
+                    # Log current progress
+                    app.root.after(0, lambda n=charge_num, amt=amount:
+                                  app._log_create(f"[{n}/{num_charges}] Creating statement charge: Amount: ${amt:.2f}", LOG_VERBOSE))
+
+                    # Build QBXML request
+                    request = QBXMLBuilder.build_charge_add(charge_data)
 
-                # Build QBXML request
-                request = QBXMLBuilder.build_charge_add(charge_data)
+                    # DEBUG: Log the XML request
+                    app.root.after(0, lambda n=charge_num, xml=request:
+                                  app._log_create(f"  [DEBUG {n}] QBXML Request:\n{xml}", LOG_DEBUG))
 
-                # DEBUG: Log the XML request
-                app.root.after(0, lambda n=charge_num, xml=request:
-                              app._log_create(f"  [DEBUG {n}] QBXML Request:\n{xml}", LOG_DEBUG))
+                except Exception as e:
+                    error_str = str(e)
+                    app.root.after(0, lambda n=charge_num, msg=error_str:
+                                  app._log_create(f"  ✗ [{n}/{num_charges}] Error: {msg}"))
+                    failed_count += 1
+                    continue
+
+                submitted.append((charge_num, amount))
+                yield request
 
-                # Send to QuickBooks
-                response_xml = qb.execute_request(request)
+        # Create multiple statement charges, pipelined so the manager always has the next ChargeAdd queued
+        responses = qb.submit_many(build_requests(), window=PIPELINE_WINDOW, priority=PRIORITY_BULK)
+
+        for response_xml in responses:
+            charge_num, amount = submitted.popleft()
+            try:
+                if isinstance(response_xml, Exception):
+                    raise response_xml
 
                 # DEBUG: Log the XML response
                 app.root.after(0, lambda n=charge_num, xml=response_xml:
@@ -117,7 +140,6 @@ def create_charge_worker(app, customer: dict, num_charges: int,
 
             except Exception as e:
                 error_str = str(e)
-                charge_num = i + 1
                 app.root.after(0, lambda n=charge_num, msg=error_str:
                               app._log_create(f"  ✗ [{n}/{num_charges}] Error: {msg}"))
                 failed_count += 1
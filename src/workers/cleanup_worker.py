@@ -5,7 +5,7 @@ Background workers for archiving, deleting, and removing transactions.
 """
 
 from tkinter import messagebox
-from qb import QBIPCClient, disconnect_qb, QBXMLBuilder, QBXMLParser
+from qb import QBIPCClient, disconnect_qb, QBXMLBuilder, QBXMLParser, PRIORITY_BULK, PIPELINE_WINDOW
 from store.actions import archive_closed_transactions, archive_all_transactions, remove_all_archived
 from app_logging import LOG_NORMAL
 
@@ -178,95 +178,46 @@ def delete_archived_from_qb_worker(app):
 
         app.root.after(0, lambda: app._log_create(f"Deleting {total} archived transactions from QuickBooks..."))
 
-        # Perform deletions
+        # Perform deletions, pipelined so the manager always has the next TxnDel queued
         qb = QBIPCClient()
         deleted_count = 0
         failed_count = 0
         errors = []
 
-        # Delete invoices
-        for inv in archived_invoices:
-            try:
-                app.root.after(0, lambda ref=inv.ref_number:
-                              app._log_create(f"  Deleting invoice {ref}...", LOG_NORMAL))
-
-                request = QBXMLBuilder.build_txn_del('Invoice', inv.txn_id)
-                response_xml = qb.execute_request(request)
-                result = QBXMLParser.parse_response(response_xml)
-
-                if result['success']:
-                    deleted_count += 1
-                    app.root.after(0, lambda ref=inv.ref_number:
-                                  app._log_create(f"  ✓ Deleted invoice {ref}", LOG_NORMAL))
-                else:
-                    failed_count += 1
-                    error = result.get('error', 'Unknown error')
-                    errors.append(f"Invoice {inv.ref_number}: {error}")
-                    app.root.after(0, lambda ref=inv.ref_number, err=error:
-                                  app._log_create(f"  ✗ Failed to delete invoice {ref}: {err}", LOG_NORMAL))
-
-            except Exception as e:
-                failed_count += 1
-                error_str = str(e)
-                errors.append(f"Invoice {inv.ref_number}: {error_str}")
-                app.root.after(0, lambda ref=inv.ref_number, err=error_str:
-                              app._log_create(f"  ✗ Error deleting invoice {ref}: {err}", LOG_NORMAL))
+        deletions = (
+            [('Invoice', 'Invoice', inv) for inv in archived_invoices] +
+            [('SalesReceipt', 'Sales Receipt', sr) for sr in archived_receipts] +
+            [('Charge', 'Statement Charge', sc) for sc in archived_charges]
+        )
+        requests = (QBXMLBuilder.build_txn_del(txn_type, txn.txn_id) for txn_type, _, txn in deletions)
+        responses = qb.submit_many(requests, window=PIPELINE_WINDOW, priority=PRIORITY_BULK)
 
-        # Delete sales receipts
-        for sr in archived_receipts:
-            try:
-                app.root.after(0, lambda ref=sr.ref_number:
-                              app._log_create(f"  Deleting sales receipt {ref}...", LOG_NORMAL))
-
-                request = QBXMLBuilder.build_txn_del('SalesReceipt', sr.txn_id)
-                response_xml = qb.execute_request(request)
-                result = QBXMLParser.parse_response(response_xml)
-
-                if result['success']:
-                    deleted_count += 1
-                    app.root.after(0, lambda ref=sr.ref_number:
-                                  app._log_create(f"  ✓ Deleted sales receipt {ref}", LOG_NORMAL))
-                else:
-                    failed_count += 1
-                    error = result.get('error', 'Unknown error')
-                    errors.append(f"Sales Receipt {sr.ref_number}: {error}")
-                    app.root.after(0, lambda ref=sr.ref_number, err=error:
-                                  app._log_create(f"  ✗ Failed to delete sales receipt {ref}: {err}", LOG_NORMAL))
-
-            except Exception as e:
-                failed_count += 1
-                error_str = str(e)
-                errors.append(f"Sales Receipt {sr.ref_number}: {error_str}")
-                app.root.after(0, lambda ref=sr.ref_number, err=error_str:
-                              app._log_create(f"  ✗ Error deleting sales receipt {ref}: {err}", LOG_NORMAL))
+        for (_, label, txn), response_xml in zip(deletions, responses):
+            kind = label.lower()
 
-        # Delete statement charges
-        for sc in archived_charges:
             try:
-                app.root.after(0, lambda ref=sc.ref_number:
-                              app._log_create(f"  Deleting statement charge {ref}...", LOG_NORMAL))
+                if isinstance(response_xml, Exception):
+                    raise response_xml
 
-                request = QBXMLBuilder.build_txn_del('Charge', sc.txn_id)
-                response_xml = qb.execute_request(request)
                 result = QBXMLParser.parse_response(response_xml)
 
                 if result['success']:
                     deleted_count += 1
-                    app.root.after(0, lambda ref=sc.ref_number:
-                                  app._log_create(f"  ✓ Deleted statement charge {ref}", LOG_NORMAL))
+                    app.root.after(0, lambda ref=txn.ref_number, k=kind:
+                                  app._log_create(f"  ✓ Deleted {k} {ref}", LOG_NORMAL))
                 else:
                     failed_count += 1
                     error = result.get('error', 'Unknown error')
-                    errors.append(f"Statement Charge {sc.ref_number}: {error}")
-                    app.root.after(0, lambda ref=sc.ref_number, err=error:
-                                  app._log_create(f"  ✗ Failed to delete statement charge {ref}: {err}", LOG_NORMAL))
+                    errors.append(f"{label} {txn.ref_number}: {error}")
+                    app.root.after(0, lambda ref=txn.ref_number, k=kind, err=error:
+                                  app._log_create(f"  ✗ Failed to delete {k} {ref}: {err}", LOG_NORMAL))
 
             except Exception as e:
                 failed_count += 1
                 error_str = str(e)
-                errors.append(f"Statement Charge {sc.ref_number}: {error_str}")
-                app.root.after(0, lambda ref=sc.ref_number, err=error_str:
-                              app._log_create(f"  ✗ Error deleting statement charge {ref}: {err}", LOG_NORMAL))
+                errors.append(f"{label} {txn.ref_number}: {error_str}")
+                app.root.after(0, lambda ref=txn.ref_number, k=kind, err=error_str:
+                              app._log_create(f"  ✗ Error deleting {k} {ref}: {err}", LOG_NORMAL))
 
         # Show results
         result_msg = f"Deletion complete:\n\n"
@@ -6,25 +6,50 @@ Background workers for loading data from QuickBooks (items, terms, classes, acco
 
 from tkinter import messagebox
 from qb import DataLoader, disconnect_qb
-from store import set_items, set_terms, set_classes, set_accounts
+from store import (
+    set_customers, append_customers, set_items, append_items, set_terms, set_classes, set_accounts,
+    set_reference_data
+)
 from app_logging import LOG_NORMAL, LOG_VERBOSE
 
 
+# Iterator pages received per store update (and customer dropdown refresh) during paged loads
+PAGES_PER_STORE_UPDATE = 10
+
+
 def load_items_worker(app):
-    """Worker function to load items in background."""
+    """Worker function to load items in background, one iterator page at a time."""
+    # The previous list is put back if the load fails part way
+    previous_items = app.store.get_state().items
+    pages = 0
+
     try:
         app.root.after(0, lambda: app._log_create("Loading items from QuickBooks..."))
 
-        # Load items from QuickBooks
-        result = DataLoader.load_items()
-
-        if result['success']:
-            items = result['data']
-            count = result['count']
-
-            # Dispatch to store
-            app.store.dispatch(set_items(items))
+        # Load items from QuickBooks, filling the store as pages arrive
+        count = 0
+        received = []
+        error_msg = None
+        for page in DataLoader.iter_item_pages():
+            if not page['success']:
+                error_msg = page['error']
+                break
+
+            received.extend(page['data'])
+            count += page['count']
+            pages += 1
+
+            # First page replaces the existing item list, later updates extend it
+            if pages == 1 or pages % PAGES_PER_STORE_UPDATE == 0 or not page['remaining']:
+                app.store.dispatch(set_items(received) if pages == 1 else append_items(received))
+                received = []
+
+            if page['remaining']:
+                app.root.after(0, lambda c=count, r=page['remaining']: app.status_bar.config(
+                    text=f"Loading items... {c} loaded, {r} remaining"
+                ))
 
+        if error_msg is None:
             # Update UI
             app.root.after(0, lambda: app._log_create(f"✓ Loaded {count} items from QuickBooks"))
             app.root.after(0, lambda: app.items_status_label.config(
@@ -43,11 +68,15 @@ def load_items_worker(app):
                     text=f"{num_customers} customers, {count} items loaded - Load both to begin"
                 ))
         else:
-            error_msg = result['error']
+            if pages:
+                app.store.dispatch(set_items(previous_items))
+                error_msg = f"{error_msg} (stopped after {count} items; the previous item list was kept)"
             app.root.after(0, lambda: app._log_create(f"✗ Error loading items: {error_msg}"))
             app.root.after(0, lambda: messagebox.showerror("Error", error_msg))
 
     except Exception as e:
+        if pages:
+            app.store.dispatch(set_items(previous_items))
         error_str = str(e)
         app.root.after(0, lambda: app._log_create(f"✗ Error: {error_str}"))
         app.root.after(0, lambda: messagebox.showerror("Error", error_str))
@@ -178,29 +207,54 @@ def load_accounts_worker(app):
 
 
 def load_customers_worker(app):
-    """Worker function to load customers in background."""
+    """Worker function to load customers in background, one iterator page at a time."""
+    # The previous list is put back if the load fails part way
+    previous_customers = app.store.get_state().customers
+    pages = 0
+
     try:
         app.root.after(0, lambda: app._log_create("Loading customers from QuickBooks..."))
 
-        # Load customers from QuickBooks (already marked with created_by_app = False)
-        result = DataLoader.load_customers()
-
-        if result['success']:
-            loaded_customers = result['data']
-            count = result['count']
-
-            # Dispatch to store (replaces existing customer list)
-            app.store.dispatch({'type': 'SET_CUSTOMERS', 'payload': loaded_customers})
+        # Load customers from QuickBooks (already marked with created_by_app = False),
+        # filling the store and customer dropdowns as pages arrive
+        count = 0
+        received = []
+        error_msg = None
+        for page in DataLoader.iter_customer_pages():
+            if not page['success']:
+                error_msg = page['error']
+                break
+
+            received.extend(page['data'])
+            count += page['count']
+            pages += 1
+
+            # First page replaces the existing customer list, later updates extend it
+            if pages == 1 or pages % PAGES_PER_STORE_UPDATE == 0 or not page['remaining']:
+                app.store.dispatch(set_customers(received) if pages == 1 else append_customers(received))
+                received = []
+                app.root.after(0, app._update_customer_combo)
+
+            if page['remaining']:
+                app.root.after(0, lambda c=count, r=page['remaining']: app.status_bar.config(
+                    text=f"Loading customers... {c} loaded, {r} remaining"
+                ))
 
+        if error_msg is None:
             # Update UI
             app.root.after(0, lambda: app._log_create(f"✓ Loaded {count} customers from QuickBooks"))
-            app.root.after(0, app._update_customer_combo)
         else:
-            error_msg = result['error']
+            if pages:
+                app.store.dispatch(set_customers(previous_customers))
+                app.root.after(0, app._update_customer_combo)
+                error_msg = f"{error_msg} (stopped after {count} customers; the previous customer list was kept)"
             app.root.after(0, lambda: app._log_create(f"✗ Error loading customers: {error_msg}"))
             app.root.after(0, lambda: messagebox.showerror("Error", error_msg))
 
     except Exception as e:
+        if pages:
+            app.store.dispatch(set_customers(previous_customers))
+            app.root.after(0, app._update_customer_combo)
         error_str = str(e)
         app.root.after(0, lambda: app._log_create(f"✗ Error: {error_str}"))
         app.root.after(0, lambda: messagebox.showerror("Error", error_str))
@@ -210,87 +264,26 @@ def load_customers_worker(app):
 
 
 def load_all_worker(app):
-    """Worker function to load all data sequentially in background."""
+    """Worker function to load all reference data in background, in a single QuickBooks round trip."""
     try:
         app._log_create("Starting Load All...")
 
-        # Load customers
-        app.root.after(0, lambda: app._log_create("Loading customers...", LOG_VERBOSE))
-        result = DataLoader.load_customers()
-        if result['success']:
-            app.store.dispatch({'type': 'SET_CUSTOMERS', 'payload': result['data']})
-            app.root.after(0, lambda: app._log_create(f"✓ Loaded {result['count']} customers", LOG_VERBOSE))
-            app.root.after(0, app._update_customer_combo)
-        else:
-            raise Exception(f"Failed to load customers: {result['error']}")
+        app.root.after(0, lambda: app._log_create("Loading customers, items, terms, classes and accounts...", LOG_VERBOSE))
+        results = DataLoader.load_all(filter_deposit_accounts=True)
 
-        # Load items
-        app.root.after(0, lambda: app._log_create("Loading items...", LOG_VERBOSE))
-        result = DataLoader.load_items()
-        if result['success']:
-            app.store.dispatch(set_items(result['data']))
-            count = result['count']
-            app.root.after(0, lambda c=count: app._log_create(f"✓ Loaded {c} items", LOG_VERBOSE))
-            app.root.after(0, lambda c=count: app.items_status_label.config(
-                text=f"{c} item{'s' if c != 1 else ''} loaded", foreground='green'
-            ))
-        else:
-            raise Exception(f"Failed to load items: {result['error']}")
+        failed = [f"{name}: {result['error']}" for name, result in results.items() if not result['success']]
+        if failed:
+            raise Exception(f"Failed to load {'; '.join(failed)}")
 
-        # Load terms
-        app.root.after(0, lambda: app._log_create("Loading terms...", LOG_VERBOSE))
-        result = DataLoader.load_terms()
-        if result['success']:
-            terms = result['data']
-            app.store.dispatch(set_terms(terms))
-            count = result['count']
-            app.root.after(0, lambda c=count: app._log_create(f"✓ Loaded {c} terms", LOG_VERBOSE))
-            app.root.after(0, lambda c=count: app.terms_status_label.config(
-                text=f"{c} term{'s' if c != 1 else ''} loaded", foreground='green'
-            ))
-            term_names = ['(None)'] + [term['name'] for term in terms]
-            app.root.after(0, lambda tn=term_names: app.txn_terms_combo.config(values=tn))
-            # Build terms ListID mapping for O(1) lookup
-            terms_map = {term['name']: term['list_id'] for term in terms}
-            app.root.after(0, lambda tm=terms_map: setattr(app, 'terms_listid_map', tm))
-        else:
-            raise Exception(f"Failed to load terms: {result['error']}")
-
-        # Load classes
-        app.root.after(0, lambda: app._log_create("Loading classes...", LOG_VERBOSE))
-        result = DataLoader.load_classes()
-        if result['success']:
-            classes = result['data']
-            app.store.dispatch(set_classes(classes))
-            count = result['count']
-            app.root.after(0, lambda c=count: app._log_create(f"✓ Loaded {c} classes", LOG_VERBOSE))
-            app.root.after(0, lambda c=count: app.classes_status_label.config(
-                text=f"{c} class{'es' if c != 1 else ''} loaded", foreground='green'
-            ))
-            class_names = ['(None)'] + [cls['full_name'] for cls in classes]
-            app.root.after(0, lambda cn=class_names: app.txn_class_combo.config(values=cn))
-            # Build classes ListID mapping for O(1) lookup
-            classes_map = {cls['full_name']: cls['list_id'] for cls in classes}
-            app.root.after(0, lambda cm=classes_map: setattr(app, 'classes_listid_map', cm))
-        else:
-            raise Exception(f"Failed to load classes: {result['error']}")
-
-        # Load accounts
-        app.root.after(0, lambda: app._log_create("Loading accounts...", LOG_VERBOSE))
-        result = DataLoader.load_accounts(filter_deposit_accounts=True)
-        if result['success']:
-            app.store.dispatch(set_accounts(result['data']))
-            count = result['count']
-            app.root.after(0, lambda c=count: app._log_create(f"✓ Loaded {c} deposit accounts", LOG_VERBOSE))
-            app.root.after(0, lambda c=count: app.accounts_status_label.config(
-                text=f"{c} account{'s' if c != 1 else ''} loaded", foreground='green'
-            ))
-            app.root.after(0, app._update_accounts_combo)
-        else:
-            raise Exception(f"Failed to load accounts: {result['error']}")
-
-        app.root.after(0, lambda: app._log_create("✓ Load All complete!"))
-        app.root.after(0, lambda: messagebox.showinfo("Success", "All data loaded successfully!"))
+        # One store update for all five lists, then one UI update
+        app.store.dispatch(set_reference_data(
+            customers=results['customers']['data'],
+            items=results['items']['data'],
+            terms=results['terms']['data'],
+            classes=results['classes']['data'],
+            accounts=results['accounts']['data']
+        ))
+        app.root.after(0, lambda: _show_reference_data(app, results))
 
     except Exception as e:
         error_str = str(e)
@@ -301,3 +294,43 @@ def load_all_worker(app):
         disconnect_qb()
         app.root.after(0, lambda: app.load_all_btn.config(state='normal'))
         app.root.after(0, lambda: app.status_bar.config(text="Ready"))
+
+
+def _show_reference_data(app, results):
+    """Update the setup UI after Load All (runs on the UI thread)."""
+    counts = {name: result['count'] for name, result in results.items()}
+
+    app._log_create(f"✓ Loaded {counts['customers']} customers", LOG_VERBOSE)
+    app._log_create(f"✓ Loaded {counts['items']} items", LOG_VERBOSE)
+    app._log_create(f"✓ Loaded {counts['terms']} terms", LOG_VERBOSE)
+    app._log_create(f"✓ Loaded {counts['classes']} classes", LOG_VERBOSE)
+    app._log_create(f"✓ Loaded {counts['accounts']} deposit accounts", LOG_VERBOSE)
+
+    app._update_customer_combo()
+    app.items_status_label.config(
+        text=f"{counts['items']} item{'s' if counts['items'] != 1 else ''} loaded", foreground='green'
+    )
+
+    terms = results['terms']['data']
+    app.terms_status_label.config(
+        text=f"{counts['terms']} term{'s' if counts['terms'] != 1 else ''} loaded", foreground='green'
+    )
+    app.txn_terms_combo.config(values=['(None)'] + [term['name'] for term in terms])
+    # Build terms ListID mapping for O(1) lookup
+    app.terms_listid_map = {term['name']: term['list_id'] for term in terms}
+
+    classes = results['classes']['data']
+    app.classes_status_label.config(
+        text=f"{counts['classes']} class{'es' if counts['classes'] != 1 else ''} loaded", foreground='green'
+    )
+    app.txn_class_combo.config(values=['(None)'] + [cls['full_name'] for cls in classes])
+    # Build classes ListID mapping for O(1) lookup
+    app.classes_listid_map = {cls['full_name']: cls['list_id'] for cls in classes}
+
+    app.accounts_status_label.config(
+        text=f"{counts['accounts']} account{'s' if counts['accounts'] != 1 else ''} loaded", foreground='green'
+    )
+    app._update_accounts_combo()
+
+    app._log_create("✓ Load All complete!")
+    messagebox.showinfo("Success", "All data loaded successfully!")
@@ -4,9 +4,10 @@ Invoice creation worker for QuickBooks Desktop Test Tool.
 Background worker for creating batch invoices in QuickBooks.
 """
 
+from collections import deque
 from datetime import datetime
 from tkinter import messagebox
-from qb import QBIPCClient, disconnect_qb, QBXMLBuilder, QBXMLParser
+from qb import QBIPCClient, disconnect_qb, QBXMLBuilder, QBXMLParser, PRIORITY_BULK, PIPELINE_WINDOW
 from mock_generation import InvoiceGenerator
 from store.state import InvoiceRecord
 from store.actions import add_invoice
@@ -42,50 +43,72 @@ def create_invoice_worker(app, customer: dict, num_invoices: int,
         # Create QB client once for entire batch
         qb = QBIPCClient()
 
-        # Create multiple invoices
-        for i in range(num_invoices):
-            try:
-                # Randomize parameters within specified ranges
-                num_lines = random.randint(line_items_min, line_items_max)
-                amount = round(random.uniform(amount_min, amount_max), 2)
-
-                # Randomize transaction date within range
-                if days_back > 0:
-                    random_days = random.randint(0, days_back)
-                    txn_date = (today - timedelta(days=random_days)).strftime('%Y-%m-%d')
-                else:
-                    txn_date = today.strftime('%Y-%m-%d')
-
-                # Select random items for invoice line items
-                selected_items = random.sample(items, min(num_lines, len(items)))
-                item_refs = [item['list_id'] for item in selected_items]
-
-                # Generate invoice data
-                invoice_data = InvoiceGenerator.generate_invoice_data(
-                    customer_ref=customer['list_id'],
-                    num_line_items=num_lines,
-                    total_amount=amount,
-                    item_refs=item_refs,
-                    txn_date=txn_date,
-                    po_prefix=po_prefix,
-                    terms_ref=terms_ref,
-                    class_ref=class_ref
-                )
-
-                # Log current progress
+        # Invoice numbers awaiting a response, in submission order
+        submitted = deque()
+
+        def build_requests():
+            """Generate each invoice and yield its InvoiceAdd as submit_many asks for it."""
+            nonlocal failed_count
+
+            for i in range(num_invoices):
                 invoice_num = i + 1
-                app.root.after(0, lambda n=invoice_num, ref=invoice_data['ref_number']:
-                              app._log_create(f"[{n}/{num_invoices}] Creating invoice Ref#: {ref}, Amount: ${amount:.2f}, Lines: {num_lines}", LOG_VERBOSE))
+                try:
+                    # Randomize parameters within specified ranges
+                    num_lines = random.randint(line_items_min, line_items_max)
+                    amount = round(random.uniform(amount_min, amount_max), 2)
+
+                    # Randomize transaction date within range
+                    if days_back > 0:
+                        random_days = random.randint(0, days_back)
+                        txn_date = (today - timedelta(days=random_days)).strftime('%Y-%m-%d')
+                    else:
+                        txn_date = today.strftime('%Y-%m-%d')
+
+                    # Select random items for invoice line items
+                    selected_items = random.sample(items, min(num_lines, len(items)))
+                    item_refs = [item['list_id'] for item in selected_items]
+
+                    # Generate invoice data
+                    invoice_data = InvoiceGenerator.generate_invoice_data(
+                        customer_ref=customer['list_id'],
+                        num_line_items=num_lines,
+                        total_amount=amount,
+                        item_refs=item_refs,
+                        txn_date=txn_date,
+                        po_prefix=po_prefix,
+                        terms_ref=terms_ref,
+                        class_ref=class_ref
+                    )
 
-                # Build QBXML request
-                request = QBXMLBuilder.build_invoice_add(invoice_data)
+                    # Log current progress
+                    app.root.after(0, lambda n=invoice_num, ref=invoice_data['ref_number'], amt=amount, lines=num_lines:
+                                  app._log_create(f"[{n}/{num_invoices}] Creating invoice Ref#: {ref}, Amount: ${amt:.2f}, Lines: {lines}", LOG_VERBOSE))
 
-                # DEBUG: Log the XML request
-                app.root.after(0, lambda n=invoice_num, xml=request:
-                              app._log_create(f"  [DEBUG {n}] QBXML Request:\n{xml}", LOG_DEBUG))
+                    # Build QBXML request
+                    request = QBXMLBuilder.build_invoice_add(invoice_data)
 
-                # Send to QuickBooks
-                response_xml = qb.execute_request(request)
+                    # DEBUG: Log the XML request
+                    app.root.after(0, lambda n=invoice_num, xml=request:
+                                  app._log_create(f"  [DEBUG {n}] QBXML Request:\n{xml}", LOG_DEBUG))
+
+                except Exception as e:
+                    error_str = str(e)
+                    app.root.after(0, lambda n=invoice_num, msg=error_str:
+                                  app._log_create(f"  ✗ [{n}/{num_invoices}] Error: {msg}"))
+                    failed_count += 1
+                    continue
+
+                submitted.append(invoice_num)
+                yield request
+
+        # Create multiple invoices, pipelined so the manager always has the next InvoiceAdd queued
+        responses = qb.submit_many(build_requests(), window=PIPELINE_WINDOW, priority=PRIORITY_BULK)
+
+        for response_xml in responses:
+            invoice_num = submitted.popleft()
+            try:
+                if isinstance(response_xml, Exception):
+                    raise response_xml
 
                 # DEBUG: Log the XML response
                 app.root.after(0, lambda n=invoice_num, xml=response_xml:
@@ -121,7 +144,6 @@ def create_invoice_worker(app, customer: dict, num_invoices: int,
 
             except Exception as e:
                 error_str = str(e)
-                invoice_num = i + 1
                 app.root.after(0, lambda n=invoice_num, msg=error_str:
                               app._log_create(f"  ✗ [{n}/{num_invoices}] Error: {msg}"))
                 failed_count += 1
@@ -6,7 +6,7 @@ Background worker for monitoring transactions and verifying payment posting.
 
 import time
 from datetime import datetime
-from qb import QBIPCClient, QBXMLBuilder, QBXMLParser
+from qb import fetch_status_bulk
 from store import (
     InvoiceRecord, SalesReceiptRecord, StatementChargeRecord,
     update_invoice, update_sales_receipt, update_statement_charge, add_verification_result
@@ -60,20 +60,20 @@ def check_invoices(app):
     """
     state = app.store.get_state()
 
-    # Create QB client once for entire batch
-    qb = QBIPCClient()
-
+    try:
+        # Transactions still at the EditSequence we hold come back filtered out, mostly without a parse
+        statuses = fetch_status_bulk('invoice', [invoice.txn_id for invoice in state.invoices],
+                                     known_edit_sequences={invoice.txn_id: invoice.edit_sequence for invoice in state.invoices})
+    except Exception as e:
+        app.root.after(0, lambda n=len(state.invoices), err=str(e):
+                      app._log_monitor(f"✗ Error checking {n} invoice(s): {err}"))
+        return
+
+    changed = False
     for invoice in state.invoices:
         try:
-            # Query invoice
-            request = QBXMLBuilder.build_invoice_query(txn_id=invoice.txn_id)
-            response_xml = qb.execute_request(request)
-
-            parser_result = QBXMLParser.parse_response(response_xml)
-
-            if parser_result['success'] and parser_result['data']['invoices']:
-                qb_invoice = parser_result['data']['invoices'][0]
-
+            qb_invoice = statuses.get(invoice.txn_id)
+            if qb_invoice is not None:
                 # Check for status change
                 new_status = 'closed' if qb_invoice['is_paid'] else 'open'
                 old_status = invoice.status
@@ -95,16 +95,22 @@ def check_invoices(app):
                     created_at=invoice.created_at,
                     last_checked=datetime.now(),
                     deposit_account=qb_invoice.get('deposit_account', {}).get('full_name') if 'deposit_account' in qb_invoice else None,
-                    payment_info=qb_invoice.get('linked_transactions', [])
+                    payment_info=qb_invoice.get('linked_transactions', []),
+                    edit_sequence=qb_invoice['edit_sequence'],
+                    time_modified=qb_invoice.get('time_modified')
                 )
 
                 app.store.dispatch(update_invoice(updated_invoice))
-                app.root.after(0, lambda: update_invoice_tree(app))
+                changed = True
 
         except Exception as e:
             app.root.after(0, lambda inv=invoice, err=str(e):
                           app._log_monitor(f"✗ Error checking {inv.ref_number}: {err}"))
 
+    # One refresh per poll, and none when nothing changed
+    if changed:
+        app.root.after(0, lambda: update_invoice_tree(app))
+
 
 def check_sales_receipts(app):
     """
@@ -115,17 +121,20 @@ def check_sales_receipts(app):
     """
     state = app.store.get_state()
 
-    # Create QB client once for entire batch
-    qb = QBIPCClient()
-
+    try:
+        # Transactions still at the EditSequence we hold come back filtered out, mostly without a parse
+        statuses = fetch_status_bulk('sales_receipt', [sr.txn_id for sr in state.sales_receipts],
+                                     known_edit_sequences={sr.txn_id: sr.edit_sequence for sr in state.sales_receipts})
+    except Exception as e:
+        app.root.after(0, lambda n=len(state.sales_receipts), err=str(e):
+                      app._log_monitor(f"✗ Error checking {n} sales receipt(s): {err}"))
+        return
+
+    changed = False
     for sr in state.sales_receipts:
         try:
-            request = QBXMLBuilder.build_sales_receipt_query(txn_id=sr.txn_id)
-            response_xml = qb.execute_request(request)
-            parser_result = QBXMLParser.parse_response(response_xml)
-
-            if parser_result['success'] and parser_result['data']['sales_receipts']:
-                qb_sr = parser_result['data']['sales_receipts'][0]
+            qb_sr = statuses.get(sr.txn_id)
+            if qb_sr is not None:
                 new_status = 'closed' if qb_sr.get('is_paid') else 'open'
                 old_status = sr.status
 
@@ -144,17 +153,23 @@ def check_sales_receipts(app):
                     status=new_status,
                     created_at=sr.created_at,
                     last_checked=datetime.now(),
-                    deposit_account=qb_sr.get('deposit_to_account_ref', {}).get('full_name'),
-                    payment_info=qb_sr.get('linked_transactions', [])
+                    deposit_account=qb_sr.get('deposit_account', {}).get('full_name'),
+                    payment_info=qb_sr.get('linked_transactions', []),
+                    edit_sequence=qb_sr['edit_sequence'],
+                    time_modified=qb_sr.get('time_modified')
                 )
 
                 app.store.dispatch(update_sales_receipt(updated_sr))
-                app.root.after(0, lambda: update_invoice_tree(app))
+                changed = True
 
         except Exception as e:
             app.root.after(0, lambda s=sr, err=str(e):
                           app._log_monitor(f"✗ Error checking {s.ref_number}: {err}"))
 
+    # One refresh per poll, and none when nothing changed
+    if changed:
+        app.root.after(0, lambda: update_invoice_tree(app))
+
 
 def check_statement_charges(app):
     """
@@ -165,18 +180,20 @@ def check_statement_charges(app):
     """
     state = app.store.get_state()
 
-    # Create QB client once for entire batch
-    qb = QBIPCClient()
-
+    try:
+        # Transactions still at the EditSequence we hold come back filtered out, mostly without a parse
+        statuses = fetch_status_bulk('charge', [charge.txn_id for charge in state.statement_charges],
+                                     known_edit_sequences={charge.txn_id: charge.edit_sequence for charge in state.statement_charges})
+    except Exception as e:
+        app.root.after(0, lambda n=len(state.statement_charges), err=str(e):
+                      app._log_monitor(f"✗ Error checking {n} statement charge(s): {err}"))
+        return
+
+    changed = False
     for charge in state.statement_charges:
         try:
-            request = QBXMLBuilder.build_charge_query(txn_id=charge.txn_id)
-            response_xml = qb.execute_request(request)
-            parser_result = QBXMLParser.parse_response(response_xml)
-
-            if parser_result['success'] and parser_result['data']['charges']:
-                qb_charge = parser_result['data']['charges'][0]
-
+            qb_charge = statuses.get(charge.txn_id)
+            if qb_charge is not None:
                 # Check for status change
                 new_status = 'closed' if qb_charge['is_paid'] else 'open'
                 old_status = charge.status
@@ -196,17 +213,23 @@ def check_statement_charges(app):
                     status=new_status,
                     created_at=charge.created_at,
                     last_checked=datetime.now(),
-                    deposit_account=qb_charge.get('deposit_account', {}).get('full_name') if 'deposit_account' in qb_charge else None,
-                    payment_info=qb_charge.get('linked_transactions', [])
+                    # No deposit_account: ChargeRet has no DepositToAccountRef
+                    payment_info=qb_charge.get('linked_transactions', []),
+                    edit_sequence=qb_charge['edit_sequence'],
+                    time_modified=qb_charge.get('time_modified')
                 )
 
                 app.store.dispatch(update_statement_charge(updated_charge))
-                app.root.after(0, lambda: update_invoice_tree(app))
+                changed = True
 
         except Exception as e:
             app.root.after(0, lambda c=charge, err=str(e):
                           app._log_monitor(f"✗ Error checking {c.ref_number}: {err}"))
 
+    # One refresh per poll, and none when nothing changed
+    if changed:
+        app.root.after(0, lambda: update_invoice_tree(app))
+
 
 def verify_transaction(app, transaction, qb_data: dict, txn_type: str):
     """
@@ -4,9 +4,10 @@ Sales Receipt creation worker for QuickBooks Desktop Test Tool.
 Background worker for creating batch sales receipts in QuickBooks.
 """
 
+from collections import deque
 from datetime import datetime
 from tkinter import messagebox
-from qb import QBIPCClient, disconnect_qb, QBXMLBuilder, QBXMLParser
+from qb import QBIPCClient, disconnect_qb, QBXMLBuilder, QBXMLParser, PRIORITY_BULK, PIPELINE_WINDOW
 from mock_generation import SalesReceiptGenerator
 from store.state import SalesReceiptRecord
 from store.actions import add_sales_receipt
@@ -40,48 +41,69 @@ def create_sales_receipt_worker(app, customer: dict, num_receipts: int,
         # Create QB client once for entire batch
         qb = QBIPCClient()
 
-        # Create multiple sales receipts
-        for i in range(num_receipts):
-            try:
-                # Randomize parameters within specified ranges
-                num_lines = random.randint(line_items_min, line_items_max)
-                amount = round(random.uniform(amount_min, amount_max), 2)
-
-                # Randomize transaction date within range
-                if days_back > 0:
-                    random_days = random.randint(0, days_back)
-                    txn_date = (today - timedelta(days=random_days)).strftime('%Y-%m-%d')
-                else:
-                    txn_date = today.strftime('%Y-%m-%d')
-
-                # Select random items for sales receipt line items
-                selected_items = random.sample(items, min(num_lines, len(items)))
-                item_refs = [item['list_id'] for item in selected_items]
-
-                # Generate sales receipt data
-                receipt_data = SalesReceiptGenerator.generate_sales_receipt_data(
-                    customer_ref=customer['list_id'],
-                    num_line_items=num_lines,
-                    total_amount=amount,
-                    item_refs=item_refs,
-                    txn_date=txn_date
-                )
-
-                # Log current progress
-                receipt_num = i + 1
-                app.root.after(0, lambda n=receipt_num, ref=receipt_data['ref_number']:
-                              app._log_create(f"[{n}/{num_receipts}] Creating sales receipt Ref#: {ref}, Amount: ${amount:.2f}, Lines: {num_lines}", LOG_VERBOSE))
+        # (receipt number, generated amount) of receipts awaiting a response, in submission order
+        submitted = deque()
 
-                # Build QBXML request
-                request = QBXMLBuilder.build_sales_receipt_add(receipt_data)
+        def build_requests():
+            """Generate each sales receipt and yield its SalesReceiptAdd as submit_many asks for it."""
+            nonlocal failed_count
 
-                # DEBUG: Log the XML request
+            for i in range(num_receipts):
                 receipt_num = i + 1
-                app.root.after(0, lambda n=receipt_num, xml=request:
-                              app._log_create(f"  [DEBUG {n}] QBXML Request:\n{xml}", LOG_DEBUG))
+                try:
+                    # Randomize parameters within specified ranges
+                    num_lines = random.randint(line_items_min, line_items_max)
+                    amount = round(random.uniform(amount_min, amount_max), 2)
+
+                    # Randomize transaction date within range
+                    if days_back > 0:
+                        random_days = random.randint(0, days_back)
+                        txn_date = (today - timedelta(days=random_days)).strftime('%Y-%m-%d')
+                    else:
+                        txn_date = today.strftime('%Y-%m-%d')
+
+                    # Select random items for sales receipt line items
+                    selected_items = random.sample(items, min(num_lines, len(items)))
+                    item_refs = [item['list_id'] for item in selected_items]
+
+                    # Generate sales receipt data
+                    receipt_data = SalesReceiptGenerator.generate_sales_receipt_data(
+                        customer_ref=customer['list_id'],
+                        num_line_items=num_lines,
+                        total_amount=amount,
+                        item_refs=item_refs,
+                        txn_date=txn_date
+                    )
+
+                    # Log current progress
+                    app.root.after(0, lambda n=receipt_num, ref=receipt_data['ref_number'], amt=amount, lines=num_lines:
+                                  app._log_create(f"[{n}/{num_receipts}] Creating sales receipt Ref#: {ref}, Amount: ${amt:.2f}, Lines: {lines}", LOG_VERBOSE))
 
-                # Send to QuickBooks
-                response_xml = qb.execute_request(request)
+                    # Build QBXML request
+                    request = QBXMLBuilder.build_sales_receipt_add(receipt_data)
+
+                    # DEBUG: Log the XML request
+                    app.root.after(0, lambda n=receipt_num, xml=request:
+                                  app._log_create(f"  [DEBUG {n}] QBXML Request:\n{xml}", LOG_DEBUG))
+
+                except Exception as e:
+                    error_str = str(e)
+                    app.root.after(0, lambda n=receipt_num, msg=error_str:
+                                  app._log_create(f"  ✗ [{n}/{num_receipts}] Error: {msg}"))
+                    failed_count += 1
+                    continue
+
+                submitted.append((receipt_num, amount))
+                yield request
+
+        # Create multiple sales receipts, pipelined so the manager always has the next SalesReceiptAdd queued
+        responses = qb.submit_many(build_requests(), window=PIPELINE_WINDOW, priority=PRIORITY_BULK)
+
+        for response_xml in responses:
+            receipt_num, amount = submitted.popleft()
+            try:
+                if isinstance(response_xml, Exception):
+                    raise response_xml
 
                 # DEBUG: Log the XML response
                 app.root.after(0, lambda n=receipt_num, xml=response_xml:
@@ -134,7 +156,6 @@ def create_sales_receipt_worker(app, customer: dict, num_receipts: int,
 
             except Exception as e:
                 error_str = str(e)
-                receipt_num = i + 1
                 app.root.after(0, lambda n=receipt_num, msg=error_str:
                               app._log_create(f"  ✗ [{n}/{num_receipts}] Error: {msg}"))
                 failed_count += 1
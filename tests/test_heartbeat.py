@@ -0,0 +1,111 @@
+"""
+Heartbeat tests for the connection manager.
+
+The manager runs in a thread of the test process against the simulator
+backend, with heartbeat_timeout shortened so a simulated ProcessRequest
+can outlast it without making the test slow.
+"""
+
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from qb.connection_manager import QBConnectionManager
+from qb.xml_builder import QBXMLBuilder
+
+
+HEARTBEAT_TIMEOUT = 0.5  # Seconds without a heartbeat before the manager exits
+LATENCY_MS = 1200  # Simulated ProcessRequest time, well above HEARTBEAT_TIMEOUT
+
+
+class _Heartbeat:
+    """Stamps a shared heartbeat value from a thread, like the main app does."""
+
+    def __init__(self, value, interval: float = 0.1):
+        self.value = value
+        self.interval = interval
+        self.stop_flag = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.stop_flag.is_set():
+            self.value.value = time.time()
+            self.stop_flag.wait(self.interval)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_flag.set()
+        self.thread.join()
+
+
+@pytest.fixture
+def manager():
+    """A running connection manager on a slow simulator, with a live heartbeat."""
+    request_queue = multiprocessing.Queue()
+    response_queue = multiprocessing.Queue()
+    heartbeat_value = multiprocessing.Value('d', time.time())
+
+    manager = QBConnectionManager(
+        request_queue, response_queue,
+        {'type': 'simulator', 'latency_ms': LATENCY_MS, 'jitter_ms': 0},
+        heartbeat=heartbeat_value
+    )
+    manager.heartbeat_timeout = HEARTBEAT_TIMEOUT
+
+    heartbeat = _Heartbeat(heartbeat_value)
+    heartbeat.start()
+    thread = threading.Thread(target=manager.run, daemon=True)
+    thread.start()
+
+    yield manager, heartbeat, thread
+
+    heartbeat.stop()
+    if thread.is_alive():
+        request_queue.put({'type': 'shutdown'})
+        thread.join(timeout=LATENCY_MS / 1000 + 5)
+
+
+def _send(manager: QBConnectionManager, request_id: str, qbxml: str):
+    """Queue a request message the way QBIPCClient.submit_request does."""
+    manager.request_queue.put({
+        'type': 'request',
+        'request_id': request_id,
+        'qbxml': qbxml,
+        'company_file': None,
+        'priority': 'interactive'
+    })
+
+
+def test_slow_requests_do_not_trip_the_heartbeat(manager):
+    manager, heartbeat, thread = manager
+
+    _send(manager, 'customers', QBXMLBuilder.build_customer_query())
+    _send(manager, 'items', QBXMLBuilder.build_item_query())
+
+    responses = {}
+    for _ in range(2):
+        response = manager.response_queue.get(timeout=LATENCY_MS / 1000 * 2 + 5)
+        responses[response['request_id']] = response
+
+    assert set(responses) == {'customers', 'items'}
+    for response in responses.values():
+        assert response['success'], response['error']
+        assert response['qb_time'] > HEARTBEAT_TIMEOUT
+
+    # Still serving after two back-to-back requests, each longer than the timeout
+    assert manager.running
+    assert thread.is_alive()
+
+
+def test_manager_exits_when_heartbeat_stops(manager):
+    manager, heartbeat, thread = manager
+
+    heartbeat.stop()
+    thread.join(timeout=HEARTBEAT_TIMEOUT + 5)
+
+    assert not thread.is_alive()
+    assert not manager.running